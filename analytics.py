@@ -0,0 +1,101 @@
+import pandas as pd
+
+
+# Categories that move money around rather than earning or spending it.
+NON_EXPENSE_CATEGORIES = ['Transfer', 'Brokerage', 'Roth IRA', 'Credit Card Payment']
+NON_INCOME_CATEGORIES = ['Transfer', 'Credit Card Payment']
+NON_REIMBURSEMENT_CATEGORIES = ['Transfer', 'Credit Card Payment']
+SENSITIVE_TYPES = ['Income', 'Investment']
+CUBE_COLUMNS = ['day', 'type', 'category', 'amount', 'count']
+
+
+def build_cube(df):
+    """
+    Aggregates transactions into one row per day x type x category with the
+    summed amount and transaction count. Every Trends view is a date slice of
+    this cube, so the raw ledger is grouped once per data version.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=CUBE_COLUMNS)
+    frame = pd.DataFrame({
+        'day': pd.to_datetime(df['date'], format='mixed').dt.normalize(),
+        'type': df['type'],
+        'category': df['category'],
+        'amount': pd.to_numeric(df['amount'], errors='coerce').fillna(0.0),
+    })
+    cube = (
+        frame.groupby(['day', 'type', 'category'], dropna=False, sort=True)['amount']
+        .agg(amount='sum', count='size')
+        .reset_index()
+    )
+    return cube[CUBE_COLUMNS]
+
+
+def slice_cube(cube, start=None, end=None, show_sensitive=True):
+    """Cube rows with `start <= day <= end` (either bound optional), minus income and investments in privacy mode."""
+    mask = pd.Series(True, index=cube.index)
+    if start is not None:
+        mask &= cube['day'] >= pd.Timestamp(start).normalize()
+    if end is not None:
+        mask &= cube['day'] <= pd.Timestamp(end).normalize()
+    if not show_sensitive:
+        mask &= ~cube['type'].isin(SENSITIVE_TYPES)
+    return cube[mask]
+
+
+def _masks(cube):
+    income = (cube['type'] == 'Income') & ~cube['category'].isin(NON_INCOME_CATEGORIES)
+    expense = (cube['type'] == 'Expense') & ~cube['category'].isin(NON_EXPENSE_CATEGORIES)
+    reimbursement = (cube['type'] == 'Reimbursement') & ~cube['category'].isin(NON_REIMBURSEMENT_CATEGORIES)
+    return income, expense, reimbursement
+
+
+def summarize(cube):
+    """Income, gross expense, reimbursements, net expense, and savings for a cube slice."""
+    income, expense, reimbursement = _masks(cube)
+    totals = {
+        'income': float(cube.loc[income, 'amount'].sum()),
+        'gross_expense': float(cube.loc[expense, 'amount'].sum()),
+        'reimbursements': float(cube.loc[reimbursement, 'amount'].sum()),
+        'transactions': int(cube['count'].sum()),
+    }
+    totals['expense'] = totals['gross_expense'] - totals['reimbursements']
+    totals['savings'] = totals['income'] - totals['expense']
+    return totals
+
+
+def category_breakdown(cube):
+    """Net expense (gross expense minus reimbursements) per category, largest first."""
+    _income, expense, reimbursement = _masks(cube)
+    gross = cube[expense].groupby('category')['amount'].sum()
+    reimbursed = cube[reimbursement].groupby('category')['amount'].sum()
+    return gross.sub(reimbursed, fill_value=0).sort_values(ascending=False)
+
+
+def monthly_flow(cube):
+    """
+    Long-form monthly Income and net Expense rows with Period (month start,
+    for sorting) and Label ('Jan 2026') columns, ready for an Altair bar chart.
+    """
+    if cube.empty:
+        return pd.DataFrame(columns=['Period', 'Label', 'Type', 'Amount'])
+    income, expense, reimbursement = _masks(cube)
+    period = cube['day'].dt.to_period('M')
+    combined = pd.DataFrame({
+        'Income': cube.loc[income, 'amount'].groupby(period[income]).sum(),
+        'Gross_Expense': cube.loc[expense, 'amount'].groupby(period[expense]).sum(),
+        'Reimbursement': cube.loc[reimbursement, 'amount'].groupby(period[reimbursement]).sum(),
+    }).fillna(0)
+    if combined.empty:
+        return pd.DataFrame(columns=['Period', 'Label', 'Type', 'Amount'])
+    combined['Expense'] = combined['Gross_Expense'] - combined['Reimbursement']
+    combined.index.name = 'period'
+    chart_data = combined.reset_index()
+    chart_data['Period'] = chart_data['period'].dt.to_timestamp()
+    chart_data['Label'] = chart_data['period'].dt.strftime('%b %Y')
+    return chart_data.melt(
+        id_vars=['Period', 'Label'],
+        value_vars=['Income', 'Expense'],
+        var_name='Type',
+        value_name='Amount',
+    )
@@ -4,7 +4,9 @@ import pandas as pd
 import db
 import sync_simplefin
 import account_classifier
+import analytics
 import ml_utils
+import venmo_import
 import math
 from datetime import datetime, timedelta
 import time
@@ -72,6 +74,61 @@ def bool_to_rule_option(value):
     return "Default"
 
 
+@st.cache_resource
+def _data_version_store():
+    # Shared by every session in this process, so a write anywhere invalidates
+    # cached transaction tables everywhere.
+    return {'version': 0}
+
+
+def data_version():
+    return _data_version_store()['version']
+
+
+def bump_data_version():
+    """Call after any transaction write so cached tables reload on the next rerun."""
+    _data_version_store()['version'] += 1
+
+
+# The version argument is the cache key; the TTL picks up writes from the
+# sync daemon, which runs outside the app.
+@st.cache_data(ttl=300, show_spinner=False)
+def load_pending_count(version):
+    return db.count_pending_transactions()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_pending_page(version, sort, descending, page, page_size):
+    return db.get_pending_page(sort, descending, page, page_size)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_search_filter_options(version):
+    return db.get_transaction_filter_options()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_search_page(version, filters, page_size, after):
+    return db.search_transactions_page(**filters, page_size=page_size, after=after)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_search_totals(version, filters):
+    return db.search_totals(**filters)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_expected_income_gaps(version):
+    return db.find_expected_income_gaps()
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_trends_cube(version):
+    # The ledger is read and its dates parsed once per data version; only the
+    # aggregate cube is kept.
+    return analytics.build_cube(db.get_all_transactions())
+
+
 def render_bank_sync_button(key="sync_with_banks"):
     if ROLE != 'admin':
         st.caption("Syncing disabled for Viewers")
@@ -82,12 +139,20 @@ def render_bank_sync_button(key="sync_with_banks"):
                 report = sync_simplefin.sync()
                 if report and report.get('status') == 'success':
                     st.success(
-                        f"Sync complete: {report.get('transactions_inserted', 0)} new, "
+                        f"Sync complete: {report.get('transactions_inserted', 0)} new "
+                        f"({report.get('auto_approved', 0)} auto-approved), "
                         f"{report.get('duplicates', 0)} duplicates."
                     )
                     st.session_state['last_sync_report'] = report
+                elif report and report.get('status') == 'partial':
+                    st.warning(
+                        f"Sync partly complete: {report.get('transactions_inserted', 0)} new. "
+                        f"{report.get('error', '')}"
+                    )
+                    st.session_state['last_sync_report'] = report
                 else:
                     st.error(f"Sync failed: {(report or {}).get('error', 'unknown error')}")
+                bump_data_version()
                 st.rerun()
             except Exception as e:
                 st.error(f"Sync failed: {e}")
@@ -189,6 +254,8 @@ with st.sidebar:
             with st.spinner("Training model..."):
                 import ml_utils
                 report = ml_utils.classifier.train()
+                # Training re-scores the pending Inbox rows.
+                bump_data_version()
                 if report.get('status') == 'success':
                     st.success("Training complete")
                 else:
@@ -203,6 +270,20 @@ with st.sidebar:
                     f"Training data: {report.get('reviewed_samples', 0)} reviewed "
                     f"of {report.get('total_samples', 0)} total transactions"
                 )
+                if report.get('training_seconds') is not None:
+                    st.caption(
+                        f"Fit time: {report.get('training_seconds')}s "
+                        f"(category {report.get('category_fit_seconds', '-')}s, "
+                        f"type {report.get('type_fit_seconds', '-')}s, "
+                        f"{'parallel' if report.get('parallel_fit') else 'sequential'}, "
+                        f"{report.get('n_jobs')} cores)"
+                    )
+                rescore = report.get('rescore')
+                if rescore:
+                    st.caption(
+                        f"Re-scored {rescore['rescored']} of {rescore['pending']} pending transactions "
+                        f"({rescore['skipped_edited']} edited rows skipped)"
+                    )
                 st.caption(
                     f"Saved file: {report.get('model_saved_file')} | "
                     f"Saved DB: {report.get('model_saved_database')} | "
@@ -217,6 +298,19 @@ with st.sidebar:
                 f"ML loaded: {ml_status.get('category_model_loaded') or ml_status.get('type_model_loaded')} "
                 f"from {ml_status.get('load_source') or 'none'}"
             )
+            evaluation = ml_utils.classifier.get_evaluation()
+            if evaluation:
+                scores = [
+                    f"{name} {evaluation[name]['accuracy']:.0%}"
+                    for name in ('category', 'type') if evaluation.get(name)
+                ]
+                st.caption(
+                    f"Held-out accuracy ({evaluation.get('test_samples')} newest rows): "
+                    f"{', '.join(scores) or 'n/a'} | "
+                    f"p50/p99 {evaluation['single_predict_ms']['p50']}/{evaluation['single_predict_ms']['p99']} ms per row | "
+                    f"{evaluation.get('artifact_bytes', 0) / 1024:.0f} KB, "
+                    f"cold load {evaluation.get('cold_load_seconds')}s"
+                )
         except Exception:
             pass
         with st.expander("📥 Import Data"):
@@ -239,128 +333,15 @@ with st.sidebar:
             if uploaded_file is not None:
                 if st.button("Process Venmo CSV"):
                     try:
-                        # 1. Read CSV (Skip first 2 rows usually, looking for Header)
-                        # We'll try to find the header row dynamically or hardcode skiprows=2
-                        # Based on inspection, header is on row 3 (index 2)
-                        
-                        df = pd.read_csv(uploaded_file, header=2, dtype=str)
-                        
-                        # Validate Columns
-                        required_cols = ['ID', 'Datetime', 'Type', 'Status', 'Note', 'From', 'To', 'Amount (total)']
-                        # Note: The file has a leading comma? So first column might be unnamed. 
-                        # 'ID' is the 2nd column in the raw text, but pandas might handle it if delimiter matches.
-                        # Let's clean column names just in case.
-                        df.columns = df.columns.str.strip()
-                        
-                        if 'ID' not in df.columns:
-                            # Try reloading with different header?
-                            # Or maybe the first column was Unnamed?
-                            # Let's inspect columns from a temp read
-                            pass
-                            
-                        # If 'ID' missing, maybe it's 'Unnamed: 1' if there was a leading comma.
-                        # Using user file: ",ID,..." -> Valid CSV usually ignores leading empty field, or makes it "Unnamed: 0"
-                        
-                        processed_txs = []
-                        
-                        for _, row in df.iterrows():
-                            # Skip if ID is NaN (footer rows)
-                            if pd.isna(row['ID']):
-                                continue
-                                
-                            # Parse ID
-                            v_id = str(row['ID'])
-                            
-                            # Parse Date
-                            v_date = pd.to_datetime(row['Datetime']).strftime('%Y-%m-%d')
-                            
-                            # Parse Amount
-                            raw_amt_str = str(row['Amount (total)']) \
-                                .replace('$', '') \
-                                .replace(',', '') \
-                                .replace(' ', '')
-                            
-                            # Handle Sign
-                            # Venmo CSV: "+ $6.00" or "- $135.00"
-                            # If "+", it's Positive (Reimbursement per user rule)
-                            # If "-", it's Negative (Expense)
-                            
-                            is_positive = '+' in raw_amt_str or (not '-' in raw_amt_str and float(raw_amt_str) > 0)
-                             # Clean symbol
-                            clean_amt = float(raw_amt_str.replace('+', '').replace('-', ''))
-                            
-                            # Logic
-                            v_type = row['Type']
-                            note = str(row['Note']) if not pd.isna(row['Note']) else ""
-                            
-                            # Description Construction
-                            # Requested Format: "Venmo - From / To"
-                            desc = f"Venmo - {row['From']} / {row['To']}"
-                            
-                            # Note goes to User Notes? Or appended?
-                            # User example: "Sushi" as Note. 
-                            # Let's put Note in 'user_notes' (which maps to 'Notes' column in Inbox)
-                            # And maybe details?
-                            
-                            user_note = row['Note'] if not pd.isna(row['Note']) else ""
-                            prediction_text = f"{desc} {note}".strip()
-                            signed_amount = clean_amt if is_positive else -clean_amt
-                            pred = ml_utils.classifier.predict(prediction_text, signed_amount)
-                            category = pred.get('category', 'Uncategorized')
-                            confidence = float(pred.get('confidence', 0.0))
-                                
-                            # 1. Standard Transfer
-                            if v_type == 'Standard Transfer':
-                                tx_type = 'Transfer'
-                                category = 'Transfer'
-                                # Transfers usually negative (to bank)
-                            
-                            # 2. Positive Amount -> Reimbursement
-                            elif is_positive:
-                                tx_type = 'Reimbursement'
-                                
-                            # 3. Negative -> Expense
-                            else:
-                                tx_type = 'Expense'
-
-                            ml_note = ""
-                            if not pred.get('model_available'):
-                                ml_note = "ML model not trained"
-                            elif confidence < 0.6:
-                                ml_note = f"Low Confidence ({int(confidence*100)}%)"
-                            if ml_note:
-                                user_note = f"{user_note} | {ml_note}" if user_note else ml_note
-                                
-                            # Add to list
-                            processed_txs.append({
-                                'date': v_date,
-                                'amount': abs(clean_amt),
-                                'description': desc,
-                                'category': category,
-                                'type': tx_type,
-                                'method': 'Venmo',
-                                'tags': 'venmo_import',
-                                'user_notes': user_note,
-                                'status': 'PENDING',
-                                'raw_data': str(row.to_dict()),
-                                'account': 'Venmo',
-                                'posted_date': v_date,
-                                'details': f"Venmo ID: {v_id}; Statement Period: {row.get('Statement Period Venmo Fees', '')}",
-                                'ml_confidence': confidence,
-                                'ml_category_confidence': float(pred.get('cat_confidence', 0.0)),
-                                'ml_type_confidence': float(pred.get('type_confidence', 0.0)),
-                            })
-                            
-                        # Upsert
-                        if processed_txs:
-                            new_df = pd.DataFrame(processed_txs)
-                            count = db.upsert_transactions(new_df)
-                            st.success(f"Imported {count} new Venmo transactions!")
+                        result = venmo_import.import_statement(uploaded_file)
+                        if result['inserted']:
+                            bump_data_version()
+                            st.success(f"Imported {result['inserted']} new Venmo transactions!")
                             st.balloons()
-                            # st.rerun() # Refresh to show in Inbox
+                        elif result['rows']:
+                            st.info(f"All {result['rows']} Venmo transactions were already imported.")
                         else:
                             st.warning("No valid transactions found in file.")
-                            
                     except Exception as e:
                         st.error(f"Error processing CSV: {e}")
 
@@ -369,55 +350,55 @@ with st.sidebar:
 # ---------------------------------------------------------
 
 
+# --- Helper Function for the Trends Transaction Log ---
+TRENDS_LOG_PAGE_SIZE = 100
+
+
+def render_transaction_log(view_key, start, end, total):
+    """
+    Newest-first log for a Trends view, read one keyset page at a time from
+    the database with the view's date range instead of masking the ledger.
+    """
+    filters = {
+        'start_date': None if start is None else str(pd.Timestamp(start).date()),
+        'end_date': None if end is None else str(pd.Timestamp(end).date()),
+        'exclude_types': [] if SHOW_SENSITIVE else list(analytics.SENSITIVE_TYPES),
+    }
+    # Go back to page one whenever the range or the data changes.
+    state_key = f"trends_log_{view_key}"
+    signature = (repr(filters), data_version())
+    if st.session_state.get(f"{state_key}_signature") != signature:
+        st.session_state[f"{state_key}_signature"] = signature
+        st.session_state[f"{state_key}_cursors"] = [None]
+    cursors = st.session_state[f"{state_key}_cursors"]
+    page, next_cursor = load_search_page(data_version(), filters, TRENDS_LOG_PAGE_SIZE, cursors[-1])
+    page_number = len(cursors)
+    st.caption(
+        f"Page {page_number} of {max(math.ceil(total / TRENDS_LOG_PAGE_SIZE), 1)} "
+        f"({total} transactions, newest first)"
+    )
+    display_df = page[['date', 'type', 'category', 'description', 'amount', 'status']].copy()
+    display_df['date'] = pd.to_datetime(display_df['date'], format='mixed')
+    st.dataframe(display_df, use_container_width=True, hide_index=True)
+    if page_number > 1 or next_cursor is not None:
+        prev_col, next_col, _spacer = st.columns([1, 1, 6])
+        with prev_col:
+            if st.button("◀ Previous", disabled=page_number == 1, key=f"{state_key}_prev"):
+                cursors.pop()
+                st.rerun()
+        with next_col:
+            if st.button("Next ▶", disabled=next_cursor is None, key=f"{state_key}_next"):
+                cursors.append(next_cursor)
+                st.rerun()
+
+
 # --- Helper Function for Monthly Chart ---
-def render_monthly_flow(df):
-    if df.empty:
+def render_monthly_flow(cube):
+    long_df = analytics.monthly_flow(cube)
+    if long_df.empty:
         return
     
-    # 1. Group by Month
-    df = df.copy()
-    df['period'] = df['date'].dt.to_period('M')
-    
-    # 2. Calculate Nets (as Series with PeriodIndex)
-    inc_mask = (df['type'] == 'Income') & (~df['category'].isin(['Transfer', 'Credit Card Payment']))
-    monthly_inc = df[inc_mask].groupby('period')['amount'].sum()
-    
-    non_expense_cats = ['Transfer', 'Brokerage', 'Roth IRA', 'Credit Card Payment']
-    non_reimb_cats = ['Transfer', 'Credit Card Payment']
-    
-    exp_mask = (df['type'] == 'Expense') & (~df['category'].isin(non_expense_cats))
-    monthly_gross_exp = df[exp_mask].groupby('period')['amount'].sum()
-    
-    reimb_mask = (df['type'] == 'Reimbursement') & (~df['category'].isin(non_reimb_cats))
-    monthly_reimb = df[reimb_mask].groupby('period')['amount'].sum()
-    
-    # 3. Align everything into one DataFrame (Outer Join on Period)
-    combined = pd.DataFrame({
-        'Income': monthly_inc,
-        'Gross_Expense': monthly_gross_exp,
-        'Reimbursement': monthly_reimb
-    }).fillna(0)
-    
-    # Calculate Net Expense
-    combined['Expense'] = combined['Gross_Expense'] - combined['Reimbursement']
-    
-    # Extract Index (Period) to Columns
-    combined.index.name = 'period'
-    chart_data = combined.reset_index()
-    
-    # Generate Helper Columns
-    chart_data['Period'] = chart_data['period'].dt.to_timestamp() # For sorting
-    chart_data['Label'] = chart_data['period'].dt.strftime('%b %Y') # For display
-    
-    # Melt for Altair
-    long_df = chart_data.melt(
-        id_vars=['Period', 'Label'], 
-        value_vars=['Income', 'Expense'], 
-        var_name='Type', 
-        value_name='Amount'
-    )
-    
-    # 4. Render Altair Chart
+    # Render Altair Chart
     st.subheader("Monthly Cash Flow")
     
     c = alt.Chart(long_df).mark_bar().encode(
@@ -431,47 +412,37 @@ def render_monthly_flow(df):
 
 st.title("💸 Continuous Money Tracker")
 
-# ---------------------------------------------------------
-# TABS
-# ---------------------------------------------------------
-tab1, tab2, tab3, tab4, tab5 = st.tabs(["📥 Inbox", "🔌 Connections", "📈 Trends", "💰 Net Worth", "🔎 Search"])
-
 # ---------------------------------------------------------
 # TAB 1: INBOX
 # ---------------------------------------------------------
-with tab1:
-    header_col, sync_col = st.columns([3, 1])
-    with header_col:
-        st.markdown("### Review Pending Transactions")
-        st.caption("Categorize and approve new transactions here.")
-    with sync_col:
-        render_bank_sync_button("sync_with_banks_inbox")
+@st.fragment
+def render_inbox_editor(pending_df, editor_key):
+    # Edits rerun only this fragment; approving triggers a full app rerun.
+    # Rows ticked for approval live in session state with their edits, keyed
+    # by id, so a selection survives paging and re-sorting. Any write resets
+    # it, since the selected rows may no longer be pending.
+    if st.session_state.get('inbox_selected_version') != data_version():
+        st.session_state['inbox_selected_version'] = data_version()
+        st.session_state['inbox_selected'] = {}
+    selected = st.session_state['inbox_selected']
+    # The page frame may be a cached object; fragment reruns must not mutate it.
+    pending_df = pending_df.copy()
+    on_page = pending_df['id'].isin(list(selected))
+    for column in ['category', 'user_notes', 'tags', 'type']:
+        pending_df.loc[on_page, column] = pending_df.loc[on_page, 'id'].map(
+            lambda tx_id: selected[tx_id][column]
+        )
+    pending_df.loc[on_page, 'Approve'] = True
 
-    # Load Pending Data
-    pending_df = db.get_pending_transactions()
-    
-    if not pending_df.empty:
-        # We need a key to ensure state persists
-        # We want users to edit 'Category' and 'User Notes'
-        # And select rows to 'Approve'
-        
-        # Add a 'Approve' checkbox column for bulk action? 
-        # Actually, st.data_editor supports row selection if we want, 
-        # OR we can just have an "Approve All" or "Approve Edited".
-        
-        # Let's try: "Edit everything, then click 'Approve ALL Visible'" strategy for simplicity first.
-        # Or even better: "Approve Selected"
-        
-        pending_df['date'] = pd.to_datetime(pending_df['date']) # Fix for DateColumn config
-        pending_df['Approve'] = False # Checkbox column
-        
-        # Define desired column order
-        # User Request: Date, Type, Amount, Category, Description, Notes, Tags, Approve
-        column_order = [
-            "date", "account", "type", "amount", "category", 
-            "description", "user_notes", "tags", "Approve"
-        ]
-        
+    # Define desired column order
+    # User Request: Date, Type, Amount, Category, Description, Notes, Tags, Approve
+    column_order = [
+        "date", "account", "type", "amount", "category",
+        "description", "user_notes", "tags", "Approve"
+    ]
+
+    editor_col, similar_col = st.columns([3, 1])
+    with editor_col:
         edited_df = st.data_editor(
             pending_df,
             column_order=column_order,
@@ -527,57 +498,146 @@ with tab1:
             },
             hide_index=True,
             use_container_width=True,
-            key="inbox_editor_v2" # Change key to force refresh
+            key=editor_key
         )
-        
-        # Logic to save changes back to DB
-        # User edits the dataframe. We need to look for changes.
-        
-        # Separate Actions:
-        # 1. Save Changes (Updates text/category in DB but keeps PENDING)
-        # 2. Approve Selected (Updates text/category AND sets status=REVIEWED)
-        
-        col_a, col_b = st.columns(2)
-        
-        # We need to detect which rows were marked 'Approve' = True
-        to_approve = edited_df[edited_df['Approve'] == True]
-        
-        if not to_approve.empty:
-            if ROLE == 'admin':
-                if st.button(f"✅ Approve {len(to_approve)} Transactions"):
-                    # 1. Update text/category for these rows
-                    # Iterate and update? Or bulk update? 
-                    # DB module needs an 'update_transaction_details' function.
-                    # For now let's just do it manually via a loop or update query if we add it to db.py
-                    
-                    # Let's just assume we want to mark them REVIEWED.
-                    # But we also want to save their category/notes changes!
-                    
-                    # Hack: Update ALL edited rows in DB first
-                    # (We'll skip this optimization for now and just update the Approved ones)
-                    
-                    for idx, row in to_approve.iterrows():
-                        # Sanitize tags: If list, join by comma. If None, empty string.
-                        raw_tags = row.get('tags', '')
-                        if isinstance(raw_tags, list):
-                            tags_str = ", ".join([str(t) for t in raw_tags])
-                        else:
-                            tags_str = str(raw_tags) if raw_tags is not None else ''
-
-                        db.review_transaction(
-                            row['id'],
-                            row['category'], 
-                            row['user_notes'], 
-                            tags_str,
-                            row['type'],
-                            reviewed_by=ROLE,
-                            review_source='manual',
-                        )
-                    
-                    st.success("Transactions approved!")
-                    st.rerun()
-            else:
-                 st.info("Log in as Admin to approve transactions.")
+
+    # Side panel: how the closest reviewed transactions were labelled.
+    with similar_col:
+        st.markdown("#### 🔎 Similar Past")
+        similar_options = pending_df['id'].tolist()
+        similar_labels = dict(zip(
+            pending_df['id'],
+            pending_df['description'].fillna('').str.slice(0, 40) + " ($" + pending_df['amount'].map('{:,.2f}'.format) + ")",
+        ))
+        similar_id = st.selectbox(
+            "Transaction",
+            similar_options,
+            format_func=lambda tx_id: similar_labels.get(tx_id, tx_id),
+            key="inbox_similar_tx",
+        )
+        if similar_id is not None:
+            similar_desc = pending_df.loc[pending_df['id'] == similar_id, 'description'].iloc[0]
+            try:
+                neighbors = ml_utils.classifier.similar_transactions(similar_desc, k=5)
+            except Exception as e:
+                neighbors = None
+                st.caption(f"Similar lookup unavailable: {e}")
+            if neighbors is not None and neighbors.empty:
+                st.caption("No similar reviewed transactions yet.")
+            elif neighbors is not None:
+                st.dataframe(
+                    neighbors[['description', 'category', 'type', 'amount', 'date', 'similarity']],
+                    column_config={
+                        "description": st.column_config.TextColumn("Description"),
+                        "category": st.column_config.TextColumn("Category"),
+                        "type": st.column_config.TextColumn("Type"),
+                        "amount": st.column_config.NumberColumn("Amount", format="$%.2f"),
+                        "date": st.column_config.TextColumn("Date"),
+                        "similarity": st.column_config.ProgressColumn(
+                            "Match", min_value=0.0, max_value=1.0, format="%.2f"
+                        ),
+                    },
+                    hide_index=True,
+                    use_container_width=True,
+                )
+
+    # Logic to save changes back to DB
+    # User edits the dataframe. We need to look for changes.
+
+    # Separate Actions:
+    # 1. Save Changes (Updates text/category in DB but keeps PENDING)
+    # 2. Approve Selected (Updates text/category AND sets status=REVIEWED)
+
+    col_a, col_b = st.columns(2)
+
+    # We need to detect which rows were marked 'Approve' = True
+    for _, row in edited_df.iterrows():
+        if row['Approve']:
+            selected[row['id']] = {
+                'category': row['category'],
+                'user_notes': row['user_notes'],
+                'tags': row['tags'],
+                'type': row['type'],
+            }
+        else:
+            selected.pop(row['id'], None)
+
+    if selected:
+        off_page = len(set(selected) - set(edited_df['id']))
+        if off_page:
+            st.caption(f"{off_page} selected on other pages are included.")
+        if ROLE == 'admin':
+            if st.button(f"✅ Approve {len(selected)} Transactions"):
+                to_approve = pd.DataFrame([{'id': tx_id, **edits} for tx_id, edits in selected.items()])
+
+                for idx, row in to_approve.iterrows():
+                    # Sanitize tags: If list, join by comma. If None, empty string.
+                    raw_tags = row.get('tags', '')
+                    if isinstance(raw_tags, list):
+                        tags_str = ", ".join([str(t) for t in raw_tags])
+                    else:
+                        tags_str = str(raw_tags) if raw_tags is not None else ''
+
+                    db.review_transaction(
+                        row['id'],
+                        row['category'], 
+                        row['user_notes'], 
+                        tags_str,
+                        row['type'],
+                        reviewed_by=ROLE,
+                        review_source='manual',
+                    )
+
+                try:
+                    ml_utils.classifier.after_review()
+                except Exception as e:
+                    st.warning(f"Model refresh after review failed: {e}")
+
+                selected.clear()
+                bump_data_version()
+                st.success("Transactions approved!")
+                st.rerun()
+        else:
+             st.info("Log in as Admin to approve transactions.")
+
+
+def render_inbox():
+    header_col, sync_col = st.columns([3, 1])
+    with header_col:
+        st.markdown("### Review Pending Transactions")
+        st.caption("Categorize and approve new transactions here.")
+    with sync_col:
+        render_bank_sync_button("sync_with_banks_inbox")
+
+    # Load Pending Data: a cheap COUNT(*) for the badge, then one sorted page.
+    pending_count = load_pending_count(data_version())
+
+    if pending_count:
+        badge_col, sort_col, order_col, size_col, page_col = st.columns([2, 1, 1, 1, 1])
+        with badge_col:
+            st.markdown(f"**📥 {pending_count} pending**")
+        with sort_col:
+            inbox_sort = st.selectbox("Sort by", list(db.INBOX_SORTS), key="inbox_sort")
+        with order_col:
+            inbox_order = st.selectbox("Order", ["Descending", "Ascending"], key="inbox_order")
+        with size_col:
+            inbox_page_size = st.selectbox("Rows per page", [50, 100, 250], index=1, key="inbox_page_size")
+        page_count = max(math.ceil(pending_count / inbox_page_size), 1)
+        if st.session_state.get('inbox_page', 1) > page_count:
+            st.session_state['inbox_page'] = page_count
+        with page_col:
+            inbox_page = st.number_input("Page", min_value=1, max_value=page_count, value=1, step=1, key="inbox_page")
+
+        pending_df = load_pending_page(
+            data_version(), inbox_sort, inbox_order == "Descending", int(inbox_page), inbox_page_size
+        )
+        pending_df['date'] = pd.to_datetime(pending_df['date'], format='mixed') # Fix for DateColumn config
+        pending_df['Approve'] = False # Checkbox column
+
+        # Data version, sort, and page in the key: editor deltas are positional,
+        # so they must never be replayed onto a different set of rows.
+        editor_key = f"inbox_editor_v3_{data_version()}_{inbox_sort}_{inbox_order}_{inbox_page_size}_{inbox_page}"
+        render_inbox_editor(pending_df, editor_key)
 
     else:
         st.info("🎉 All caught up! No pending transactions.")
@@ -587,31 +647,60 @@ with tab1:
         st.divider()
         st.markdown("### Admin Tools")
 
-        # --- Salary Reminder ---
-        # Check last 6 months for missing salary
-        missing_months = []
-        conn = db.get_connection()
-        try:
-            # Check previous 6 months (excluding current)
-            for i in range(1, 7):
-                check_date = pd.Timestamp.now() - pd.DateOffset(months=i)
-                m_str = check_date.strftime('%Y-%m')
-                m_nice = check_date.strftime('%B %Y')
-
-                # Query: Check for Income from E*Trade in that month
-                q = f"SELECT date FROM transactions WHERE (account LIKE '%E*Trade%' OR method LIKE '%E*Trade%') AND type = 'Income' AND date LIKE '{m_str}%'"
-                check_df = pd.read_sql_query(q, conn)
-
-                if check_df.empty:
-                    missing_months.append(m_nice)
+        # --- Auto-Approvals ---
+        auto_approved_count = db.count_auto_approvals()
+        if auto_approved_count:
+            st.caption(f"🤖 {auto_approved_count} transactions were auto-approved by the model during sync.")
+            if st.button(f"↩️ Revert {auto_approved_count} Auto-Approvals", key="revert_auto_approvals"):
+                reverted = db.revert_auto_approvals()
+                bump_data_version()
+                try:
+                    ml_utils.classifier.refresh_merchant_cache()
+                    ml_utils.classifier.rebuild_similarity_index()
+                except Exception as e:
+                    st.warning(f"Model refresh after revert failed: {e}")
+                st.success(f"Moved {reverted} transactions back to the Inbox.")
+                st.rerun()
 
-            if missing_months:
-                st.warning(f"⚠️ Missing E*Trade salary entries for: {', '.join(missing_months)}")
+        # --- Expected Income Reminder ---
+        # One grouped query checks every expected-income rule for missing months.
+        try:
+            for gap in load_expected_income_gaps(data_version()):
+                missing = [pd.Period(month).strftime('%B %Y') for month in gap['missing']]
+                st.warning(f"⚠️ Missing {gap['name']} entries for: {', '.join(missing)}")
         except Exception as e:
-            # st.error(e)
-            pass
-        finally:
-            conn.close()
+            st.caption(f"Expected income check unavailable: {e}")
+
+        with st.expander("🗓️ Expected Income Rules"):
+            st.caption(
+                "Income sources that should appear every month. A rule matches transactions of its type "
+                "whose account or method contains the pattern."
+            )
+            rules_df = db.get_expected_income_rules()
+            rules_df['enabled'] = rules_df['enabled'].map(lambda value: value is None or bool(value))
+            edited_rules = st.data_editor(
+                rules_df,
+                column_config={
+                    "name": st.column_config.TextColumn("Name", required=True),
+                    "match_pattern": st.column_config.TextColumn("Account/Method Contains", required=True),
+                    "tx_type": st.column_config.SelectboxColumn(
+                        "Type", options=["Income", "Reimbursement", "Investment", "Transfer"], required=True
+                    ),
+                    "lookback_months": st.column_config.NumberColumn("Look-back Months", min_value=1, step=1),
+                    "enabled": st.column_config.CheckboxColumn("Enabled"),
+                    "notes": st.column_config.TextColumn("Notes"),
+                    "updated_at": None,
+                },
+                hide_index=True,
+                num_rows="dynamic",
+                use_container_width=True,
+                key="expected_income_rules_editor",
+            )
+            if st.button("Save Expected Income Rules"):
+                saved = db.replace_expected_income_rules(edited_rules.to_dict("records"))
+                bump_data_version()
+                st.success(f"Saved {saved} expected income rules.")
+                st.rerun()
 
         # --- Manual Entry Form ---
         with st.expander("➕ Add Manual / E*Trade Transaction"):
@@ -650,6 +739,7 @@ with tab1:
                     }
 
                     db.upsert_transactions(pd.DataFrame([new_tx]))
+                    bump_data_version()
                     st.success("Transaction added!")
                     st.balloons()
                     time.sleep(1)
@@ -660,7 +750,7 @@ with tab1:
 # ---------------------------------------------------------
 # TAB 2: CONNECTIONS
 # ---------------------------------------------------------
-with tab2:
+def render_connections():
     st.header("🔌 SimpleFIN Connections")
     top_col, action_col = st.columns([3, 1])
     with top_col:
@@ -669,6 +759,13 @@ with tab2:
         render_bank_sync_button("sync_with_banks_connections")
 
     try:
+        heartbeat = db.get_sync_heartbeat()
+        if heartbeat:
+            st.caption(
+                f"Background sync: {heartbeat['status']} | "
+                f"last heartbeat {heartbeat['last_beat_at']} | "
+                f"next run {heartbeat.get('next_run_at') or 'not scheduled'}"
+            )
         latest_run, account_results = db.get_latest_sync_account_results()
         if latest_run.empty:
             st.info("No sync runs recorded yet.")
@@ -678,11 +775,26 @@ with tab2:
             rules_map = account_classifier.rules_to_map(account_rules)
             st.caption(
                 f"Last sync: {run['status']} at {run['finished_at']} | "
-                f"{run['transactions_inserted']} new, {run['duplicates']} duplicates | "
+                f"{run['transactions_inserted']} new ({run.get('auto_approved', 0)} auto-approved), "
+                f"{run['duplicates']} duplicates | "
                 f"{run.get('balance_accounts_seen', 0)} balances"
             )
             if run.get('sync_start_date') and run.get('sync_end_date'):
                 st.caption(f"Transaction window: {run['sync_start_date']} to {run['sync_end_date']}")
+            connection_results = db.get_sync_connection_results(run['id'])
+            if len(connection_results) > 1 or (connection_results['status'] == 'failed').any():
+                st.dataframe(
+                    connection_results.rename(columns={
+                        "connection": "Connection",
+                        "status": "Status",
+                        "accounts_seen": "Accounts",
+                        "transactions_seen": "Tx Seen",
+                        "fetch_seconds": "Fetch Seconds",
+                        "error": "Error",
+                    }),
+                    use_container_width=True,
+                    hide_index=True,
+                )
 
             if not account_results.empty:
                 display_sync = account_results.copy()
@@ -768,10 +880,11 @@ with tab2:
                     "days_balance_unchanged": "Days Unchanged",
                     "inserted_count": "New",
                     "duplicate_count": "Duplicates",
+                    "connection": "Connection",
                     "error": "Error",
                 })
                 visible_sync = visible_sync[[
-                    "Bank", "Account", "Connection Health", "Balance Status", "Used in Inbox", "Used in Net Worth",
+                    "Connection", "Bank", "Account", "Connection Health", "Balance Status", "Used in Inbox", "Used in Net Worth",
                     "Tx Seen", "Latest Tx", "Balance", "Currency", "Balance Unchanged Since",
                     "Days Unchanged", "Action", "New", "Duplicates", "Error"
                 ]]
@@ -850,45 +963,21 @@ with tab2:
 # ---------------------------------------------------------
 # TAB 3: DASHBOARD (Formerly Trends)
 # ---------------------------------------------------------
-with tab3:
+def render_dashboard():
     st.header("📊 Dashboard")
     
-    all_df = db.get_all_transactions()
+    # One day x type x category aggregate; every view below is a date slice of it.
+    cube = load_trends_cube(data_version())
     
-    if not all_df.empty:
-        all_df['date'] = pd.to_datetime(all_df['date'], format='mixed')
-        
+    if not cube.empty:
         # --- Helper Function to Render Stats ---
-        def render_dashboard_view(df, show_monthly_flow=False):
-            if df.empty:
+        def render_dashboard_view(view_key, start=None, end=None, show_monthly_flow=False):
+            view_cube = analytics.slice_cube(cube, start, end, show_sensitive=SHOW_SENSITIVE)
+            if view_cube.empty:
                 st.info("No transactions in this period.")
                 return
 
-            # Filter Logic (Same as before)
-            
-            # Privacy Mode Filter
-            if not SHOW_SENSITIVE:
-                # Exclude Income and Investment from DataFrame
-                df = df[~df['type'].isin(['Income', 'Investment'])]
-            
-            non_expense_cats = ['Transfer', 'Brokerage', 'Roth IRA', 'Credit Card Payment']
-            non_reimb_cats = ['Transfer', 'Credit Card Payment']
-            
-            # Income
-            inc_mask = (df['type'] == 'Income') & (~df['category'].isin(['Transfer', 'Credit Card Payment']))
-            inc = df[inc_mask]['amount'].sum()
-            
-            # Expenses
-            exp_mask = (df['type'] == 'Expense') & (~df['category'].isin(non_expense_cats))
-            exp_df = df[exp_mask]
-            gross_exp = exp_df['amount'].sum()
-            
-            # Reimbursements
-            reimb_mask = (df['type'] == 'Reimbursement') & (~df['category'].isin(non_reimb_cats))
-            reimbursements = df[reimb_mask]['amount'].sum()
-            
-            exp = gross_exp - reimbursements
-            sav = inc - exp
+            totals = analytics.summarize(view_cube)
             
             # Metrics
             k1, k2, k3 = st.columns(3)
@@ -897,82 +986,54 @@ with tab3:
                  k1.metric("Total Income", "---")
                  k3.metric("Net Savings", "---")
             else:
-                k1.metric("Total Income", f"${inc:,.0f}")
-                k3.metric("Net Savings", f"${sav:,.0f}")
+                k1.metric("Total Income", f"${totals['income']:,.0f}")
+                k3.metric("Net Savings", f"${totals['savings']:,.0f}")
                 
-            k2.metric("Total Spent", f"${exp:,.0f}")
+            k2.metric("Total Spent", f"${totals['expense']:,.0f}")
             
             # Charts
             st.subheader("Category Breakdown")
-            
-            # 1. Gross Expenses by Category
-            gross_exp_by_cat = exp_df.groupby('category')['amount'].sum()
-            
-            # 2. Reimbursements by Category
-            reimb_df = df[reimb_mask]
-            reimb_by_cat = reimb_df.groupby('category')['amount'].sum()
-            
-            # 3. Net Expenses (Gross - Reimbursements)
-            # Use .sub with fill_value=0 to handle categories that exist in one but not the other
-            net_exp_by_cat = gross_exp_by_cat.sub(reimb_by_cat, fill_value=0)
-            
-            # 4. Sort and Display
-            # We filter out <= 0 to keep the chart focused on "Expenses", 
-            # unless user wants to see "Net Profit" categories? 
-            # Standard breakdown usually implies "Where did I spend money?". 
-            # If I made money on a category (Net < 0), it shouldn't be in expense breakdown.
-            # But let's just show everything for transparency first.
-            
-            cat_df = net_exp_by_cat.sort_values(ascending=False)
-            st.bar_chart(cat_df)
+            # Net expenses per category (gross expenses minus reimbursements).
+            st.bar_chart(analytics.category_breakdown(view_cube))
             
             # --- Monthly Cash Flow (Optional) ---
             if show_monthly_flow:
-                render_monthly_flow(df)
+                render_monthly_flow(view_cube)
             
             st.subheader("Transaction Log")
-            display_df = df[['date', 'type', 'category', 'description', 'amount', 'status']].copy()
-            st.dataframe(display_df, use_container_width=True)
+            render_transaction_log(view_key, start, end, totals['transactions'])
 
         # --- Sub-Tabs ---
         sub1, sub2, sub3, sub4, sub5 = st.tabs(["All Time", "Year to Date", "This Month", "This Week", "Custom"])
+        now = pd.Timestamp.now()
         
         with sub1:
             st.caption("All transactions history")
-            render_dashboard_view(all_df, show_monthly_flow=True)
+            render_dashboard_view("all_time", show_monthly_flow=True)
             
         with sub2:
-            current_year = pd.Timestamp.now().year
+            current_year = now.year
             st.caption(f"Activity for {current_year}")
-            
-            year_mask = all_df['date'].dt.year == current_year
-            year_df = all_df[year_mask]
-            render_dashboard_view(year_df, show_monthly_flow=True)
+            render_dashboard_view("year", pd.Timestamp(year=current_year, month=1, day=1),
+                                  pd.Timestamp(year=current_year, month=12, day=31),
+                                  show_monthly_flow=True)
             
         with sub3:
-            current_period = pd.Timestamp.now().to_period('M')
+            current_period = now.to_period('M')
             st.caption(f"Activity for {current_period.strftime('%B %Y')}")
-            
-            # Filter for current month
-            month_mask = all_df['date'].dt.to_period('M') == current_period
-            month_df = all_df[month_mask]
-            render_dashboard_view(month_df)
+            render_dashboard_view("month", current_period.start_time, current_period.end_time)
             
         with sub4:
             # Filter for current week (Monday start)
-            now = pd.Timestamp.now()
             start_of_week = (now - pd.Timedelta(days=now.weekday())).normalize()
             st.caption(f"Activity since Monday, {start_of_week.strftime('%b %d')}")
-            
-            week_mask = all_df['date'] >= start_of_week
-            week_df = all_df[week_mask]
-            render_dashboard_view(week_df)
+            render_dashboard_view("week", start_of_week)
             
         with sub5:
             st.caption("Select a custom date range")
             
             # Date Picker
-            today = pd.Timestamp.now().date()
+            today = now.date()
             start_of_month = today.replace(day=1)
             
             c1, c2 = st.columns(2)
@@ -982,15 +1043,7 @@ with tab3:
                 custom_end = st.date_input("End Date", value=today)
             
             if custom_start <= custom_end:
-                # Filter
-                # Convert to Timestamp for comparison (since all_df['date'] is datetime)
-                start_ts = pd.Timestamp(custom_start)
-                end_ts = pd.Timestamp(custom_end) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1) # End of day
-                
-                custom_mask = (all_df['date'] >= start_ts) & (all_df['date'] <= end_ts)
-                custom_df = all_df[custom_mask]
-                
-                render_dashboard_view(custom_df, show_monthly_flow=True)
+                render_dashboard_view("custom", custom_start, custom_end, show_monthly_flow=True)
             else:
                 st.error("Start Date must be before End Date.")
             
@@ -1000,7 +1053,7 @@ with tab3:
 # ---------------------------------------------------------
 # TAB 4: NET WORTH
 # ---------------------------------------------------------
-with tab4:
+def render_net_worth():
     st.header("Net Worth & Balances")
     
     col_r1, col_r2 = st.columns([3, 1])
@@ -1089,157 +1142,177 @@ with tab4:
 # ---------------------------------------------------------
 # TAB 5: SEARCH
 # ---------------------------------------------------------
-with tab5:
+@st.fragment
+def render_search_editor(filtered_df, editor_key="search_editor"):
+    # Edits rerun only this fragment; saving triggers a full app rerun.
+    if ROLE == 'admin':
+        edited_search_df = st.data_editor(
+            filtered_df,
+            column_config={
+                "category": st.column_config.SelectboxColumn(
+                    "Category",
+                    options=[
+                        "Salary", "Interest Income", "Gift Income", "Rewards",
+                        "Restaurants", "Fast Food", "Groceries", "Health", "Entertainment", "Travel",
+                        "Gift Expense", "Gas", "Commute", "Subscriptions", "Personal Care",
+                        "Shopping", "Supplies", "Phone", "Misc Expense", "Pass-Through (Reimbursed)",
+                        "Misc Income", "Transfer",
+                        "Brokerage", "Roth IRA",
+                        "Donation"
+                    ],
+                    required=True
+                ),
+                "type": st.column_config.SelectboxColumn(
+                    "Type",
+                    options=["Expense", "Income", "Reimbursement", "Investment", "Transfer"],
+                    required=True
+                ),
+                "amount": st.column_config.NumberColumn("Amount", format="$%.2f"),
+                "date": st.column_config.DateColumn("Date", format="YYYY-MM-DD"),
+                "user_notes": st.column_config.TextColumn("Notes"),
+                "tags": st.column_config.TextColumn("Tags"),
+                "id": None, 
+                "raw_data": None,
+                "status": None,
+                "edited_at": None
+            },
+            hide_index=True,
+            use_container_width=True,
+            num_rows="fixed", # Don't allow adding rows here, only editing
+            key=editor_key
+        )
+
+        if st.button("💾 Save Updates"):
+            # Only rows that actually changed are written; they are stamped
+            # edited_at so a later ML re-score leaves them alone.
+            editable_columns = ['category', 'user_notes', 'tags', 'type', 'date', 'amount']
+            before = filtered_df[editable_columns].astype(str)
+            after = edited_search_df[editable_columns].astype(str)
+            changed_df = edited_search_df[(before != after).any(axis=1)]
+
+            rows = []
+            for idx, row in changed_df.iterrows():
+                # Sanitize tags
+                raw_tags = row.get('tags', '')
+                tags_str = str(raw_tags) if raw_tags is not None else ''
+                rows.append({
+                    'id': row['id'],
+                    'category': row['category'],
+                    'user_notes': row['user_notes'],
+                    'tags': tags_str,
+                    'type': row['type'],
+                    'date': row['date'].strftime('%Y-%m-%d'),
+                    'amount': row['amount'],
+                })
+
+            count = db.update_transaction_details(rows)
+            bump_data_version()
+            st.success(f"Updated {count} transactions!")
+            st.rerun()
+    else:
+        # Read Only for Viewers
+        st.dataframe(
+            filtered_df,
+            column_config={
+                "amount": st.column_config.NumberColumn("Amount", format="$%.2f"),
+                "id": None,
+                "raw_data": None
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+
+
+def render_search():
     st.header("🔍 Transaction Search")
     
-    all_df = db.get_all_transactions()
-    if not all_df.empty:
-        # Ensure dates are datetime
-        all_df['date'] = pd.to_datetime(all_df['date'], format='mixed')
-        
+    filter_options = load_search_filter_options(data_version())
+    if filter_options['min_date']:
         # Search Filters
         col1, col2, col3, col4 = st.columns(4)
         with col1:
-            search_term = st.text_input("Search Description/Notes", "")
+            search_term = st.text_input("Search Description/Notes/Tags", "")
         with col2:
-            search_cat = st.multiselect("Filter by Category", all_df['category'].unique())
+            search_cat = st.multiselect("Filter by Category", filter_options['categories'])
         with col3:
-            search_type = st.multiselect("Filter by Type", all_df['type'].unique())
+            search_type = st.multiselect("Filter by Type", filter_options['types'])
         with col4:
-            min_date = all_df['date'].min()
-            max_date = all_df['date'].max()
+            min_date = pd.to_datetime(filter_options['min_date'], format='mixed').date()
+            max_date = pd.to_datetime(filter_options['max_date'], format='mixed').date()
             date_range = st.date_input("Date Range", [min_date, max_date])
 
-        # Apply Filters
-        filtered_df = all_df.copy()
-        
-        if not SHOW_SENSITIVE:
-            filtered_df = filtered_df[~filtered_df['type'].isin(['Income', 'Investment'])]
-        
-        if search_term:
-            filtered_df = filtered_df[
-                filtered_df['description'].str.contains(search_term, case=False, na=False) | 
-                filtered_df['user_notes'].str.contains(search_term, case=False, na=False)
-            ]
-            
-        if search_cat:
-            filtered_df = filtered_df[filtered_df['category'].isin(search_cat)]
-            
-        if search_type:
-            filtered_df = filtered_df[filtered_df['type'].isin(search_type)]
-            
-        if len(date_range) == 2:
-            start_d, end_d = date_range
-            filtered_df = filtered_df[
-                (filtered_df['date'].dt.date >= start_d) & 
-                (filtered_df['date'].dt.date <= end_d)
-            ]
-
-        # Summary of Selection
-        # Calculate Expense Total (Net of Reimbursements)
-        non_expense_cats = ['Transfer', 'Brokerage', 'Roth IRA', 'Credit Card Payment']
-        gross_search_exp = filtered_df[
-            (filtered_df['type'] == 'Expense') & 
-            (~filtered_df['category'].isin(non_expense_cats))
-        ]['amount'].sum()
-        
-        search_reimb = filtered_df[
-            (filtered_df['type'] == 'Reimbursement') & 
-            (~filtered_df['category'].isin(non_expense_cats))
-        ]['amount'].sum()
-        
-        expense_total = gross_search_exp - search_reimb
-        
-        st.caption(f"Showing {len(filtered_df)} transactions. Total Spending (Net Expenses): **${expense_total:,.2f}**")
+        # Filters run in the database against the full-text index.
+        start_d, end_d = date_range if len(date_range) == 2 else (None, None)
+        search_filters = {
+            'text': search_term,
+            'categories': list(search_cat),
+            'types': list(search_type),
+            'start_date': start_d,
+            'end_date': end_d,
+            'exclude_types': [] if SHOW_SENSITIVE else ['Income', 'Investment'],
+        }
+
+        # Keyset pagination: remember the (date, id) cursor that starts each
+        # page, and go back to page one whenever the filters change.
+        page_size = st.selectbox("Rows per page", [50, 100, 250, 500], index=1, key="search_page_size")
+        filter_signature = (repr(search_filters), page_size)
+        if st.session_state.get('search_filter_signature') != filter_signature:
+            st.session_state['search_filter_signature'] = filter_signature
+            st.session_state['search_cursors'] = [None]
+        cursors = st.session_state['search_cursors']
+        filtered_df, next_cursor = load_search_page(data_version(), search_filters, page_size, cursors[-1])
+        filtered_df['date'] = pd.to_datetime(filtered_df['date'], format='mixed')
+
+        # Summary of Selection: one aggregate query over every matching row,
+        # not just the visible page. Net expenses subtract reimbursements.
+        totals = load_search_totals(data_version(), search_filters)
+        page_number = len(cursors)
+        page_count = max(math.ceil(totals['count'] / page_size), 1)
+        st.caption(
+            f"Showing {len(filtered_df)} of {totals['count']} transactions (page {page_number} of {page_count}). "
+            f"Total Spending (Net Expenses): **${totals['net_expense']:,.2f}**"
+        )
+        prev_col, next_col, _spacer = st.columns([1, 1, 6])
+        with prev_col:
+            if st.button("◀ Previous", disabled=page_number == 1, key="search_prev_page"):
+                cursors.pop()
+                st.rerun()
+        with next_col:
+            if st.button("Next ▶", disabled=next_cursor is None, key="search_next_page"):
+                cursors.append(next_cursor)
+                st.rerun()
 
         # ---------------------------------------------------------
         # DATA EDITOR (The "Update Data" Section)
         # ---------------------------------------------------------
         st.info("💡 You can edit transactions directly below. Click 'Save Updates' to apply changes.")
         
-        # We use a key based on filters to reset state if filters change (optional, but safer)
-        # Actually, let's keep it persistent so they don't lose edits.
-        
-        if ROLE == 'admin':
-            edited_search_df = st.data_editor(
-                filtered_df,
-                column_config={
-                    "category": st.column_config.SelectboxColumn(
-                        "Category",
-                        options=[
-                            "Salary", "Interest Income", "Gift Income", "Rewards",
-                            "Restaurants", "Fast Food", "Groceries", "Health", "Entertainment", "Travel",
-                            "Gift Expense", "Gas", "Commute", "Subscriptions", "Personal Care",
-                            "Shopping", "Supplies", "Phone", "Misc Expense", "Pass-Through (Reimbursed)",
-                            "Misc Income", "Transfer",
-                            "Brokerage", "Roth IRA",
-                            "Donation"
-                        ],
-                        required=True
-                    ),
-                    "type": st.column_config.SelectboxColumn(
-                        "Type",
-                        options=["Expense", "Income", "Reimbursement", "Investment", "Transfer"],
-                        required=True
-                    ),
-                    "amount": st.column_config.NumberColumn("Amount", format="$%.2f"),
-                    "date": st.column_config.DateColumn("Date", format="YYYY-MM-DD"),
-                    "user_notes": st.column_config.TextColumn("Notes"),
-                    "tags": st.column_config.TextColumn("Tags"),
-                    "id": None, 
-                    "raw_data": None,
-                    "status": None
-                },
-                hide_index=True,
-                use_container_width=True,
-                num_rows="fixed", # Don't allow adding rows here, only editing
-                key="search_editor"
-            )
-            
-            if st.button("💾 Save Updates"):
-                # Detect changes.
-                conn = db.get_connection()
-                c = conn.cursor()
-                count = 0
-                
-                # We iterate over the EDITED dataframe
-                for idx, row in edited_search_df.iterrows():
-                    # We need the ID to match
-                    tx_id = row['id']
-                    
-                    # Sanitize tags
-                    raw_tags = row.get('tags', '')
-                    tags_str = str(raw_tags) if raw_tags is not None else ''
-
-                    ph = '%s' if db.is_postgres() else '?'
-                    c.execute(f'''
-                        UPDATE transactions 
-                        SET category = {ph}, user_notes = {ph}, tags = {ph}, type = {ph}, date = {ph}, amount = {ph}
-                        WHERE id = {ph}
-                    ''', (
-                        row['category'], 
-                        row['user_notes'], 
-                        tags_str,
-                        row['type'],
-                        row['date'].strftime('%Y-%m-%d'), 
-                        row['amount'],
-                        tx_id
-                    ))
-                    count += 1
-                    
-                conn.commit()
-                conn.close()
-                st.success(f"Updated {count} transactions!")
-                st.rerun()
-        else:
-            # Read Only for Viewers
-            st.dataframe(
-                filtered_df,
-                column_config={
-                    "amount": st.column_config.NumberColumn("Amount", format="$%.2f"),
-                    "id": None,
-                    "raw_data": None
-                },
-                use_container_width=True,
-                hide_index=True
-            )
+        # A fresh editor key per data version, filter, and page so pending edits
+        # never carry over to other rows.
+        render_search_editor(
+            filtered_df,
+            editor_key=f"search_editor_{data_version()}_{abs(hash(filter_signature))}_{page_number}",
+        )
+
+
+# ---------------------------------------------------------
+# NAVIGATION
+# ---------------------------------------------------------
+# st.tabs runs every tab body on each rerun; a radio only runs the selected view.
+VIEWS = {
+    "📥 Inbox": render_inbox,
+    "🔌 Connections": render_connections,
+    "📈 Trends": render_dashboard,
+    "💰 Net Worth": render_net_worth,
+    "🔎 Search": render_search,
+}
+if st.session_state.get('active_view') not in VIEWS:
+    st.session_state['active_view'] = next(iter(VIEWS))
+active_view = st.radio(
+    "View",
+    list(VIEWS),
+    horizontal=True,
+    label_visibility="collapsed",
+    key="active_view",
+)
+VIEWS[active_view]()
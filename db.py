@@ -1,6 +1,7 @@
 import sqlite3
 import pandas as pd
 import hashlib
+import json
 import os
 import re
 from datetime import datetime
@@ -117,7 +118,8 @@ def init_db():
                 ml_type_confidence REAL,
                 reviewed_at TEXT,
                 reviewed_by TEXT,
-                review_source TEXT
+                review_source TEXT,
+                edited_at TEXT
             );
         ''')
         
@@ -157,7 +159,8 @@ def init_db():
                 balance_accounts_seen INTEGER,
                 sync_start_date TEXT,
                 sync_end_date TEXT,
-                error TEXT
+                error TEXT,
+                auto_approved INTEGER
             );
         ''')
         c.execute('''
@@ -175,6 +178,20 @@ def init_db():
                 balance REAL,
                 currency TEXT,
                 health_status TEXT,
+                connection TEXT,
+                error TEXT
+            );
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS sync_connection_results (
+                id SERIAL PRIMARY KEY,
+                sync_run_id INTEGER REFERENCES sync_runs(id),
+                connection TEXT,
+                access_key TEXT,
+                status TEXT,
+                accounts_seen INTEGER,
+                transactions_seen INTEGER,
+                fetch_seconds REAL,
                 error TEXT
             );
         ''')
@@ -199,6 +216,47 @@ def init_db():
                 UNIQUE(bank, account)
             );
         ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS simplefin_request_budget (
+                access_key TEXT,
+                budget_date TEXT,
+                request_count INTEGER DEFAULT 0,
+                throttled_count INTEGER DEFAULT 0,
+                last_status INTEGER,
+                last_source TEXT,
+                retry_after_until TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (access_key, budget_date)
+            );
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS simplefin_response_cache (
+                access_key TEXT,
+                fetched_at DOUBLE PRECISION,
+                start_ts BIGINT,
+                end_ts BIGINT,
+                balances_only BOOLEAN,
+                payload TEXT
+            );
+        ''')
+        c.execute("CREATE INDEX IF NOT EXISTS idx_simplefin_response_cache_key ON simplefin_response_cache (access_key, fetched_at)")
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS sync_heartbeats (
+                name TEXT PRIMARY KEY,
+                pid INTEGER,
+                host TEXT,
+                status TEXT,
+                started_at TEXT,
+                last_beat_at TEXT,
+                interval_seconds INTEGER,
+                next_run_at TEXT,
+                last_sync_started_at TEXT,
+                last_sync_finished_at TEXT,
+                last_sync_status TEXT,
+                last_sync_run_id INTEGER,
+                last_error TEXT
+            );
+        ''')
         _ensure_pg_column(c, "transactions", "account", "TEXT")
         _ensure_pg_column(c, "transactions", "posted_date", "TEXT")
         _ensure_pg_column(c, "transactions", "details", "TEXT")
@@ -208,14 +266,19 @@ def init_db():
         _ensure_pg_column(c, "transactions", "reviewed_at", "TEXT")
         _ensure_pg_column(c, "transactions", "reviewed_by", "TEXT")
         _ensure_pg_column(c, "transactions", "review_source", "TEXT")
+        _ensure_pg_column(c, "transactions", "edited_at", "TEXT")
+        _ensure_pg_search_index(c)
+        c.execute("CREATE INDEX IF NOT EXISTS idx_transactions_status_date ON transactions (status, date)")
         _ensure_pg_column(c, "balance_history", "classification", "TEXT")
         _ensure_pg_column(c, "sync_runs", "sync_start_date", "TEXT")
         _ensure_pg_column(c, "sync_runs", "sync_end_date", "TEXT")
         _ensure_pg_column(c, "sync_runs", "balance_accounts_seen", "INTEGER")
+        _ensure_pg_column(c, "sync_runs", "auto_approved", "INTEGER")
         _ensure_pg_column(c, "sync_account_results", "latest_transaction_date", "TEXT")
         _ensure_pg_column(c, "sync_account_results", "balance", "REAL")
         _ensure_pg_column(c, "sync_account_results", "currency", "TEXT")
         _ensure_pg_column(c, "sync_account_results", "health_status", "TEXT")
+        _ensure_pg_column(c, "sync_account_results", "connection", "TEXT")
         _ensure_pg_column(c, "balance_snapshot_runs", "sync_run_id", "INTEGER")
         _ensure_pg_column(c, "balance_snapshot_runs", "account_count", "INTEGER")
         _ensure_pg_column(c, "balance_snapshot_runs", "status", "TEXT")
@@ -225,6 +288,19 @@ def init_db():
         _ensure_pg_column(c, "account_rules", "include_in_net_worth", "BOOLEAN")
         _ensure_pg_column(c, "account_rules", "notes", "TEXT")
         _ensure_pg_column(c, "account_rules", "updated_at", "TEXT")
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS expected_income_rules (
+                id SERIAL PRIMARY KEY,
+                name TEXT UNIQUE,
+                match_pattern TEXT,
+                tx_type TEXT DEFAULT 'Income',
+                lookback_months INTEGER DEFAULT 6,
+                enabled BOOLEAN DEFAULT TRUE,
+                notes TEXT,
+                updated_at TEXT
+            );
+        ''')
+        _seed_expected_income_rules(c)
     else:
         # SQLite DDL
         c.execute('''
@@ -248,7 +324,8 @@ def init_db():
                 ml_type_confidence REAL,
                 reviewed_at TEXT,
                 reviewed_by TEXT,
-                review_source TEXT
+                review_source TEXT,
+                edited_at TEXT
             )
         ''')
         _ensure_sqlite_column(c, "transactions", "tags", "TEXT")
@@ -261,6 +338,9 @@ def init_db():
         _ensure_sqlite_column(c, "transactions", "reviewed_at", "TEXT")
         _ensure_sqlite_column(c, "transactions", "reviewed_by", "TEXT")
         _ensure_sqlite_column(c, "transactions", "review_source", "TEXT")
+        _ensure_sqlite_column(c, "transactions", "edited_at", "TEXT")
+        _ensure_sqlite_search_index(c)
+        c.execute("CREATE INDEX IF NOT EXISTS idx_transactions_status_date ON transactions (status, date)")
 
         c.execute('''
             CREATE TABLE IF NOT EXISTS balance_history (
@@ -303,12 +383,14 @@ def init_db():
                 balance_accounts_seen INTEGER,
                 sync_start_date TEXT,
                 sync_end_date TEXT,
-                error TEXT
+                error TEXT,
+                auto_approved INTEGER
             )
         ''')
         _ensure_sqlite_column(c, "sync_runs", "sync_start_date", "TEXT")
         _ensure_sqlite_column(c, "sync_runs", "sync_end_date", "TEXT")
         _ensure_sqlite_column(c, "sync_runs", "balance_accounts_seen", "INTEGER")
+        _ensure_sqlite_column(c, "sync_runs", "auto_approved", "INTEGER")
         c.execute('''
             CREATE TABLE IF NOT EXISTS sync_account_results (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -324,6 +406,7 @@ def init_db():
                 balance REAL,
                 currency TEXT,
                 health_status TEXT,
+                connection TEXT,
                 error TEXT
             )
         ''')
@@ -331,6 +414,20 @@ def init_db():
         _ensure_sqlite_column(c, "sync_account_results", "balance", "REAL")
         _ensure_sqlite_column(c, "sync_account_results", "currency", "TEXT")
         _ensure_sqlite_column(c, "sync_account_results", "health_status", "TEXT")
+        _ensure_sqlite_column(c, "sync_account_results", "connection", "TEXT")
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS sync_connection_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sync_run_id INTEGER,
+                connection TEXT,
+                access_key TEXT,
+                status TEXT,
+                accounts_seen INTEGER,
+                transactions_seen INTEGER,
+                fetch_seconds REAL,
+                error TEXT
+            )
+        ''')
         c.execute('''
             CREATE TABLE IF NOT EXISTS ml_artifacts (
                 name TEXT PRIMARY KEY,
@@ -352,11 +449,65 @@ def init_db():
                 UNIQUE(bank, account)
             )
         ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS simplefin_request_budget (
+                access_key TEXT,
+                budget_date TEXT,
+                request_count INTEGER DEFAULT 0,
+                throttled_count INTEGER DEFAULT 0,
+                last_status INTEGER,
+                last_source TEXT,
+                retry_after_until TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (access_key, budget_date)
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS simplefin_response_cache (
+                access_key TEXT,
+                fetched_at REAL,
+                start_ts INTEGER,
+                end_ts INTEGER,
+                balances_only INTEGER,
+                payload TEXT
+            )
+        ''')
+        c.execute("CREATE INDEX IF NOT EXISTS idx_simplefin_response_cache_key ON simplefin_response_cache (access_key, fetched_at)")
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS sync_heartbeats (
+                name TEXT PRIMARY KEY,
+                pid INTEGER,
+                host TEXT,
+                status TEXT,
+                started_at TEXT,
+                last_beat_at TEXT,
+                interval_seconds INTEGER,
+                next_run_at TEXT,
+                last_sync_started_at TEXT,
+                last_sync_finished_at TEXT,
+                last_sync_status TEXT,
+                last_sync_run_id INTEGER,
+                last_error TEXT
+            )
+        ''')
         _ensure_sqlite_column(c, "account_rules", "classification", "TEXT")
         _ensure_sqlite_column(c, "account_rules", "include_in_inbox", "INTEGER")
         _ensure_sqlite_column(c, "account_rules", "include_in_net_worth", "INTEGER")
         _ensure_sqlite_column(c, "account_rules", "notes", "TEXT")
         _ensure_sqlite_column(c, "account_rules", "updated_at", "TEXT")
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS expected_income_rules (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE,
+                match_pattern TEXT,
+                tx_type TEXT DEFAULT 'Income',
+                lookback_months INTEGER DEFAULT 6,
+                enabled INTEGER DEFAULT 1,
+                notes TEXT,
+                updated_at TEXT
+            )
+        ''')
+        _seed_expected_income_rules(c)
     
     conn.commit()
     conn.close()
@@ -373,6 +524,60 @@ def _ensure_pg_column(cursor, table, column, column_type):
     cursor.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {column_type}")
 
 
+SEARCH_COLUMNS = ['description', 'user_notes', 'tags', 'details']
+# Postgres indexes this expression directly, so SELECT * never returns a tsvector.
+PG_SEARCH_DOCUMENT = "to_tsvector('simple', " + " || ' ' || ".join(
+    f"COALESCE({column}, '')" for column in SEARCH_COLUMNS
+) + ")"
+
+
+def _ensure_pg_search_index(cursor):
+    cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_transactions_search ON transactions USING GIN ({PG_SEARCH_DOCUMENT})")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date_id ON transactions (date, id)")
+
+
+def _ensure_sqlite_search_index(cursor):
+    """
+    Creates the (date, id) pagination index and the transactions_fts FTS5
+    index over the search columns, kept in sync by triggers on every insert,
+    update, and delete. Existing rows are indexed the first time. SQLite
+    builds without FTS5 fall back to LIKE.
+    """
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date_id ON transactions (date, id)")
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions_fts'")
+    if cursor.fetchone():
+        return
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{column}" for column in SEARCH_COLUMNS)
+    old_values = ", ".join(f"old.{column}" for column in SEARCH_COLUMNS)
+    try:
+        cursor.execute(f'''
+            CREATE VIRTUAL TABLE transactions_fts USING fts5(
+                {columns}, content='transactions', content_rowid='rowid'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        print(f"⚠️ SQLite FTS5 unavailable, search falls back to LIKE: {e}")
+        return
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS transactions_fts_insert AFTER INSERT ON transactions BEGIN
+            INSERT INTO transactions_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS transactions_fts_delete AFTER DELETE ON transactions BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS transactions_fts_update AFTER UPDATE OF {columns} ON transactions BEGIN
+            INSERT INTO transactions_fts (transactions_fts, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+            INSERT INTO transactions_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+        END
+    ''')
+    cursor.execute("INSERT INTO transactions_fts (transactions_fts) VALUES ('rebuild')")
+
+
 def ensure_ml_artifacts_table():
     conn = get_connection()
     c = conn.cursor()
@@ -486,6 +691,137 @@ def upsert_account_rules(rules):
     conn.close()
     return count
 
+
+DEFAULT_EXPECTED_INCOME_RULES = [
+    {
+        'name': 'E*Trade salary',
+        'match_pattern': 'E*Trade',
+        'tx_type': 'Income',
+        'lookback_months': 6,
+        'notes': 'Salary/RSU/ESPP income entered from E*Trade each month.',
+    },
+]
+
+
+def _seed_expected_income_rules(cursor):
+    # Only an empty table is seeded, so deleting the default rule sticks.
+    cursor.execute("SELECT COUNT(*) FROM expected_income_rules")
+    if cursor.fetchone()[0]:
+        return
+    ph = '%s' if is_postgres() else '?'
+    updated_at = datetime.now().isoformat(timespec="seconds")
+    for rule in DEFAULT_EXPECTED_INCOME_RULES:
+        cursor.execute(f'''
+            INSERT INTO expected_income_rules (name, match_pattern, tx_type, lookback_months, notes, updated_at)
+            VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+        ''', (rule['name'], rule['match_pattern'], rule['tx_type'], rule['lookback_months'], rule['notes'], updated_at))
+
+
+def get_expected_income_rules():
+    conn = get_connection()
+    try:
+        return pd.read_sql_query('''
+            SELECT name, match_pattern, tx_type, lookback_months, enabled, notes, updated_at
+            FROM expected_income_rules
+            ORDER BY name
+        ''', conn)
+    finally:
+        conn.close()
+
+
+def replace_expected_income_rules(rules):
+    """Replaces every expected-income rule with `rules` in one transaction. Returns rules saved."""
+    ph = '%s' if is_postgres() else '?'
+    updated_at = datetime.now().isoformat(timespec="seconds")
+    values = []
+    for rule in rules:
+        name = clean_text(rule.get("name"))
+        match_pattern = clean_text(rule.get("match_pattern"))
+        if not name or not match_pattern:
+            continue
+        try:
+            lookback_months = max(int(rule.get("lookback_months") or 6), 1)
+        except (TypeError, ValueError):
+            lookback_months = 6
+        enabled = _coerce_rule_bool(rule.get("enabled"))
+        values.append((
+            name,
+            match_pattern,
+            clean_text(rule.get("tx_type")) or 'Income',
+            lookback_months,
+            True if enabled is None else enabled,
+            clean_text(rule.get("notes")),
+            updated_at,
+        ))
+    conn = get_connection()
+    try:
+        c = conn.cursor()
+        c.execute("DELETE FROM expected_income_rules")
+        c.executemany(f'''
+            INSERT INTO expected_income_rules
+                (name, match_pattern, tx_type, lookback_months, enabled, notes, updated_at)
+            VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+        ''', values)
+        conn.commit()
+    finally:
+        conn.close()
+    return len(values)
+
+
+def find_expected_income_gaps(today=None, months=None):
+    """
+    Months with no matching income for each enabled expected-income rule.
+
+    A rule matches transactions of its `tx_type` whose account or method
+    contains `match_pattern` (case-insensitive). Each rule looks back over its
+    own `lookback_months` full months before the current one, or `months`
+    when given. One grouped query covers every rule. Returns
+    [{'name', 'match_pattern', 'missing': ['YYYY-MM', ...]}] for rules with gaps,
+    newest month first.
+    """
+    ph = '%s' if is_postgres() else '?'
+    # A plain substring test, so % and _ in a pattern are literal characters.
+    position = 'STRPOS' if is_postgres() else 'INSTR'
+    current_month = pd.Timestamp(today or datetime.now()).to_period('M')
+    rules = get_expected_income_rules()
+    rules = rules[rules['enabled'].map(_coerce_rule_bool) != False]
+    if rules.empty:
+        return []
+    lookbacks = {
+        row.name: int(months or row.lookback_months or 6)
+        for row in rules.itertuples(index=False)
+    }
+    window_start = current_month - max(lookbacks.values())
+
+    conn = get_connection()
+    try:
+        found = pd.read_sql_query(f'''
+            SELECT r.name AS name, SUBSTR(t.date, 1, 7) AS month
+            FROM expected_income_rules r
+            JOIN transactions t
+              ON t.type = r.tx_type
+             AND ({position}(LOWER(COALESCE(t.account, '')), LOWER(r.match_pattern)) > 0
+                  OR {position}(LOWER(COALESCE(t.method, '')), LOWER(r.match_pattern)) > 0)
+            WHERE t.date >= {ph} AND t.date < {ph}
+              AND r.name IN ({', '.join([ph] * len(lookbacks))})
+            GROUP BY r.name, SUBSTR(t.date, 1, 7)
+        ''', conn, params=[
+            window_start.start_time.strftime('%Y-%m-%d'),
+            current_month.start_time.strftime('%Y-%m-%d'),
+            *lookbacks,
+        ])
+    finally:
+        conn.close()
+
+    found_months = found.groupby('name')['month'].agg(set).to_dict() if not found.empty else {}
+    gaps = []
+    for row in rules.itertuples(index=False):
+        expected = [str(current_month - offset) for offset in range(1, lookbacks[row.name] + 1)]
+        missing = [month for month in expected if month not in found_months.get(row.name, set())]
+        if missing:
+            gaps.append({'name': row.name, 'match_pattern': row.match_pattern, 'missing': missing})
+    return gaps
+
 def generate_id(row):
     # Create a deterministic ID to avoid duplicates
     raw_data = row.get('raw_data', None)
@@ -750,6 +1086,107 @@ def upsert_transactions(df):
     conn.close()
     return count
 
+
+TRANSACTION_INSERT_COLUMNS = [
+    'id', 'date', 'amount', 'description', 'category', 'type', 'method', 'status', 'user_notes', 'tags', 'raw_data',
+    'account', 'posted_date', 'details', 'ml_confidence', 'ml_category_confidence', 'ml_type_confidence',
+    'reviewed_at', 'reviewed_by', 'review_source',
+]
+ID_LOOKUP_BATCH_SIZE = 500
+
+
+def get_venmo_import_keys(start_date, end_date):
+    """
+    (date, description, amount in cents) for every Venmo-sourced row between
+    two dates: the same match venmo_duplicate_matches_existing runs per row,
+    answered for a whole statement with one query.
+    """
+    ph = '%s' if is_postgres() else '?'
+    conn = get_connection()
+    try:
+        df = pd.read_sql_query(f'''
+            SELECT date, description, amount
+            FROM transactions
+            WHERE date >= {ph} AND date <= {ph}
+              AND (account = {ph} OR method = {ph})
+        ''', conn, params=(start_date, end_date, 'Venmo', 'Venmo'))
+    finally:
+        conn.close()
+    cents = pd.to_numeric(df['amount'], errors='coerce').mul(100).round()
+    return {
+        (str(date), str(description), int(amount))
+        for date, description, amount in zip(df['date'], df['description'], cents)
+        if not pd.isna(amount)
+    }
+
+
+def insert_new_transactions(df):
+    """
+    Bulk insert for rows the caller has already de-duplicated by content:
+    one id lookup per batch and one executemany, instead of the per-row
+    duplicate queries upsert_transactions runs. Every row needs an id;
+    existing ids are left alone. Returns rows inserted.
+    """
+    if df.empty:
+        return 0
+    df = df.drop_duplicates('id')
+    ids = df['id'].astype(str).tolist()
+    ph = '%s' if is_postgres() else '?'
+    conn = get_connection()
+    c = conn.cursor()
+    try:
+        existing = set()
+        for start in range(0, len(ids), ID_LOOKUP_BATCH_SIZE):
+            batch = ids[start:start + ID_LOOKUP_BATCH_SIZE]
+            c.execute(
+                f"SELECT id FROM transactions WHERE id IN ({','.join(ph for _ in batch)})",
+                batch,
+            )
+            existing.update(str(row[0]) for row in c.fetchall())
+
+        columns = df.columns.tolist()
+        rows = []
+        for values in zip(*(df[column].tolist() for column in columns)):
+            record = dict(zip(columns, values))
+            if str(record['id']) in existing:
+                continue
+            rows.append((
+                str(record['id']),
+                record['date'],
+                record['amount'],
+                record['description'],
+                record.get('category', 'Uncategorized'),
+                record.get('type', 'Expense'),
+                record.get('method', 'Unknown'),
+                record.get('status', 'PENDING'),
+                record.get('user_notes', ''),
+                record.get('tags', ''),
+                record.get('raw_data', str(record)),
+                record.get('account', None),
+                record.get('posted_date', None),
+                record.get('details', None),
+                record.get('ml_confidence', None),
+                record.get('ml_category_confidence', None),
+                record.get('ml_type_confidence', None),
+                *get_review_audit_values(record),
+            ))
+        if not rows:
+            return 0
+
+        columns = ', '.join(TRANSACTION_INSERT_COLUMNS)
+        values = ', '.join(ph for _ in TRANSACTION_INSERT_COLUMNS)
+        if is_postgres():
+            c.executemany(
+                f"INSERT INTO transactions ({columns}) VALUES ({values}) ON CONFLICT (id) DO NOTHING",
+                rows,
+            )
+        else:
+            c.executemany(f"INSERT OR IGNORE INTO transactions ({columns}) VALUES ({values})", rows)
+        conn.commit()
+        return len(rows)
+    finally:
+        conn.close()
+
 def get_pending_transactions():
     conn = get_connection()
     q = "SELECT * FROM transactions WHERE status='PENDING' ORDER BY date DESC"
@@ -762,6 +1199,47 @@ def get_pending_transactions():
     conn.close()
     return df
 
+INBOX_COLUMNS = [
+    'id', 'date', 'account', 'type', 'amount', 'category', 'description', 'user_notes', 'tags', 'ml_confidence',
+]
+INBOX_SORTS = {'date': 'date', 'amount': 'amount', 'confidence': 'ml_confidence', 'account': 'account'}
+DEFAULT_INBOX_PAGE_SIZE = 100
+
+
+def count_pending_transactions():
+    """Pending row count, answered from the (status, date) index."""
+    conn = get_connection()
+    try:
+        c = conn.cursor()
+        c.execute("SELECT COUNT(*) FROM transactions WHERE status = 'PENDING'")
+        return int(c.fetchone()[0])
+    finally:
+        conn.close()
+
+
+def get_pending_page(sort='date', descending=True, page=1, page_size=DEFAULT_INBOX_PAGE_SIZE):
+    """
+    One page of PENDING rows with only the Inbox display columns, sorted in
+    the database by date, amount, confidence, or account. Blank sort values
+    go last in either direction, and id breaks ties so pages never overlap.
+    """
+    if sort not in INBOX_SORTS:
+        raise ValueError(f"Unknown Inbox sort: {sort}")
+    ph = '%s' if is_postgres() else '?'
+    column = INBOX_SORTS[sort]
+    direction = 'DESC' if descending else 'ASC'
+    conn = get_connection()
+    try:
+        return pd.read_sql_query(f'''
+            SELECT {", ".join(INBOX_COLUMNS)}
+            FROM transactions
+            WHERE status = 'PENDING'
+            ORDER BY ({column} IS NULL), {column} {direction}, id {direction}
+            LIMIT {ph} OFFSET {ph}
+        ''', conn, params=[int(page_size), (max(int(page), 1) - 1) * int(page_size)])
+    finally:
+        conn.close()
+
 def get_all_transactions():
     conn = get_connection()
     q = "SELECT * FROM transactions ORDER BY date DESC"
@@ -769,6 +1247,410 @@ def get_all_transactions():
     conn.close()
     return df
 
+def search_terms(text):
+    """Word tokens from a free-text search box; punctuation never reaches the query parser."""
+    return re.findall(r"\w+", str(text or "").lower())
+
+
+def _sqlite_has_search_index(cursor):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'transactions_fts'")
+    return cursor.fetchone() is not None
+
+
+def _search_clauses(cursor, text=None, categories=None, types=None, start_date=None, end_date=None,
+                    exclude_types=None):
+    """
+    Builds the FROM source, WHERE clause, bound parameters, and rank
+    expression (with its own parameters) shared by the search queries. Every
+    search word must match as a word prefix in description, notes, tags, or
+    details.
+    """
+    ph = '%s' if is_postgres() else '?'
+    source = "transactions t"
+    where = []
+    params = []
+    rank, rank_params = None, []
+
+    terms = search_terms(text)
+    if terms and is_postgres():
+        query = " & ".join(f"{term}:*" for term in terms)
+        document = PG_SEARCH_DOCUMENT.replace("COALESCE(", "COALESCE(t.")
+        where.append(f"{document} @@ to_tsquery('simple', {ph})")
+        params.append(query)
+        rank, rank_params = f"ts_rank({document}, to_tsquery('simple', {ph}))", [query]
+    elif terms and _sqlite_has_search_index(cursor):
+        source = "transactions_fts JOIN transactions t ON t.rowid = transactions_fts.rowid"
+        where.append(f"transactions_fts MATCH {ph}")
+        params.append(" ".join(f'"{term}"*' for term in terms))
+        # bm25 is lower for better matches; negate so both backends rank descending.
+        rank = "-bm25(transactions_fts)"
+    elif terms:
+        for term in terms:
+            where.append("(" + " OR ".join(
+                f"LOWER(COALESCE(t.{column}, '')) LIKE {ph}" for column in SEARCH_COLUMNS
+            ) + ")")
+            params.extend([f"%{term}%"] * len(SEARCH_COLUMNS))
+
+    for column, values in (('category', categories), ('type', types)):
+        if values:
+            where.append(f"t.{column} IN ({', '.join([ph] * len(values))})")
+            params.extend(values)
+    if exclude_types:
+        # NOT IN alone is never true for NULL, which would hide untyped rows.
+        where.append(f"(t.type IS NULL OR t.type NOT IN ({', '.join([ph] * len(exclude_types))}))")
+        params.extend(exclude_types)
+    if start_date:
+        where.append(f"t.date >= {ph}")
+        params.append(str(pd.Timestamp(start_date).date()))
+    if end_date:
+        # Dates may carry a time, so compare against the start of the next day.
+        where.append(f"t.date < {ph}")
+        params.append(str((pd.Timestamp(end_date) + pd.Timedelta(days=1)).date()))
+
+    where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+    return source, where_sql, params, rank, rank_params
+
+
+def search_transactions(text=None, categories=None, types=None, start_date=None, end_date=None,
+                        exclude_types=None, limit=None):
+    """
+    Transactions matching the search text and filters, filtered in the
+    database through SQLite FTS5 or a GIN-indexed Postgres tsvector. Text
+    matches are ranked best first, then newest first.
+    """
+    ph = '%s' if is_postgres() else '?'
+    conn = get_connection()
+    try:
+        source, where_sql, params, rank, rank_params = _search_clauses(
+            conn.cursor(), text, categories, types, start_date, end_date, exclude_types
+        )
+        order = "t.date DESC, t.id DESC"
+        if rank:
+            order = f"{rank} DESC, {order}"
+        query = f"SELECT t.* FROM {source} {where_sql} ORDER BY {order}"
+        params = params + rank_params
+        if limit:
+            query += f" LIMIT {ph}"
+            params.append(int(limit))
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+
+DEFAULT_SEARCH_PAGE_SIZE = 100
+SEARCH_NON_EXPENSE_CATEGORIES = ['Transfer', 'Brokerage', 'Roth IRA', 'Credit Card Payment']
+
+
+def search_transactions_page(text=None, categories=None, types=None, start_date=None, end_date=None,
+                             exclude_types=None, page_size=DEFAULT_SEARCH_PAGE_SIZE, after=None):
+    """
+    One page of search results, newest first, using keyset pagination on
+    (date, id): `after` is the (date, id) of the previous page's last row.
+    Returns (page, next_cursor); next_cursor is None on the last page.
+    """
+    ph = '%s' if is_postgres() else '?'
+    conn = get_connection()
+    try:
+        source, where_sql, params, _rank, _rank_params = _search_clauses(
+            conn.cursor(), text, categories, types, start_date, end_date, exclude_types
+        )
+        if after:
+            keyset = f"(t.date < {ph} OR (t.date = {ph} AND t.id < {ph}))"
+            where_sql = f"{where_sql} AND {keyset}" if where_sql else f"WHERE {keyset}"
+            params = params + [after[0], after[0], after[1]]
+        # One extra row tells us whether another page exists.
+        page = pd.read_sql_query(
+            f"SELECT t.* FROM {source} {where_sql} ORDER BY t.date DESC, t.id DESC LIMIT {ph}",
+            conn,
+            params=params + [int(page_size) + 1],
+        )
+    finally:
+        conn.close()
+    if len(page) <= page_size:
+        return page, None
+    page = page.iloc[:page_size]
+    last = page.iloc[-1]
+    return page, (last['date'], last['id'])
+
+
+def search_totals(text=None, categories=None, types=None, start_date=None, end_date=None, exclude_types=None):
+    """
+    Count and net expense (expenses minus reimbursements, excluding transfers
+    and investments) over every row matching the search, in one aggregate query.
+    """
+    ph = '%s' if is_postgres() else '?'
+    excluded = ", ".join([ph] * len(SEARCH_NON_EXPENSE_CATEGORIES))
+    conn = get_connection()
+    try:
+        c = conn.cursor()
+        source, where_sql, params, _rank, _rank_params = _search_clauses(
+            c, text, categories, types, start_date, end_date, exclude_types
+        )
+        c.execute(f'''
+            SELECT
+                COUNT(*),
+                COALESCE(SUM(CASE WHEN t.type = 'Expense' AND COALESCE(t.category, '') NOT IN ({excluded})
+                                  THEN t.amount ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN t.type = 'Reimbursement' AND COALESCE(t.category, '') NOT IN ({excluded})
+                                  THEN t.amount ELSE 0 END), 0)
+            FROM {source} {where_sql}
+        ''', SEARCH_NON_EXPENSE_CATEGORIES + SEARCH_NON_EXPENSE_CATEGORIES + params)
+        count, gross_expense, reimbursements = c.fetchone()
+    finally:
+        conn.close()
+    return {
+        'count': int(count),
+        'gross_expense': float(gross_expense),
+        'reimbursements': float(reimbursements),
+        'net_expense': float(gross_expense) - float(reimbursements),
+    }
+
+
+def get_transaction_filter_options():
+    """Distinct categories and types plus the date span, for the Search filters."""
+    conn = get_connection()
+    try:
+        c = conn.cursor()
+        c.execute("SELECT DISTINCT category FROM transactions WHERE category IS NOT NULL ORDER BY category")
+        categories = [row[0] for row in c.fetchall()]
+        c.execute("SELECT DISTINCT type FROM transactions WHERE type IS NOT NULL ORDER BY type")
+        types = [row[0] for row in c.fetchall()]
+        c.execute("SELECT MIN(date), MAX(date) FROM transactions")
+        min_date, max_date = c.fetchone()
+        return {'categories': categories, 'types': types, 'min_date': min_date, 'max_date': max_date}
+    finally:
+        conn.close()
+
+
+AUTO_APPROVE_SOURCE = 'auto_ml'
+# Auto-approved rows only echo the model, so they are not labels until a
+# person re-reviews (new review_source) or edits (edited_at) them.
+CONFIRMED_FILTER = f"(review_source IS NULL OR review_source <> '{AUTO_APPROVE_SOURCE}' OR edited_at IS NOT NULL)"
+
+
+def get_reviewed_transactions_since(watermark=None):
+    """
+    Returns reviewed rows with reviewed_at at or after `watermark`, oldest
+    first, with only the columns the online model and similarity index use.
+    """
+    conn = get_connection()
+    ph = '%s' if is_postgres() else '?'
+    query = f'''
+        SELECT id, date, description, amount, type, category, reviewed_at
+        FROM transactions
+        WHERE reviewed_at IS NOT NULL AND {CONFIRMED_FILTER}
+    '''
+    params = ()
+    if watermark:
+        query += f" AND reviewed_at >= {ph}"
+        params = (watermark,)
+    query += " ORDER BY reviewed_at, id"
+    try:
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+TRAINING_COLUMNS = ['id', 'date', 'description', 'amount', 'type', 'category', 'status', 'reviewed_at']
+REVIEWED_FILTER = f"(UPPER(status) = 'REVIEWED' OR reviewed_at IS NOT NULL) AND {CONFIRMED_FILTER}"
+
+
+def count_transactions():
+    conn = get_connection()
+    try:
+        c = conn.cursor()
+        c.execute("SELECT COUNT(*) FROM transactions")
+        return int(c.fetchone()[0])
+    finally:
+        conn.close()
+
+
+def _training_frame(rows):
+    df = pd.DataFrame(rows, columns=TRAINING_COLUMNS)
+    df['amount'] = pd.to_numeric(df['amount'], errors='coerce').astype(float)
+    # Labels repeat heavily, so categoricals keep large histories small.
+    for column in ('type', 'category', 'status'):
+        df[column] = df[column].astype('category')
+    return df
+
+
+TRAINING_QUERY = f"SELECT {', '.join(TRAINING_COLUMNS)} FROM transactions WHERE {REVIEWED_FILTER} ORDER BY id"
+
+
+def iter_training_transactions(chunksize=5000):
+    """
+    Yields reviewed transactions in chunks with only the columns training
+    uses, for callers that can work a chunk at a time. Postgres streams
+    through a server-side cursor so the full result is never buffered
+    client-side.
+    """
+    conn = get_connection()
+    try:
+        if is_postgres():
+            c = conn.cursor(name='training_transactions')
+            c.itersize = chunksize
+        else:
+            c = conn.cursor()
+        c.execute(TRAINING_QUERY)
+        while True:
+            rows = c.fetchmany(chunksize)
+            if not rows:
+                break
+            yield _training_frame(rows)
+        c.close()
+    finally:
+        conn.close()
+
+
+def get_training_transactions():
+    """
+    Every reviewed transaction with only the training columns, read in one
+    query. The models fit on the whole set, so this holds the column-limited
+    history in memory once; it skips raw_data and the other wide columns.
+    """
+    conn = get_connection()
+    try:
+        c = conn.cursor()
+        c.execute(TRAINING_QUERY)
+        return _training_frame(c.fetchall())
+    finally:
+        conn.close()
+
+
+def get_review_label_counts():
+    """
+    Returns reviewed (description, type, category, raw_data, votes) groups for
+    the merchant cache; raw_data carries the bank's sign for each row.
+    """
+    conn = get_connection()
+    try:
+        return pd.read_sql_query(f'''
+            SELECT description, type, category, raw_data, COUNT(*) AS votes
+            FROM transactions
+            WHERE {REVIEWED_FILTER}
+            GROUP BY description, type, category, raw_data
+        ''', conn)
+    finally:
+        conn.close()
+
+RESCORE_COLUMNS = [
+    'id', 'description', 'amount', 'type', 'category', 'user_notes', 'raw_data',
+    'ml_confidence', 'ml_category_confidence', 'ml_type_confidence', 'edited_at',
+]
+
+
+def get_rescore_candidates():
+    """Returns PENDING rows with the columns needed to re-predict their ML suggestions."""
+    conn = get_connection()
+    try:
+        return pd.read_sql_query(
+            f"SELECT {', '.join(RESCORE_COLUMNS)} FROM transactions WHERE status = 'PENDING'",
+            conn,
+        )
+    finally:
+        conn.close()
+
+
+def update_ml_suggestions(rows):
+    """
+    Writes re-scored suggestions for PENDING rows in one batch. Rows edited
+    or reviewed since they were read are left alone. Returns rows updated.
+    """
+    if not rows:
+        return 0
+    conn = get_connection()
+    c = conn.cursor()
+    ph = '%s' if is_postgres() else '?'
+    c.executemany(f'''
+        UPDATE transactions
+        SET category = {ph},
+            type = {ph},
+            user_notes = {ph},
+            ml_confidence = {ph},
+            ml_category_confidence = {ph},
+            ml_type_confidence = {ph}
+        WHERE id = {ph} AND status = 'PENDING' AND edited_at IS NULL
+    ''', [
+        (
+            row['category'],
+            row['type'],
+            row['user_notes'],
+            row['ml_confidence'],
+            row['ml_category_confidence'],
+            row['ml_type_confidence'],
+            row['id'],
+        )
+        for row in rows
+    ])
+    # executemany sums rowcount across the batch; guarded rows count zero.
+    updated = max(c.rowcount, 0)
+    conn.commit()
+    conn.close()
+    return updated
+
+
+def update_transaction_details(rows):
+    """
+    Saves user edits to category, notes, tags, type, date, and amount and
+    stamps edited_at, so re-scoring never overwrites them. Returns rows updated.
+    """
+    if not rows:
+        return 0
+    conn = get_connection()
+    c = conn.cursor()
+    ph = '%s' if is_postgres() else '?'
+    edited_at = datetime.now().isoformat(timespec="seconds")
+    c.executemany(f'''
+        UPDATE transactions
+        SET category = {ph}, user_notes = {ph}, tags = {ph}, type = {ph}, date = {ph}, amount = {ph},
+            edited_at = {ph}
+        WHERE id = {ph}
+    ''', [
+        (
+            row['category'],
+            row['user_notes'],
+            row['tags'],
+            row['type'],
+            row['date'],
+            row['amount'],
+            edited_at,
+            row['id'],
+        )
+        for row in rows
+    ])
+    conn.commit()
+    conn.close()
+    return len(rows)
+
+
+def count_auto_approvals():
+    conn = get_connection()
+    try:
+        c = conn.cursor()
+        c.execute(
+            f"SELECT COUNT(*) FROM transactions WHERE review_source = '{AUTO_APPROVE_SOURCE}' AND UPPER(status) = 'REVIEWED'"
+        )
+        return int(c.fetchone()[0])
+    finally:
+        conn.close()
+
+
+def revert_auto_approvals():
+    """Sends every auto-approved row back to the Inbox in one statement. Returns rows reverted."""
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute(f'''
+        UPDATE transactions
+        SET status = 'PENDING',
+            reviewed_at = NULL,
+            reviewed_by = NULL,
+            review_source = NULL
+        WHERE review_source = '{AUTO_APPROVE_SOURCE}' AND UPPER(status) = 'REVIEWED'
+    ''')
+    count = c.rowcount
+    conn.commit()
+    conn.close()
+    return count
+
 def update_transaction_status(tx_ids, new_status='REVIEWED'):
     if not tx_ids:
         return
@@ -1097,15 +1979,16 @@ def save_sync_report(report):
         report.get('balance_accounts_seen', 0),
         report.get('sync_start_date'),
         report.get('sync_end_date'),
-        report.get('error', '')
+        report.get('error', ''),
+        report.get('auto_approved', 0)
     )
     if is_postgres():
         c.execute(f'''
             INSERT INTO sync_runs
             (started_at, finished_at, status, accounts_seen, accounts_included, accounts_skipped,
              transactions_seen, transactions_inserted, duplicates, balance_accounts_seen,
-             sync_start_date, sync_end_date, error)
-            VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+             sync_start_date, sync_end_date, error, auto_approved)
+            VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
             RETURNING id
         ''', values)
         sync_run_id = c.fetchone()[0]
@@ -1114,8 +1997,8 @@ def save_sync_report(report):
             INSERT INTO sync_runs
             (started_at, finished_at, status, accounts_seen, accounts_included, accounts_skipped,
              transactions_seen, transactions_inserted, duplicates, balance_accounts_seen,
-             sync_start_date, sync_end_date, error)
-            VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+             sync_start_date, sync_end_date, error, auto_approved)
+            VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
         ''', values)
         sync_run_id = c.lastrowid
 
@@ -1124,8 +2007,8 @@ def save_sync_report(report):
             INSERT INTO sync_account_results
             (sync_run_id, bank, account, included, skip_reason, transaction_count,
              inserted_count, duplicate_count, latest_transaction_date, balance, currency,
-             health_status, error)
-            VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+             health_status, connection, error)
+            VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
         ''', (
             sync_run_id,
             item.get('bank'),
@@ -1139,6 +2022,24 @@ def save_sync_report(report):
             item.get('balance', None),
             item.get('currency', ''),
             item.get('health_status', ''),
+            item.get('connection', ''),
+            item.get('error', '')
+        ))
+
+    for item in report.get('connections', []):
+        c.execute(f'''
+            INSERT INTO sync_connection_results
+            (sync_run_id, connection, access_key, status, accounts_seen, transactions_seen,
+             fetch_seconds, error)
+            VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+        ''', (
+            sync_run_id,
+            item.get('connection'),
+            item.get('access_key'),
+            item.get('status'),
+            item.get('accounts_seen', 0),
+            item.get('transactions_seen', 0),
+            item.get('fetch_seconds'),
             item.get('error', '')
         ))
 
@@ -1153,6 +2054,7 @@ def get_latest_sync_account_results():
         SELECT id, started_at, finished_at, status, accounts_seen, accounts_included,
                accounts_skipped, transactions_seen, transactions_inserted, duplicates,
                COALESCE(balance_accounts_seen, 0) AS balance_accounts_seen,
+               COALESCE(auto_approved, 0) AS auto_approved,
                sync_start_date, sync_end_date, error
         FROM sync_runs
         ORDER BY id DESC
@@ -1164,7 +2066,8 @@ def get_latest_sync_account_results():
     run_id = int(latest.iloc[0]['id'])
     accounts = pd.read_sql_query(f'''
         SELECT bank, account, included, skip_reason, transaction_count, inserted_count,
-               duplicate_count, latest_transaction_date, balance, currency, health_status, error
+               duplicate_count, latest_transaction_date, balance, currency, health_status,
+               COALESCE(connection, '') AS connection, error
         FROM sync_account_results
         WHERE sync_run_id = {run_id}
         ORDER BY included DESC, bank, account
@@ -1173,6 +2076,186 @@ def get_latest_sync_account_results():
     return latest, accounts
 
 
+def get_sync_connection_results(sync_run_id):
+    conn = get_connection()
+    ph = '%s' if is_postgres() else '?'
+    try:
+        return pd.read_sql_query(f'''
+            SELECT connection, status, accounts_seen, transactions_seen, fetch_seconds, error
+            FROM sync_connection_results
+            WHERE sync_run_id = {ph}
+            ORDER BY id
+        ''', conn, params=(int(sync_run_id),))
+    finally:
+        conn.close()
+
+
+def get_simplefin_request_budget(access_key, budget_date):
+    conn = get_connection()
+    ph = '%s' if is_postgres() else '?'
+    try:
+        df = pd.read_sql_query(f'''
+            SELECT access_key, budget_date, COALESCE(request_count, 0) AS request_count,
+                   COALESCE(throttled_count, 0) AS throttled_count, last_status,
+                   last_source, retry_after_until, updated_at
+            FROM simplefin_request_budget
+            WHERE access_key = {ph} AND budget_date = {ph}
+        ''', conn, params=(access_key, budget_date))
+    finally:
+        conn.close()
+    if df.empty:
+        return {
+            "access_key": access_key,
+            "budget_date": budget_date,
+            "request_count": 0,
+            "throttled_count": 0,
+            "last_status": None,
+            "last_source": None,
+            "retry_after_until": None,
+            "updated_at": None,
+        }
+    return df.iloc[0].to_dict()
+
+
+def record_simplefin_request(access_key, budget_date, status, source, retry_after_until=None):
+    """
+    Counts one SimpleFIN request against today's budget for an access URL.
+    Only a hash of the access URL is stored; the URL embeds credentials.
+    """
+    conn = get_connection()
+    c = conn.cursor()
+    ph = '%s' if is_postgres() else '?'
+    throttled = 1 if status == 429 else 0
+    updated_at = datetime.now().isoformat(timespec="seconds")
+    excluded = "EXCLUDED" if is_postgres() else "excluded"
+    c.execute(f'''
+        INSERT INTO simplefin_request_budget
+            (access_key, budget_date, request_count, throttled_count, last_status,
+             last_source, retry_after_until, updated_at)
+        VALUES ({ph}, {ph}, 1, {ph}, {ph}, {ph}, {ph}, {ph})
+        ON CONFLICT (access_key, budget_date) DO UPDATE SET
+            request_count = simplefin_request_budget.request_count + 1,
+            throttled_count = simplefin_request_budget.throttled_count + {excluded}.throttled_count,
+            last_status = {excluded}.last_status,
+            last_source = {excluded}.last_source,
+            retry_after_until = {excluded}.retry_after_until,
+            updated_at = {excluded}.updated_at
+    ''', (access_key, budget_date, throttled, status, source, retry_after_until, updated_at))
+    conn.commit()
+    conn.close()
+
+
+def get_recent_simplefin_responses(access_key, fetched_after):
+    """
+    SimpleFIN /accounts responses for an access URL fetched after an epoch
+    time, newest first. Shared by every process on this database, so a
+    balance check can reuse the response a sync or the daemon just paid for.
+    """
+    conn = get_connection()
+    ph = '%s' if is_postgres() else '?'
+    try:
+        df = pd.read_sql_query(f'''
+            SELECT fetched_at, start_ts, end_ts, balances_only, payload
+            FROM simplefin_response_cache
+            WHERE access_key = {ph} AND fetched_at >= {ph}
+            ORDER BY fetched_at DESC
+        ''', conn, params=(access_key, float(fetched_after)))
+    finally:
+        conn.close()
+    return [
+        {
+            "fetched_at": float(row.fetched_at),
+            "start_ts": None if pd.isna(row.start_ts) else int(row.start_ts),
+            "end_ts": None if pd.isna(row.end_ts) else int(row.end_ts),
+            "balances_only": bool(row.balances_only),
+            "payload": json.loads(row.payload),
+        }
+        for row in df.itertuples(index=False)
+    ]
+
+
+def save_simplefin_response(access_key, fetched_at, start_ts, end_ts, balances_only, payload):
+    """Stores one /accounts response."""
+    conn = get_connection()
+    c = conn.cursor()
+    ph = '%s' if is_postgres() else '?'
+    c.execute(f'''
+        INSERT INTO simplefin_response_cache (access_key, fetched_at, start_ts, end_ts, balances_only, payload)
+        VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+    ''', (access_key, float(fetched_at), start_ts, end_ts,
+          bool(balances_only) if is_postgres() else int(bool(balances_only)), json.dumps(payload)))
+    conn.commit()
+    conn.close()
+
+
+def prune_simplefin_responses(fetched_before):
+    """Drops cached /accounts responses, for every access URL, fetched before an epoch time."""
+    conn = get_connection()
+    c = conn.cursor()
+    ph = '%s' if is_postgres() else '?'
+    c.execute(f"DELETE FROM simplefin_response_cache WHERE fetched_at < {ph}", (float(fetched_before),))
+    conn.commit()
+    conn.close()
+
+
+def clear_simplefin_responses():
+    conn = get_connection()
+    c = conn.cursor()
+    c.execute("DELETE FROM simplefin_response_cache")
+    conn.commit()
+    conn.close()
+
+
+SYNC_HEARTBEAT_FIELDS = [
+    "pid",
+    "host",
+    "status",
+    "started_at",
+    "interval_seconds",
+    "next_run_at",
+    "last_sync_started_at",
+    "last_sync_finished_at",
+    "last_sync_status",
+    "last_sync_run_id",
+    "last_error",
+]
+
+
+def record_sync_heartbeat(name, **fields):
+    conn = get_connection()
+    c = conn.cursor()
+    ph = '%s' if is_postgres() else '?'
+    excluded = "EXCLUDED" if is_postgres() else "excluded"
+    columns = [field for field in SYNC_HEARTBEAT_FIELDS if field in fields]
+    values = [fields[field] for field in columns]
+    columns += ["last_beat_at"]
+    values += [datetime.now().isoformat(timespec="seconds")]
+    c.execute(f'''
+        INSERT INTO sync_heartbeats (name, {', '.join(columns)})
+        VALUES ({ph}, {', '.join(ph for _ in columns)})
+        ON CONFLICT (name) DO UPDATE SET
+            {', '.join(f"{column} = {excluded}.{column}" for column in columns)}
+    ''', [name, *values])
+    conn.commit()
+    conn.close()
+
+
+def get_sync_heartbeat(name="sync_daemon"):
+    conn = get_connection()
+    ph = '%s' if is_postgres() else '?'
+    try:
+        df = pd.read_sql_query(
+            f"SELECT * FROM sync_heartbeats WHERE name = {ph}",
+            conn,
+            params=(name,),
+        )
+    finally:
+        conn.close()
+    if df.empty:
+        return None
+    return df.iloc[0].to_dict()
+
+
 def save_ml_artifact(name, artifact_bytes, metadata):
     import json
 
@@ -1201,6 +2284,53 @@ def save_ml_artifact(name, artifact_bytes, metadata):
     return trained_at
 
 
+def get_ml_artifact_info(name):
+    """Returns trained_at and metadata for an artifact without fetching the blob."""
+    conn = get_connection()
+    ph = '%s' if is_postgres() else '?'
+    try:
+        df = pd.read_sql_query(
+            f"SELECT trained_at, metadata FROM ml_artifacts WHERE name = {ph}",
+            conn,
+            params=(name,),
+        )
+    finally:
+        conn.close()
+    if df.empty:
+        return None
+    row = df.iloc[0]
+    return {
+        'trained_at': row['trained_at'],
+        'metadata': row['metadata']
+    }
+
+
+def update_ml_artifact_metadata(name, updates):
+    """Merges `updates` into an artifact's metadata without rewriting the blob. Returns False if it is missing."""
+    import json
+
+    info = get_ml_artifact_info(name)
+    if not info:
+        return False
+    metadata = info.get('metadata') or {}
+    if not isinstance(metadata, dict):
+        try:
+            metadata = json.loads(metadata)
+        except (TypeError, ValueError):
+            metadata = {}
+    metadata.update(updates)
+    conn = get_connection()
+    c = conn.cursor()
+    ph = '%s' if is_postgres() else '?'
+    c.execute(
+        f"UPDATE ml_artifacts SET metadata = {ph} WHERE name = {ph}",
+        (json.dumps(metadata, default=str), name),
+    )
+    conn.commit()
+    conn.close()
+    return True
+
+
 def load_ml_artifact(name):
     ensure_ml_artifacts_table()
     conn = get_connection()
@@ -0,0 +1,84 @@
+import argparse
+import json
+import platform
+from datetime import datetime
+
+import db
+import ml_utils
+from sync_benchmark import get_git_commit
+
+
+def run_benchmark(backends=None, test_fraction=ml_utils.DEFAULT_BENCH_TEST_FRACTION,
+                  single_samples=ml_utils.DEFAULT_BENCH_SINGLE_SAMPLES):
+    """Benchmarks each backend on the same time-based split of reviewed transactions."""
+    backends = backends or list(ml_utils.ML_BACKENDS)
+    df = db.get_training_transactions()
+    if len(df) < 2:
+        raise ValueError("Need at least two reviewed transactions to benchmark.")
+    train_df, test_df = ml_utils.time_split(df, test_fraction)
+
+    results = []
+    for backend in backends:
+        print(f"⏱️  {backend} backend...")
+        results.append(ml_utils.evaluate_backend(backend, train_df, test_df, single_samples=single_samples))
+
+    return {
+        "commit": get_git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": "postgres" if db.is_postgres() else "sqlite",
+        "reviewed_samples": len(df),
+        "test_fraction": test_fraction,
+        "results": results,
+    }
+
+
+def print_results(payload):
+    def pct(metrics):
+        return f"{metrics['accuracy']:>6.1%}" if metrics else "     -"
+
+    print(f"Commit: {payload['commit'] or 'unknown'} | Reviewed rows: {payload['reviewed_samples']}")
+    for item in payload["results"]:
+        if item['train_seconds'] is None:
+            print(f"  {item['backend']:<7} | no model trained")
+            continue
+        print(
+            f"  {item['backend']:<7} | train {item['train_seconds']:>7.2f}s | "
+            f"{item['artifact_bytes'] / 1024:>9.1f} KB | cold load {item['cold_load_seconds']:>6.3f}s | "
+            f"single p50 {item['single_predict_ms']['p50']} ms | "
+            f"{item['batch_rows']}-row batch p50 {item['batch_predict_ms']['p50']} ms | "
+            f"category {pct(item['category'])} | type {pct(item['type'])}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ML backends on the newest held-out reviewed transactions.")
+    parser.add_argument("--backends", default=",".join(ml_utils.ML_BACKENDS),
+                        help=f"Comma-separated backends from: {', '.join(ml_utils.ML_BACKENDS)}.")
+    parser.add_argument("--test-fraction", type=float, default=ml_utils.DEFAULT_BENCH_TEST_FRACTION,
+                        help="Newest share of reviewed transactions held out for testing.")
+    parser.add_argument("--single-samples", type=int, default=ml_utils.DEFAULT_BENCH_SINGLE_SAMPLES,
+                        help="Rows timed one at a time through classifier.predict().")
+    parser.add_argument("--output", help="Write JSON results to this file.")
+    args = parser.parse_args()
+
+    backends = [backend for backend in args.backends.split(",") if backend]
+    unknown = set(backends) - set(ml_utils.ML_BACKENDS)
+    if unknown:
+        parser.error(f"Unknown backends: {', '.join(sorted(unknown))}")
+
+    payload = run_benchmark(
+        backends=backends,
+        test_fraction=args.test_fraction,
+        single_samples=args.single_samples,
+    )
+    print_results(payload)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(payload, f, indent=2)
+        print(f"Saved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,21 @@
 import pandas as pd
 import pickle
+import hashlib
+import json
+import multiprocessing
 import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 import db
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.pipeline import Pipeline, FeatureUnion
-from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import FunctionTransformer
 import numpy as np
 
+# scikit-learn is imported inside train(); unpickling a saved model imports
+# it on demand, so importing this module stays cheap for the app and sync.
+
 def reshape_amount(x):
     """Helper to reshape amount series for sklearn."""
     if isinstance(x, np.ndarray):
@@ -17,11 +23,513 @@ def reshape_amount(x):
     return np.array(x).reshape(-1, 1)
 
 MODEL_FILE = 'model.pkl'
+ONLINE_MODEL_FILE = 'online_model.pkl'
+
+LINEAR_MODEL_FILE = 'linear_model.pkl'
+
+FOREST_BACKEND = 'forest'
+LINEAR_BACKEND = 'linear'
+ONLINE_BACKEND = 'online'
+ML_BACKENDS = {
+    FOREST_BACKEND: MODEL_FILE,
+    LINEAR_BACKEND: LINEAR_MODEL_FILE,
+    ONLINE_BACKEND: ONLINE_MODEL_FILE,
+}
+
+MERCHANT_CACHE_ARTIFACT = 'merchant_cache.json'
+SIMILARITY_INDEX_ARTIFACT = 'similarity_index.pkl'
+DEFAULT_SIMILAR_K = 5
+DEFAULT_MERCHANT_CACHE_MIN_VOTES = 2
+
+
+def get_ml_backend():
+    backend = os.getenv("MONEY_TRACKER_ML_BACKEND", FOREST_BACKEND).strip().lower()
+    return backend if backend in ML_BACKENDS else FOREST_BACKEND
+
+# Unpickled models shared by every classifier in this process, keyed by
+# (artifact name, trained_at) so a retrain elsewhere is picked up.
+_MODEL_CACHE = {}
+_MODEL_CACHE_LOCK = threading.Lock()
+
+
+def artifact_sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_file_atomic(path, data):
+    """Writes via a temp file and rename so readers never see a partial model."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _parse_metadata(metadata):
+    if isinstance(metadata, dict):
+        return metadata
+    try:
+        return json.loads(metadata) if metadata else {}
+    except (TypeError, ValueError):
+        return {}
+
+
+def _read_cached_artifact(path, expected_sha256):
+    """Returns the on-disk artifact bytes when they match the database hash."""
+    if not expected_sha256 or not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        data = f.read()
+    if artifact_sha256(data) != expected_sha256:
+        return None
+    return data
+
+
+def merchant_key(description):
+    """
+    Normalizes a description to a merchant key: lowercased, punctuation
+    removed, and any token containing a digit (store numbers, reference
+    codes, dates) dropped. "STARBUCKS STORE #1234" -> "starbucks store".
+    """
+    text = re.sub(r"[^a-z0-9&' ]+", " ", str(description or "").lower())
+    return " ".join(token for token in text.split() if not any(ch.isdigit() for ch in token))
+
+
+def merchant_cache_key(description, signed_amount):
+    key = merchant_key(description)
+    if not key:
+        return None
+    return f"{'-' if signed_amount < 0 else '+'}{key}"
+
+
+def payload_signed_amount(raw_data):
+    """
+    The bank's signed amount from a stored SimpleFIN payload, or None. Rows
+    saved without a payload keep a copy of the ledger row instead (it has a
+    `type`), whose amount is unsigned.
+    """
+    from data_repair import parse_raw_payload
+
+    payload = parse_raw_payload(raw_data)
+    if 'type' in payload:
+        return None
+    try:
+        return float(payload['amount'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def build_merchant_cache(label_counts):
+    """
+    Builds {merchant cache key: {'category': votes, 'type': votes}} from
+    reviewed (description, type, category, raw_data, votes) rows. The amount
+    sign comes from the bank payload in raw_data, as lookups see it, and from
+    the type only when the payload has no amount.
+    """
+    entries = {}
+    for row in label_counts.itertuples(index=False):
+        signed_amount = payload_signed_amount(row.raw_data) if row.raw_data else None
+        if signed_amount is None:
+            signed_amount = -1 if row.type == 'Expense' else 1
+        key = merchant_cache_key(row.description, signed_amount)
+        if not key or not row.type:
+            continue
+        votes = int(row.votes)
+        entry = entries.setdefault(key, {'category': {}, 'type': {}})
+        entry['type'][row.type] = entry['type'].get(row.type, 0) + votes
+        if row.category and row.category != 'Uncategorized':
+            entry['category'][row.category] = entry['category'].get(row.category, 0) + votes
+    return entries
+
+
+DEFAULT_PARALLEL_MIN_SAMPLES = 2000
+
+
+def get_ml_n_jobs():
+    """Cores available to training: MONEY_TRACKER_ML_N_JOBS, or all cores when unset or -1."""
+    cores = os.cpu_count() or 1
+    try:
+        n_jobs = int(os.getenv("MONEY_TRACKER_ML_N_JOBS", "-1"))
+    except ValueError:
+        n_jobs = -1
+    if n_jobs <= 0:
+        return cores
+    return min(n_jobs, cores)
+
+
+def _fit_model(model, X, y):
+    started = time.perf_counter()
+    model.fit(X, y)
+    return model, round(time.perf_counter() - started, 3)
+
+
+def make_classifier(backend):
+    if backend == LINEAR_BACKEND:
+        from sklearn.linear_model import LogisticRegression
+
+        return LogisticRegression(C=10.0, max_iter=1000)
+    from sklearn.ensemble import RandomForestClassifier
+
+    return RandomForestClassifier(n_estimators=100, random_state=42)
+
+
+def fit_models(fit_jobs, report, tune_n_jobs=True):
+    """
+    Fits {name: (estimator, X, y)} and returns {name: fitted estimator}.
+    `tune_n_jobs` sets the forests' n_jobs; linear models are single-threaded.
+    With more than one model, spare cores, and enough samples to outweigh
+    process start-up, the models fit concurrently in a spawn process pool
+    and split the cores between their forests; otherwise they fit in turn
+    with every core. Records n_jobs, parallel_fit, and <name>_fit_seconds.
+    """
+    n_jobs = get_ml_n_jobs()
+    min_samples = int(os.getenv("MONEY_TRACKER_ML_PARALLEL_MIN_SAMPLES", DEFAULT_PARALLEL_MIN_SAMPLES))
+    samples = sum(len(y) for _model, _X, y in fit_jobs.values())
+    parallel = len(fit_jobs) > 1 and n_jobs > 1 and samples >= min_samples
+    per_model_jobs = max(n_jobs // len(fit_jobs), 1) if parallel else n_jobs
+    if tune_n_jobs:
+        for model, _X, _y in fit_jobs.values():
+            model.set_params(n_jobs=per_model_jobs)
+
+    report['n_jobs'] = n_jobs
+    report['parallel_fit'] = False
+    started = time.perf_counter()
+    results = {}
+    if parallel:
+        try:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=len(fit_jobs), mp_context=context) as executor:
+                futures = {
+                    name: executor.submit(_fit_model, model, X, y)
+                    for name, (model, X, y) in fit_jobs.items()
+                }
+                results = {name: future.result() for name, future in futures.items()}
+            report['parallel_fit'] = True
+        except Exception as e:
+            report['warnings'].append(f'Parallel training failed, fitting sequentially: {e}')
+            results = {}
+    for name, (model, X, y) in fit_jobs.items():
+        if name not in results:
+            results[name] = _fit_model(model, X, y)
+
+    report['training_seconds'] = round(time.perf_counter() - started, 3)
+    fitted = {}
+    for name, (model, seconds) in results.items():
+        report[f'{name}_fit_seconds'] = seconds
+        if tune_n_jobs:
+            # Fitted forests keep n_jobs; reset it so prediction stays single-threaded.
+            model.set_params(n_jobs=None)
+        fitted[name] = model
+    return fitted
+
+
+def signed_amounts(df):
+    """Rebuilds the bank sign from the stored absolute amount: expenses are negative."""
+    amounts = df['amount'].astype(float).to_numpy()
+    return np.where(df['type'].astype(str).to_numpy() == 'Expense', -amounts, amounts)
+
+
+DEFAULT_AUTO_APPROVE_MIN_HISTORY = 3
+
+
+def get_auto_approve_thresholds():
+    """
+    MONEY_TRACKER_AUTO_APPROVE_THRESHOLDS as {category: minimum confidence},
+    with '*' covering every other category. A bare number applies to all
+    categories. Unset or invalid disables auto-approval.
+    """
+    raw = os.getenv("MONEY_TRACKER_AUTO_APPROVE_THRESHOLDS", "").strip()
+    if not raw:
+        return {}
+    try:
+        parsed = json.loads(raw)
+    except ValueError:
+        print("⚠️ MONEY_TRACKER_AUTO_APPROVE_THRESHOLDS is not valid JSON; auto-approve is off.")
+        return {}
+    if isinstance(parsed, (int, float)):
+        parsed = {'*': parsed}
+    if not isinstance(parsed, dict):
+        return {}
+    thresholds = {}
+    for category, threshold in parsed.items():
+        try:
+            thresholds[str(category)] = float(threshold)
+        except (TypeError, ValueError):
+            continue
+    return thresholds
+
+
+LOW_CONFIDENCE_NOTE_PREFIX = "🤖 Low Confidence"
+UNTRAINED_NOTE = "ML model not trained"
+
+
+def prediction_note(prediction):
+    """The Inbox note sync writes for a prediction: untrained model or low confidence."""
+    if not prediction.get('model_available'):
+        return UNTRAINED_NOTE
+    confidence = prediction.get('confidence', 0.0)
+    if confidence < 0.6:
+        return f"{LOW_CONFIDENCE_NOTE_PREFIX} ({int(confidence*100)}%)"
+    return ""
+
+
+def is_prediction_note(note):
+    note = "" if note is None or (isinstance(note, float) and np.isnan(note)) else str(note)
+    return note in ("", UNTRAINED_NOTE) or note.startswith(LOW_CONFIDENCE_NOTE_PREFIX)
+
+
+def pending_signed_amounts(df):
+    """Bank-signed amounts for pending rows: the SimpleFIN payload's amount, else the sign implied by type."""
+    signed = signed_amounts(df)
+    for position, raw_data in enumerate(df['raw_data']):
+        amount = payload_signed_amount(raw_data)
+        if amount is not None:
+            signed[position] = amount
+    return signed
+
+
+def clean_texts(texts):
+    return pd.Series(list(texts), dtype=object).fillna("").astype(str)
+
+
+def append_amount_features(text_matrix, amount_features):
+    from scipy.sparse import csr_matrix, hstack
+
+    return hstack([text_matrix, csr_matrix(amount_features)]).tocsr()
+
+
+def signed_amount_features(amounts):
+    """Sign and log-scaled magnitude, so payroll-sized amounts do not swamp text."""
+    amounts = np.asarray(amounts, dtype=float)
+    return np.column_stack([np.sign(amounts), np.log1p(np.abs(amounts))])
+
+
+class OnlineTextModel:
+    """
+    HashingVectorizer + SGDClassifier that can keep learning from new batches
+    with partial_fit. The vectorizer is stateless, so only the linear model is
+    pickled. Takes descriptions, or a description/signed_amount frame when
+    `with_amount` is set, matching the inputs of the forest pipelines.
+    """
+
+    n_features = 2 ** 18
+
+    def __init__(self, with_amount=False):
+        self.with_amount = with_amount
+        self.clf = None
+        self.samples_seen = 0
+
+    @property
+    def classes_(self):
+        return getattr(self.clf, 'classes_', np.array([]))
+
+    def knows_labels(self, labels):
+        return set(labels) <= set(self.classes_)
+
+    @property
+    def featurizer_key(self):
+        # Every online model hashes text the same way, so one matrix serves both.
+        return ('hashing', self.n_features)
+
+    def text_features(self, texts):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        vectorizer = HashingVectorizer(
+            n_features=self.n_features,
+            alternate_sign=False,
+            ngram_range=(1, 2),
+            stop_words='english',
+        )
+        return vectorizer.transform(clean_texts(texts))
+
+    def _features(self, X, text_matrix=None):
+        if not self.with_amount:
+            return text_matrix if text_matrix is not None else self.text_features(X)
+        if text_matrix is None:
+            text_matrix = self.text_features(X['description'])
+        return append_amount_features(text_matrix, signed_amount_features(X['signed_amount']))
+
+    def fit(self, X, y):
+        from sklearn.linear_model import SGDClassifier
+
+        self.clf = SGDClassifier(loss='log_loss', alpha=1e-5, random_state=42)
+        self.clf.fit(self._features(X), np.asarray(y))
+        self.samples_seen = len(y)
+        return self
+
+    def partial_fit(self, X, y):
+        self.clf.partial_fit(self._features(X), np.asarray(y))
+        self.samples_seen += len(y)
+        return self
+
+    def predict(self, X, text_matrix=None):
+        return self.clf.predict(self._features(X, text_matrix))
+
+    def predict_proba(self, X, text_matrix=None):
+        return self.clf.predict_proba(self._features(X, text_matrix))
+
+
+class SharedTextModel:
+    """
+    Classifier over a TF-IDF matrix from a vectorizer fitted once and shared
+    by the category and type models, so each description is tokenized once.
+    Takes descriptions, or a description/signed_amount frame when
+    `amount_features` is set, the same inputs as the older pipelines.
+    """
+
+    def __init__(self, vectorizer, clf, amount_features=None):
+        self.vectorizer = vectorizer
+        self.clf = clf
+        self.amount_features = amount_features
+
+    @property
+    def classes_(self):
+        return self.clf.classes_
+
+    @property
+    def featurizer_key(self):
+        return ('tfidf', id(self.vectorizer))
+
+    def text_features(self, texts):
+        return self.vectorizer.transform(clean_texts(texts))
+
+    def _features(self, X, text_matrix=None):
+        if self.amount_features is None:
+            return text_matrix if text_matrix is not None else self.text_features(X)
+        if text_matrix is None:
+            text_matrix = self.text_features(X['description'])
+        return append_amount_features(text_matrix, self.amount_features(X['signed_amount'].to_numpy()))
+
+    def predict(self, X, text_matrix=None):
+        return self.clf.predict(self._features(X, text_matrix))
+
+    def predict_proba(self, X, text_matrix=None):
+        return self.clf.predict_proba(self._features(X, text_matrix))
+
+
+class SimilarityIndex:
+    """
+    Sparse TF-IDF rows for reviewed descriptions. Text is hashed rather than
+    given a fitted vocabulary, so newly reviewed merchants can be appended
+    without a rebuild; document frequencies are kept alongside and updated on
+    each add. Rows are L2-normalised, so one sparse product with a query
+    vector gives every cosine similarity. Digits are not tokens, so store
+    numbers and dates do not count as shared words.
+    """
+
+    columns = ['id', 'date', 'description', 'amount', 'category', 'type']
+    n_features = 2 ** 18
 
-class TransactionClassifier:
     def __init__(self):
-        self.cat_model = None
-        self.type_model = None
+        self.matrix = None
+        self.doc_freq = np.zeros(self.n_features, dtype=np.uint32)
+        self.n_docs = 0
+        self.rows = pd.DataFrame(columns=self.columns)
+        self.watermark = None
+        self.watermark_ids = []
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _rows(self, df):
+        rows = df.reindex(columns=self.columns).reset_index(drop=True)
+        rows['description'] = rows['description'].fillna("").astype(str)
+        for column in ('id', 'date', 'category', 'type'):
+            rows[column] = rows[column].astype(object)
+        return rows
+
+    def _counts(self, texts):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        hasher = HashingVectorizer(
+            n_features=self.n_features,
+            alternate_sign=False,
+            norm=None,
+            stop_words='english',
+            token_pattern=r"(?u)\b[^\W\d_]{2,}\b",
+        )
+        counts = hasher.transform(clean_texts(texts)).tocsr()
+        counts.data = 1.0 + np.log(counts.data)
+        return counts
+
+    def _weigh(self, counts):
+        from sklearn.preprocessing import normalize
+
+        idf = np.log((1.0 + self.n_docs) / (1.0 + self.doc_freq)) + 1.0
+        return normalize(counts.multiply(idf).tocsr())
+
+    def _count_documents(self, counts):
+        self.doc_freq += np.bincount(counts.indices, minlength=self.n_features).astype(np.uint32)
+        self.n_docs += counts.shape[0]
+
+    def build(self, df):
+        self.rows = self._rows(df)
+        self.doc_freq = np.zeros(self.n_features, dtype=np.uint32)
+        self.n_docs = 0
+        counts = self._counts(self.rows['description'])
+        self._count_documents(counts)
+        self.matrix = self._weigh(counts)
+        self.watermark, self.watermark_ids = TransactionClassifier._watermark(df)
+        return self
+
+    def add(self, df):
+        """Adds newly reviewed rows, replacing earlier entries for re-reviewed ids."""
+        if df.empty:
+            return self
+        if self.matrix is None:
+            return self.build(df)
+        from scipy.sparse import vstack
+
+        new_rows = self._rows(df)
+        keep = ~self.rows['id'].isin(set(new_rows['id'])).to_numpy()
+        counts = self._counts(new_rows['description'])
+        # Existing rows keep the weights they were added with until the next rebuild.
+        self._count_documents(counts)
+        self.matrix = vstack([self.matrix[keep], self._weigh(counts)]).tocsr()
+        self.rows = pd.concat([self.rows[keep], new_rows], ignore_index=True)
+        watermark, watermark_ids = TransactionClassifier._watermark(df)
+        if watermark == self.watermark:
+            watermark_ids = sorted(set(self.watermark_ids) | set(watermark_ids))
+        if watermark is not None and (self.watermark is None or watermark >= self.watermark):
+            self.watermark, self.watermark_ids = watermark, watermark_ids
+        return self
+
+    def query(self, description, k=DEFAULT_SIMILAR_K, exclude_id=None):
+        """Returns up to `k` most similar reviewed rows with a `similarity` score, best first."""
+        empty = pd.DataFrame(columns=self.columns + ['similarity'])
+        if self.matrix is None or not len(self.rows) or not description:
+            return empty
+        query = self._weigh(self._counts([description]))
+        if not query.nnz:
+            return empty
+        scores = (self.matrix @ query.T).toarray().ravel()
+        if exclude_id is not None:
+            scores[(self.rows['id'] == exclude_id).to_numpy()] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        result = self.rows.iloc[candidates].copy()
+        result['similarity'] = np.round(scores[candidates], 3)
+        return result.reset_index(drop=True)
+
+
+class TransactionClassifier:
+    def __init__(self, backend=None):
+        self.backend = backend or get_ml_backend()
+        self.artifact_name = ML_BACKENDS[self.backend]
+        self._cat_model = None
+        self._type_model = None
+        self._online_state = {}
+        self._merchant_cache = None
+        self._similarity_index = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
         self.vectorizer = None
         self.status = {
             'model_loaded': False,
@@ -29,36 +537,116 @@ class TransactionClassifier:
             'last_trained_at': None,
             'metadata': {}
         }
-        self.load_model()
+
+    # Models load on first use. Assigning a model directly (training, tests)
+    # counts as loaded so it is never replaced by the saved artifact.
+    @property
+    def cat_model(self):
+        self._ensure_loaded()
+        return self._cat_model
+
+    @cat_model.setter
+    def cat_model(self, value):
+        self._loaded = True
+        self._cat_model = value
+
+    @property
+    def type_model(self):
+        self._ensure_loaded()
+        return self._type_model
+
+    @type_model.setter
+    def type_model(self, value):
+        self._loaded = True
+        self._type_model = value
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._load_lock:
+            if not self._loaded:
+                self.load_model()
+
+    def reload_if_stale(self):
+        """
+        For long-running processes: drops the merchant cache and similarity
+        index so they are re-read, and marks the models for reload when the
+        saved artifact was trained after the loaded one. Returns True when the
+        models will reload.
+        """
+        self._merchant_cache = None
+        self._similarity_index = None
+        try:
+            info = db.get_ml_artifact_info(self.artifact_name)
+        except Exception as e:
+            print(f"⚠️ Could not check for a newer model: {e}")
+            return False
+        trained_at = info.get('trained_at') if info else None
+        with self._load_lock:
+            if not self._loaded or trained_at == self.status.get('last_trained_at'):
+                return False
+            self._loaded = False
+        return True
+
+    def _apply_payload(self, data):
+        self._cat_model = data.get('cat_model')
+        self._type_model = data.get('type_model')
+        self.vectorizer = getattr(self._cat_model or self._type_model, 'vectorizer', None)
+        self._online_state = {
+            'watermark': data.get('watermark'),
+            'watermark_ids': list(data.get('watermark_ids') or []),
+        }
+        self._loaded = True
 
     def load_model(self):
-        """Loads the model from disk if it exists."""
+        """Loads the saved model, preferring the database artifact over the local file."""
         try:
-            artifact = db.load_ml_artifact(MODEL_FILE)
-            if artifact:
-                data = pickle.loads(artifact['artifact'])
-                self.cat_model = data.get('cat_model')
-                self.type_model = data.get('type_model')
-                self.status.update({
-                    'model_loaded': True,
-                    'load_source': 'database',
-                    'last_trained_at': artifact.get('trained_at'),
-                    'metadata': artifact.get('metadata') or {}
-                })
-                print("✅ ML Model loaded successfully from database.")
-                return self.status
+            info = db.get_ml_artifact_info(self.artifact_name)
+            if info:
+                metadata = _parse_metadata(info.get('metadata'))
+                cache_key = (self.artifact_name, info.get('trained_at'))
+                with _MODEL_CACHE_LOCK:
+                    data = _MODEL_CACHE.get(cache_key)
+                load_source = 'memory'
+                if data is None:
+                    # The local file doubles as a download cache: the blob is only
+                    # fetched when the file is missing or its hash is stale.
+                    expected_sha256 = metadata.get('artifact_sha256')
+                    artifact_bytes = _read_cached_artifact(self.artifact_name, expected_sha256)
+                    load_source = 'file_cache'
+                    if artifact_bytes is None:
+                        artifact = db.load_ml_artifact(self.artifact_name)
+                        artifact_bytes = artifact['artifact'] if artifact else None
+                        load_source = 'database'
+                        if artifact_bytes is not None and expected_sha256:
+                            if artifact_sha256(artifact_bytes) != expected_sha256:
+                                raise ValueError("Database model hash does not match its metadata.")
+                            try:
+                                write_file_atomic(self.artifact_name, artifact_bytes)
+                            except Exception as e:
+                                print(f"⚠️ Could not refresh local model cache: {e}")
+                    data = pickle.loads(artifact_bytes) if artifact_bytes is not None else None
+                    if data is not None:
+                        with _MODEL_CACHE_LOCK:
+                            _MODEL_CACHE[cache_key] = data
+                if data is not None:
+                    self._apply_payload(data)
+                    self.status.update({
+                        'model_loaded': True,
+                        'load_source': load_source,
+                        'last_trained_at': info.get('trained_at'),
+                        'metadata': metadata
+                    })
+                    print(f"✅ ML Model loaded successfully from {load_source}.")
+                    return self.status
         except Exception as e:
             print(f"⚠️ Error loading model from database: {e}")
 
-        if os.path.exists(MODEL_FILE):
+        if os.path.exists(self.artifact_name):
             try:
-                with open(MODEL_FILE, 'rb') as f:
+                with open(self.artifact_name, 'rb') as f:
                     data = pickle.load(f)
-                    self.cat_model = data.get('cat_model')
-                    self.type_model = data.get('type_model')
-                    # shared vectorizer if optimized, but pipeline handles it usually.
-                    # Actually, if we use pipelines, the vectorizer is inside them.
-                    
+                    self._apply_payload(data)
                     self.status.update({
                         'model_loaded': True,
                         'load_source': 'file',
@@ -67,15 +655,15 @@ class TransactionClassifier:
                     print("✅ ML Model loaded successfully.")
             except Exception as e:
                 print(f"⚠️ Error loading model: {e}")
-                self.cat_model = None
-                self.type_model = None
+                self._cat_model = None
+                self._type_model = None
                 self.status.update({'model_loaded': False, 'load_source': None})
+        self._loaded = True
         return self.status
 
-    def train(self):
-        """Fetches data from DB and retrains properties."""
-        print("🧠 Training ML Models...")
-        report = {
+    @staticmethod
+    def new_report():
+        return {
             'status': 'started',
             'trained_at': datetime.now().isoformat(timespec='seconds'),
             'total_samples': 0,
@@ -89,149 +677,153 @@ class TransactionClassifier:
             'warnings': [],
             'error': ''
         }
+
+    def train(self):
+        """Fetches reviewed data from the DB, refits this backend's models, and saves them."""
+        print("🧠 Training ML Models...")
+        report = self.new_report()
         
-        # 1. Fetch Data
-        df = db.get_all_transactions()
-        if df.empty:
+        # 1. Fetch Data: reviewed rows only, with just the training columns.
+        report['total_samples'] = db.count_transactions()
+        if not report['total_samples']:
             print("❌ No data to train on.")
             report['status'] = 'skipped'
             report['warnings'].append('No data to train on.')
             return report
-        report['total_samples'] = len(df)
-        if 'status' in df.columns:
-            reviewed_mask = df['status'].astype(str).str.upper().eq('REVIEWED')
-        else:
-            reviewed_mask = pd.Series(False, index=df.index)
-        if 'reviewed_at' in df.columns:
-            reviewed_mask = reviewed_mask | df['reviewed_at'].notna()
-        df = df[reviewed_mask].copy()
+        df = db.get_training_transactions()
         report['reviewed_samples'] = len(df)
         if df.empty:
             report['status'] = 'skipped'
             report['warnings'].append('No reviewed transactions to train on.')
             return report
 
-        # Filter out 'Uncategorized' for training Category model
-        # For Type model, we can use everything that has a valid Type? 
-        # Actually usually 'Uncategorized' stuff might have 'Expense' type default, which is fine.
-        # But we want to learn from *Corrected* data.
-        # So maybe filter for status='REVIEWED' or just assume current DB state is "truthy" enough excluding Uncategorized.
-        
-        # Train Category Model
-        cat_df = df[df['category'] != 'Uncategorized']
-        cat_df = cat_df[cat_df['category'].notna()]
-        cat_df['description'] = cat_df['description'].fillna("") # Fix NoneType error
-        report['category_samples'] = len(cat_df)
-    
-        if len(cat_df) > 10:
-            # We use Description as main feature.
-            # Maybe Amount too? (e.g. $1000 is likely Rent, $15 is likely Lunch)
-            # For simplicity, let's start with Description + Amount.
-            
-            # Feature Engineering
-            # We need a custom transformer for Amount to reshape it for sklearn
-            
-            # Pipeline
-            # 1. Text -> TF-IDF
-            # 2. Amount -> Passthrough
-            # But combining them needs ColumnTransformer or FeatureUnion logic which handles DataFrames
-            
-            # Simple approach: Just text for now? 
-            # Adding Amount significantly helps with things like "Spotify" (Subscription) vs "Spotify" (one off?) 
-            # Actually Amount helps with "Check #123" -> Rent.
-            
-            # Let's use a simple Pipeline that takes just the description column if we pass Series.
-            # But predict takes (desc, amount).
-            
-            # Let's try to do it properly with a ColumnTransformer.
-            
-            preprocessor = ColumnTransformer(
-                transformers=[
-                    ('text', TfidfVectorizer(stop_words='english', max_features=1000), 'description'),
-                ]
-            )
-            
-            # For Category, Text is 90% of signal.
-            self.cat_model = Pipeline([
-                ('tfidf', TfidfVectorizer(stop_words='english')),
-                ('clf', RandomForestClassifier(n_estimators=100, random_state=42))
-            ])
-            
-            self.cat_model.fit(cat_df['description'], cat_df['category'])
-            report['category_model'] = 'trained'
-            print(f"✅ Category Model trained on {len(cat_df)} samples.")
-        else:
+        self.fit(df, report)
+        if not (self.cat_model or self.type_model):
+            # Keep the saved artifact rather than re-saving it as a new run;
+            # the next prediction reloads it.
+            self._loaded = False
+            report['status'] = 'skipped'
+            report['warnings'].append('No model trained; the saved model was kept.')
+            return report
+        self._save_payload(self._payload(), report)
+        report['similarity_index_rows'] = self.rebuild_similarity_index(df)
+        # Inbox rows still carry the old model's suggestions.
+        try:
+            report['rescore'] = self.rescore_pending()
+        except Exception as e:
+            report['warnings'].append(f'Could not re-score pending transactions: {e}')
+        return report
+
+    def fit(self, df, report=None):
+        """Fits this backend's models in memory from reviewed rows without saving them."""
+        report = report if report is not None else self.new_report()
+        report['backend'] = self.backend
+        if self.backend == ONLINE_BACKEND:
+            return self._fit_online(df, report)
+        return self._fit_shared(df, report)
+
+    def _fit_shared(self, df, report):
+        """Forest and linear backends: one TF-IDF vocabulary feeding both classifiers."""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        linear = self.backend == LINEAR_BACKEND
+        df = df.copy()
+        df['description'] = df['description'].fillna("") # Fix NoneType error
+
+        # Filter out 'Uncategorized' for training Category model.
+        # For Type model, we can use everything that has a valid Type:
+        # 'Uncategorized' rows usually still carry a correct type.
+        cat_mask = (df['category'] != 'Uncategorized') & df['category'].notna()
+        cat_labels = df.loc[cat_mask, 'category']
+        report['category_samples'] = len(cat_labels)
+
+        # Type depends on the bank sign, but the DB stores absolute amounts,
+        # so the signed amount is rebuilt from the reviewed type.
+        type_labels = df['type']
+        report['type_samples'] = len(type_labels)
+
+        train_category = len(cat_labels) > 10
+        train_type = len(type_labels) > 5
+        if not train_category:
             print("⚠️ Not enough categorized data to train Category model.")
             report['warnings'].append('Not enough categorized data to train category model.')
-            
-        # Train Type Model (Income vs Expense vs Reimbursement)
-        # This is where Amount (+/- from bank) matters. 
-        # But our DB `amount` is always positive. The `type` tells the sign.
-        # WE NEED THE RAW AMOUNT SIGN TO PREDICT TYPE.
-        # The `raw_data` column might have it, but parsing it is slow.
-        # Alternatively, we can assume:
-        # If we are strictly predicting from "New Transaction", we have the raw amount.
-        # But we need to train on something.
-        # We can reconstruct "Signed Amount" from DB:
-        # If Type=Expense -> -Amount
-        # If Type=Income -> +Amount
-        # If Type=Reimbursement -> +Amount (This is the tricky one! We want to distinguish Income vs Reimb)
-        
-        # Training Data Construction
-        type_df = df.copy()
-        
-        def get_signed_amount(row):
-            if row['type'] == 'Expense':
-                return -1 * row['amount']
-            else:
-                return row['amount']
-                
-        type_df['signed_amount'] = type_df.apply(get_signed_amount, axis=1)
-        
-        # Features: Description + Signed Amount
-        # We need a custom preprocessor that can handle a dict or dataframe logic?
-        # Let's use ColumnTransformer on a DataFrame.
-        
-        type_features = type_df[['description', 'signed_amount']].copy()
-        type_features['description'] = type_features['description'].fillna("") # Fix NoneType error
-        type_labels = type_df['type']
-        report['type_samples'] = len(type_df)
-        
-        if len(type_df) > 5:
-            self.type_model = Pipeline([
-                ('preprocessor', ColumnTransformer([
-                    ('text', TfidfVectorizer(stop_words='english'), 'description'),
-                    ('amt', FunctionTransformer(reshape_amount, validate=False), 'signed_amount')
-                ])),
-                ('clf', RandomForestClassifier(n_estimators=100, random_state=42))
-            ])
-            
-            self.type_model.fit(type_features, type_labels)
-            report['type_model'] = 'trained'
-            print(f"✅ Type Model trained on {len(type_df)} samples.")
-        else:
+        if not train_type:
             report['warnings'].append('Not enough transactions to train type model.')
-            
-        # Save
+        if linear:
+            # Logistic regression cannot fit a single class.
+            if train_category and cat_labels.nunique() < 2:
+                train_category = False
+                report['warnings'].append('Need at least two labels to train the linear category model.')
+            if train_type and type_labels.nunique() < 2:
+                train_type = False
+                report['warnings'].append('Need at least two labels to train the linear type model.')
+        if not (train_category or train_type):
+            # Nothing fitted: never fall back to a previously loaded model.
+            self.cat_model = None
+            self.type_model = None
+            return report
+
+        # Descriptions are tokenized once; the category model reads its rows
+        # of the matrix and the type model appends the signed amount.
+        started = time.perf_counter()
+        vectorizer = TfidfVectorizer(stop_words='english')
+        text_matrix = vectorizer.fit_transform(df['description'])
+        # Trees split on raw amounts; a linear model needs them scaled.
+        amount_features = signed_amount_features if linear else reshape_amount
+        report['featurize_seconds'] = round(time.perf_counter() - started, 3)
+
+        fit_jobs = {}
+        if train_category:
+            fit_jobs['category'] = (make_classifier(self.backend), text_matrix[cat_mask.to_numpy()], cat_labels)
+        if train_type:
+            type_matrix = append_amount_features(text_matrix, amount_features(signed_amounts(df)))
+            fit_jobs['type'] = (make_classifier(self.backend), type_matrix, type_labels)
+
+        fitted = fit_models(fit_jobs, report, tune_n_jobs=not linear)
+        self.vectorizer = vectorizer
+        self.cat_model = None
+        self.type_model = None
+        if 'category' in fitted:
+            self.cat_model = SharedTextModel(vectorizer, fitted['category'])
+            report['category_model'] = 'trained'
+            print(f"✅ Category Model trained on {len(cat_labels)} samples in {report['category_fit_seconds']}s.")
+        if 'type' in fitted:
+            self.type_model = SharedTextModel(vectorizer, fitted['type'], amount_features=amount_features)
+            report['type_model'] = 'trained'
+            print(f"✅ Type Model trained on {len(type_labels)} samples in {report['type_fit_seconds']}s.")
+        return report
+
+    def _payload(self):
         payload = {
+            'backend': self.backend,
             'cat_model': self.cat_model,
             'type_model': self.type_model
         }
+        if self.backend == ONLINE_BACKEND:
+            payload.update(self._online_state)
+        return payload
+
+    def _save_payload(self, payload, report):
+        artifact_bytes = pickle.dumps(payload)
+        report['artifact_bytes'] = len(artifact_bytes)
+        report['artifact_sha256'] = artifact_sha256(artifact_bytes)
         try:
-            with open(MODEL_FILE, 'wb') as f:
-                pickle.dump(payload, f)
+            write_file_atomic(self.artifact_name, artifact_bytes)
             report['model_saved_file'] = True
         except Exception as e:
             report['warnings'].append(f'Could not save file model: {e}')
 
         try:
-            trained_at = db.save_ml_artifact(MODEL_FILE, pickle.dumps(payload), report)
+            trained_at = db.save_ml_artifact(self.artifact_name, artifact_bytes, report)
             report['model_saved_database'] = True
             report['trained_at'] = trained_at
+            with _MODEL_CACHE_LOCK:
+                _MODEL_CACHE[(self.artifact_name, trained_at)] = payload
         except Exception as e:
             report['warnings'].append(f'Could not save database model: {e}')
 
         report['status'] = 'success'
+        report['merchant_cache_keys'] = self.refresh_merchant_cache()
         self.status.update({
             'model_loaded': bool(self.cat_model or self.type_model),
             'load_source': 'trained',
@@ -239,53 +831,393 @@ class TransactionClassifier:
             'metadata': report
         })
         return report
-        
+
+    @staticmethod
+    def _online_frames(df):
+        """Splits reviewed rows into category and type training inputs."""
+        df = df.copy()
+        df['description'] = df['description'].fillna("")
+        cat_df = df[df['category'].notna() & (df['category'] != 'Uncategorized')]
+        type_df = df[df['type'].notna()].copy()
+        type_df['signed_amount'] = signed_amounts(type_df)
+        return cat_df, type_df
+
+    @staticmethod
+    def _watermark(df):
+        """Returns the newest reviewed_at and the row ids that share it."""
+        reviewed = df[df['reviewed_at'].notna()] if 'reviewed_at' in df.columns else df.iloc[0:0]
+        if reviewed.empty:
+            return None, []
+        watermark = str(reviewed['reviewed_at'].astype(str).max())
+        return watermark, sorted(reviewed.loc[reviewed['reviewed_at'].astype(str) == watermark, 'id'].astype(str))
+
+    def _fit_online(self, df, report):
+        """Full rebuild of the online models from every reviewed row."""
+        report['update'] = 'rebuild'
+        cat_df, type_df = self._online_frames(df)
+        report['category_samples'] = len(cat_df)
+        report['type_samples'] = len(type_df)
+
+        self.cat_model = None
+        if cat_df['category'].nunique() >= 2:
+            self.cat_model = OnlineTextModel().fit(cat_df['description'], cat_df['category'])
+            report['category_model'] = 'trained'
+        else:
+            report['warnings'].append('Need at least two categories to train the online category model.')
+
+        self.type_model = None
+        if type_df['type'].nunique() >= 2:
+            self.type_model = OnlineTextModel(with_amount=True).fit(
+                type_df[['description', 'signed_amount']], type_df['type']
+            )
+            report['type_model'] = 'trained'
+        else:
+            report['warnings'].append('Need at least two types to train the online type model.')
+
+        watermark, watermark_ids = self._watermark(df)
+        self._online_state = {'watermark': watermark, 'watermark_ids': watermark_ids}
+        print(f"✅ Online models rebuilt from {len(df)} reviewed transactions.")
+        return report
+
+    def update(self):
+        """
+        Online backend only: learns from rows reviewed since the saved
+        watermark with partial_fit, so cost scales with new reviews. A label
+        the models have never seen forces a full rebuild.
+        """
+        report = {
+            'status': 'skipped',
+            'backend': self.backend,
+            'update': 'incremental',
+            'trained_at': datetime.now().isoformat(timespec='seconds'),
+            'new_samples': 0,
+            'category_model': 'skipped',
+            'type_model': 'skipped',
+            'model_saved_file': False,
+            'model_saved_database': False,
+            'warnings': [],
+            'error': ''
+        }
+        if self.backend != ONLINE_BACKEND:
+            report['warnings'].append('Incremental updates need MONEY_TRACKER_ML_BACKEND=online.')
+            return report
+
+        self._ensure_loaded()
+        if not (self._cat_model or self._type_model):
+            return self.train()
+
+        watermark = self._online_state.get('watermark')
+        seen_ids = set(self._online_state.get('watermark_ids') or [])
+        batch = db.get_reviewed_transactions_since(watermark)
+        batch = batch[~batch['id'].astype(str).isin(seen_ids)]
+        report['new_samples'] = len(batch)
+        if batch.empty:
+            return report
+
+        cat_df, type_df = self._online_frames(batch)
+        needs_rebuild = (
+            (not cat_df.empty and (self._cat_model is None or not self._cat_model.knows_labels(cat_df['category'])))
+            or (not type_df.empty and (self._type_model is None or not self._type_model.knows_labels(type_df['type'])))
+        )
+        if needs_rebuild:
+            print("🧠 New labels reviewed; rebuilding online models...")
+            return self.train()
+
+        if not cat_df.empty:
+            self._cat_model.partial_fit(cat_df['description'], cat_df['category'])
+            report['category_model'] = 'updated'
+        if not type_df.empty:
+            self._type_model.partial_fit(type_df[['description', 'signed_amount']], type_df['type'])
+            report['type_model'] = 'updated'
+
+        batch_watermark, batch_ids = self._watermark(batch)
+        if batch_watermark == watermark:
+            batch_ids = sorted(seen_ids | set(batch_ids))
+        self._online_state = {'watermark': batch_watermark, 'watermark_ids': batch_ids}
+        print(f"✅ Online models updated from {len(batch)} newly reviewed transactions.")
+        return self._save_payload(self._payload(), report)
+
+    @property
+    def merchant_cache(self):
+        if self._merchant_cache is None:
+            try:
+                artifact = db.load_ml_artifact(MERCHANT_CACHE_ARTIFACT)
+                self._merchant_cache = json.loads(artifact['artifact']) if artifact else {}
+            except Exception as e:
+                print(f"⚠️ Error loading merchant cache: {e}")
+                self._merchant_cache = {}
+        return self._merchant_cache
+
+    def refresh_merchant_cache(self):
+        """Rebuilds the merchant cache from reviewed history and saves it."""
+        self._merchant_cache = build_merchant_cache(db.get_review_label_counts())
+        try:
+            db.save_ml_artifact(
+                MERCHANT_CACHE_ARTIFACT,
+                json.dumps(self._merchant_cache).encode(),
+                {'entries': len(self._merchant_cache)},
+            )
+        except Exception as e:
+            print(f"⚠️ Could not save merchant cache: {e}")
+        return len(self._merchant_cache)
+
+    def after_review(self):
+        """Refreshes everything learned from reviewed history after Inbox approvals."""
+        report = self.update() if self.backend == ONLINE_BACKEND else None
+        if not report or report.get('status') != 'success':
+            self.refresh_merchant_cache()
+        self.update_similarity_index()
+        return report
+
+    @property
+    def similarity_index(self):
+        if self._similarity_index is None:
+            try:
+                artifact = db.load_ml_artifact(SIMILARITY_INDEX_ARTIFACT)
+                if artifact:
+                    self._similarity_index = pickle.loads(artifact['artifact'])
+            except Exception as e:
+                print(f"⚠️ Error loading similarity index: {e}")
+        return self._similarity_index
+
+    def _save_similarity_index(self):
+        index = self._similarity_index
+        try:
+            db.save_ml_artifact(
+                SIMILARITY_INDEX_ARTIFACT,
+                pickle.dumps(index),
+                {'rows': len(index), 'watermark': index.watermark},
+            )
+        except Exception as e:
+            print(f"⚠️ Could not save similarity index: {e}")
+        return len(index)
+
+    def rebuild_similarity_index(self, df=None):
+        """Builds the similar-transactions index from every reviewed row and saves it."""
+        df = db.get_training_transactions() if df is None else df
+        self._similarity_index = SimilarityIndex().build(df)
+        return self._save_similarity_index()
+
+    def update_similarity_index(self):
+        """Adds rows reviewed since the index watermark; builds the index if there is none yet."""
+        index = self.similarity_index
+        if index is None:
+            return self.rebuild_similarity_index()
+        batch = db.get_reviewed_transactions_since(index.watermark)
+        batch = batch[~batch['id'].astype(str).isin(set(index.watermark_ids))]
+        if batch.empty:
+            return len(index)
+        index.add(batch)
+        return self._save_similarity_index()
+
+    def similar_transactions(self, description, k=DEFAULT_SIMILAR_K, exclude_id=None):
+        """Top-k reviewed transactions most similar to `description`, with category, type, and similarity."""
+        index = self.similarity_index
+        if index is None:
+            self.rebuild_similarity_index()
+            index = self._similarity_index
+        return index.query(description, k=k, exclude_id=exclude_id)
+
+    def lookup_merchant(self, description, signed_amount, model_available=None):
+        """
+        Answers from reviewed history when every past review of this merchant
+        and amount sign agrees on both category and type. `model_available`
+        reports whether a trained model is loaded, not whether this answer
+        came from one; `prediction_source` marks cache answers.
+        """
+        key = merchant_cache_key(description, signed_amount)
+        entry = self.merchant_cache.get(key) if key else None
+        if not entry or len(entry['category']) != 1 or len(entry['type']) != 1:
+            return None
+        (category, votes), = entry['category'].items()
+        (tx_type, _type_votes), = entry['type'].items()
+        min_votes = int(os.getenv("MONEY_TRACKER_ML_CACHE_MIN_VOTES", DEFAULT_MERCHANT_CACHE_MIN_VOTES))
+        if votes < min_votes:
+            return None
+        if model_available is None:
+            model_available = bool(self.cat_model or self.type_model)
+        return {
+            'category': category,
+            'type': tx_type,
+            'confidence': 1.0,
+            'cat_confidence': 1.0,
+            'type_confidence': 1.0,
+            'model_available': model_available,
+            'prediction_source': 'merchant_cache',
+            'merchant_votes': votes,
+        }
+
+    def should_auto_approve(self, description, signed_amount, prediction, thresholds):
+        """
+        True when the models' own prediction (see model_predictions; merchant
+        cache answers never qualify) clears its category's threshold on both
+        category and type confidence, and reviewed history agrees: every past
+        review of this merchant and amount sign chose the same category and
+        type, at least MONEY_TRACKER_AUTO_APPROVE_MIN_HISTORY times.
+        """
+        category = prediction.get('category')
+        threshold = thresholds.get(category, thresholds.get('*'))
+        if threshold is None or prediction.get('prediction_source') != 'model' or category == 'Uncategorized':
+            return False
+        model_confidence = min(float(prediction.get('cat_confidence', 0.0)), float(prediction.get('type_confidence', 0.0)))
+        if model_confidence < threshold:
+            return False
+        key = merchant_cache_key(description, signed_amount)
+        entry = self.merchant_cache.get(key) if key else None
+        if not entry or list(entry['category']) != [category] or list(entry['type']) != [prediction.get('type')]:
+            return False
+        min_history = int(os.getenv("MONEY_TRACKER_AUTO_APPROVE_MIN_HISTORY", DEFAULT_AUTO_APPROVE_MIN_HISTORY))
+        return entry['category'][category] >= min_history
+
     def predict(self, description, signed_amount):
         """
         Returns {category, type, confidence, cat_conf, type_conf}
         """
-        result = {
-            'category': 'Uncategorized',
-            'type': 'Expense' if signed_amount < 0 else 'Income', # Default fallback
-            'confidence': 0.0,
-            'cat_confidence': 0.0,
-            'type_confidence': 0.0,
-            'model_available': bool(self.cat_model or self.type_model),
-            'prediction_source': 'model' if (self.cat_model or self.type_model) else 'fallback_untrained',
-        }
-        
+        return self.predict_batch([description], [signed_amount])[0]
+
+    def model_predictions(self, descriptions, signed_amounts, predictions):
+        """
+        The models' own predictions for a batch already run through
+        predict_batch: rows the merchant cache answered are re-predicted
+        without it in one batch, and the rest are returned as they were.
+        """
+        descriptions = list(descriptions)
+        signed_amounts = list(signed_amounts)
+        results = list(predictions)
+        cached = [index for index, pred in enumerate(results) if pred.get('prediction_source') == 'merchant_cache']
+        if cached:
+            rerun = self.predict_batch(
+                [descriptions[index] for index in cached],
+                [signed_amounts[index] for index in cached],
+                use_merchant_cache=False,
+            )
+            for index, pred in zip(cached, rerun):
+                results[index] = pred
+        return results
+
+    def predict_batch(self, descriptions, signed_amounts, use_merchant_cache=True):
+        """
+        Predicts many transactions at once; returns one predict() result per row.
+        Rows the merchant cache cannot answer go through the models together,
+        and when both models share a featurizer each description is vectorized
+        once for both.
+        """
+        descriptions = list(descriptions)
+        amounts = np.asarray(list(signed_amounts), dtype=float)
+        cat_model = self.cat_model
+        type_model = self.type_model
+        model_available = bool(cat_model or type_model)
+        if use_merchant_cache:
+            results = [
+                self.lookup_merchant(description, amount, model_available=model_available)
+                for description, amount in zip(descriptions, amounts)
+            ]
+        else:
+            results = [None] * len(descriptions)
+        pending = [index for index, cached in enumerate(results) if not cached]
+        if not pending:
+            return results
+
+        for index in pending:
+            results[index] = {
+                'category': 'Uncategorized',
+                'type': 'Expense' if amounts[index] < 0 else 'Income', # Default fallback
+                'confidence': 0.0,
+                'cat_confidence': 0.0,
+                'type_confidence': 0.0,
+                'model_available': model_available,
+                'prediction_source': 'model' if model_available else 'fallback_untrained',
+            }
+        if not model_available:
+            return results
+
+        texts = clean_texts([descriptions[index] for index in pending])
+        type_input = pd.DataFrame({'description': texts, 'signed_amount': amounts[pending]})
+
+        # Models saved before shared featurization are pipelines that take raw input.
+        cat_key = getattr(cat_model, 'featurizer_key', None)
+        type_key = getattr(type_model, 'featurizer_key', None)
+        text_matrix = None
+        if cat_key is not None and cat_key == type_key:
+            text_matrix = cat_model.text_features(texts)
+
+        def shared_proba(model, X):
+            if text_matrix is not None:
+                return model.predict_proba(X, text_matrix=text_matrix)
+            return model.predict_proba(X)
+
         # 1. Predict Type
-        if self.type_model:
+        if type_model:
             try:
-                # Prepare DF for pipeline
-                input_df = pd.DataFrame({'description': [description], 'signed_amount': [signed_amount]})
-                pred_type = self.type_model.predict(input_df)[0]
-                probs = self.type_model.predict_proba(input_df)
-                confidence = np.max(probs)
-                
-                result['type'] = pred_type
-                result['type_confidence'] = round(confidence, 2)
+                probs = shared_proba(type_model, type_input)
+                labels = type_model.classes_[probs.argmax(axis=1)]
+                for index, label, confidence in zip(pending, labels, probs.max(axis=1)):
+                    results[index]['type'] = label
+                    results[index]['type_confidence'] = round(float(confidence), 2)
             except Exception as e:
                 print(f"Type pred error: {e}")
 
         # 2. Predict Category
-        if self.cat_model:
+        if cat_model:
             try:
-                pred_cat = self.cat_model.predict([description])[0]
-                probs = self.cat_model.predict_proba([description])
-                confidence = np.max(probs)
-                
-                result['category'] = pred_cat
-                result['cat_confidence'] = round(confidence, 2)
+                probs = shared_proba(cat_model, texts)
+                labels = cat_model.classes_[probs.argmax(axis=1)]
+                for index, label, confidence in zip(pending, labels, probs.max(axis=1)):
+                    results[index]['category'] = label
+                    results[index]['cat_confidence'] = round(float(confidence), 2)
             except Exception as e:
                 print(f"Cat pred error: {e}")
-                
-        # Overall confidence could be min of both?
-        result['confidence'] = min(result.get('cat_confidence', 0), result.get('type_confidence', 0))
-        
-        return result
+
+        # Overall confidence is the weaker of the two.
+        for index in pending:
+            result = results[index]
+            result['confidence'] = min(result['cat_confidence'], result['type_confidence'])
+        return results
+
+    def rescore_pending(self):
+        """
+        Re-predicts every PENDING transaction in one batch and writes back the
+        rows whose suggestion or confidences changed in one bulk update. Rows
+        the user edited are skipped, and notes are only replaced when they are
+        the automatic ML note.
+        """
+        report = {'pending': 0, 'skipped_edited': 0, 'rescored': 0}
+        df = db.get_rescore_candidates()
+        report['pending'] = len(df)
+        edited = df['edited_at'].notna()
+        report['skipped_edited'] = int(edited.sum())
+        df = df[~edited]
+        if df.empty or not (self.cat_model or self.type_model):
+            return report
+
+        predictions = self.predict_batch(df['description'].fillna(""), pending_signed_amounts(df))
+        updates = []
+        for row, prediction in zip(df.to_dict('records'), predictions):
+            update = {
+                'id': row['id'],
+                'category': prediction['category'],
+                'type': prediction['type'],
+                'user_notes': prediction_note(prediction) if is_prediction_note(row['user_notes']) else row['user_notes'],
+                'ml_confidence': float(prediction['confidence']),
+                'ml_category_confidence': float(prediction['cat_confidence']),
+                'ml_type_confidence': float(prediction['type_confidence']),
+            }
+            if any(update[key] != row[key] for key in update if key != 'id'):
+                updates.append(update)
+        report['rescored'] = db.update_ml_suggestions(updates)
+        print(f"✅ Re-scored {report['rescored']} of {report['pending']} pending transactions.")
+        return report
+
+    def get_evaluation(self):
+        """Returns the latest `python -m ml_utils bench` results saved for this backend's artifact."""
+        try:
+            info = db.get_ml_artifact_info(self.artifact_name)
+        except Exception:
+            return None
+        return _parse_metadata(info.get('metadata')).get('evaluation') if info else None
 
     def get_status(self):
+        self._ensure_loaded()
         return {
             **self.status,
             'category_model_loaded': self.cat_model is not None,
@@ -294,3 +1226,242 @@ class TransactionClassifier:
 
 # Singleton
 classifier = TransactionClassifier()
+
+
+DEFAULT_BENCH_TEST_FRACTION = 0.2
+DEFAULT_BENCH_SINGLE_SAMPLES = 200
+DEFAULT_BENCH_BATCH_SIZE = 1000
+DEFAULT_BENCH_BATCH_RUNS = 10
+
+
+def time_split(df, test_fraction=DEFAULT_BENCH_TEST_FRACTION):
+    """Holds out the newest `test_fraction` of rows by transaction date, so the test mimics future data."""
+    ordered = df.sort_values(['date', 'reviewed_at', 'id'], kind='mergesort', na_position='first')
+    test_size = min(max(int(round(len(ordered) * test_fraction)), 1), len(ordered) - 1)
+    return ordered.iloc[:-test_size].copy(), ordered.iloc[-test_size:].copy()
+
+
+def latency_percentiles(samples_ms):
+    if not samples_ms:
+        return {'p50': None, 'p99': None}
+    return {
+        'p50': round(float(np.percentile(samples_ms, 50)), 3),
+        'p99': round(float(np.percentile(samples_ms, 99)), 3),
+    }
+
+
+def label_metrics(y_true, y_pred):
+    """Overall accuracy plus precision, recall, and support for every true or predicted label."""
+    from sklearn.metrics import precision_recall_fscore_support
+
+    y_true = pd.Series(y_true, dtype=object).astype(str).to_numpy()
+    y_pred = pd.Series(y_pred, dtype=object).astype(str).to_numpy()
+    labels = sorted(set(y_true) | set(y_pred))
+    precision, recall, _f1, support = precision_recall_fscore_support(
+        y_true, y_pred, labels=labels, zero_division=0
+    )
+    return {
+        'accuracy': round(float((y_true == y_pred).mean()), 4),
+        'samples': len(y_true),
+        'classes': {
+            label: {
+                'precision': round(float(p), 4),
+                'recall': round(float(r), 4),
+                'support': int(s),
+            }
+            for label, p, r, s in zip(labels, precision, recall, support)
+        },
+    }
+
+
+def _cold_load_seconds(artifact_bytes):
+    # Runs in a fresh interpreter, so the timing includes importing scikit-learn.
+    started = time.perf_counter()
+    pickle.loads(artifact_bytes)
+    return time.perf_counter() - started
+
+
+def measure_cold_load(artifact_bytes):
+    try:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            return round(executor.submit(_cold_load_seconds, artifact_bytes).result(), 4)
+    except Exception as e:
+        print(f"⚠️ Cold load in a fresh process failed, timing in-process: {e}")
+        return round(_cold_load_seconds(artifact_bytes), 4)
+
+
+def evaluate_backend(backend, train_df, test_df, single_samples=DEFAULT_BENCH_SINGLE_SAMPLES,
+                     batch_size=DEFAULT_BENCH_BATCH_SIZE, batch_runs=DEFAULT_BENCH_BATCH_RUNS):
+    """
+    Fits a scratch classifier for `backend` on `train_df` and measures it on
+    `test_df`: quality per label, training time, artifact bytes, cold-load
+    time, and single-row and batch prediction latency. Nothing is saved, and
+    the merchant cache is bypassed so the models themselves are measured.
+    When neither model trains, every metric is None.
+    """
+    clf = TransactionClassifier(backend=backend)
+    clf._merchant_cache = {}
+    # A scratch classifier: never lazily load the saved production artifact.
+    clf._cat_model = clf._type_model = None
+    clf._loaded = True
+
+    report = clf.new_report()
+    started = time.perf_counter()
+    clf.fit(train_df, report)
+    train_seconds = time.perf_counter() - started
+    results = {
+        'backend': backend,
+        'evaluated_at': datetime.now().isoformat(timespec='seconds'),
+        'train_samples': len(train_df),
+        'test_samples': len(test_df),
+        'category_model': report['category_model'],
+        'type_model': report['type_model'],
+        'warnings': report['warnings'],
+    }
+    if not (clf.cat_model or clf.type_model):
+        results.update({
+            'train_seconds': None,
+            'artifact_bytes': None,
+            'cold_load_seconds': None,
+            'single_predict_ms': None,
+            'batch_rows': batch_size,
+            'batch_predict_ms': None,
+            'category': None,
+            'type': None,
+        })
+        return results
+    artifact_bytes = pickle.dumps(clf._payload())
+
+    test_df = test_df.copy()
+    test_df['description'] = test_df['description'].fillna("")
+    test_df['signed_amount'] = signed_amounts(test_df)
+    descriptions = test_df['description'].tolist()
+    amounts = test_df['signed_amount'].tolist()
+    predictions = pd.DataFrame(clf.predict_batch(descriptions, amounts), index=test_df.index)
+
+    cat_mask = test_df['category'].notna() & (test_df['category'] != 'Uncategorized')
+    category = None
+    if clf.cat_model is not None and cat_mask.any():
+        category = label_metrics(test_df.loc[cat_mask, 'category'], predictions.loc[cat_mask, 'category'])
+    type_metrics = None
+    if clf.type_model is not None:
+        type_metrics = label_metrics(test_df['type'], predictions['type'])
+
+    single_ms = []
+    for description, amount in list(zip(descriptions, amounts))[:single_samples]:
+        started = time.perf_counter()
+        clf.predict(description, amount)
+        single_ms.append((time.perf_counter() - started) * 1000)
+
+    # Repeat the held-out rows to fill a fixed-size batch.
+    batch_index = np.resize(np.arange(len(descriptions)), batch_size) if descriptions else []
+    batch_descriptions = [descriptions[i] for i in batch_index]
+    batch_amounts = [amounts[i] for i in batch_index]
+    batch_ms = []
+    for _run in range(batch_runs if descriptions else 0):
+        started = time.perf_counter()
+        clf.predict_batch(batch_descriptions, batch_amounts)
+        batch_ms.append((time.perf_counter() - started) * 1000)
+
+    results.update({
+        'train_seconds': round(train_seconds, 4),
+        'artifact_bytes': len(artifact_bytes),
+        'cold_load_seconds': measure_cold_load(artifact_bytes),
+        'single_predict_ms': latency_percentiles(single_ms),
+        'batch_rows': batch_size,
+        'batch_predict_ms': latency_percentiles(batch_ms),
+        'category': category,
+        'type': type_metrics,
+    })
+    return results
+
+
+def run_bench(backend=None, test_fraction=DEFAULT_BENCH_TEST_FRACTION, save=True, **options):
+    """
+    Evaluates a backend on a time-based split of reviewed transactions and,
+    when `save` is set, stores the results in that backend's artifact
+    metadata under 'evaluation' for the sidebar.
+    """
+    backend = backend or get_ml_backend()
+    df = db.get_training_transactions()
+    if len(df) < 2:
+        raise ValueError("Need at least two reviewed transactions to benchmark.")
+    train_df, test_df = time_split(df, test_fraction)
+    results = evaluate_backend(backend, train_df, test_df, **options)
+    results['test_fraction'] = test_fraction
+    results['train_until'] = str(train_df['date'].max())
+    results['test_from'] = str(test_df['date'].min())
+    # Nothing trained means nothing was measured; keep the saved evaluation.
+    trained = results['train_seconds'] is not None
+    results['saved'] = bool(save) and trained and db.update_ml_artifact_metadata(
+        ML_BACKENDS[backend], {'evaluation': results}
+    )
+    return results
+
+
+def print_bench(results):
+    def pct(value):
+        return f"{value:.1%}" if value is not None else "-"
+
+    print(f"Backend: {results['backend']} | train {results['train_samples']} rows up to {results['train_until']} "
+          f"| test {results['test_samples']} rows from {results['test_from']}")
+    if results['train_seconds'] is None:
+        print("  No model trained: " + ("; ".join(results.get('warnings') or []) or "not enough data."))
+        return
+    print(f"  Training: {results['train_seconds']}s | Artifact: {results['artifact_bytes'] / 1024:.1f} KB "
+          f"| Cold load: {results['cold_load_seconds']}s")
+    single, batch = results['single_predict_ms'], results['batch_predict_ms']
+    print(f"  Single row: p50 {single['p50']} ms, p99 {single['p99']} ms "
+          f"| {results['batch_rows']}-row batch: p50 {batch['p50']} ms, p99 {batch['p99']} ms")
+    for name in ('category', 'type'):
+        metrics = results.get(name)
+        if not metrics:
+            print(f"  {name.title()}: model not trained")
+            continue
+        print(f"  {name.title()} accuracy: {pct(metrics['accuracy'])} on {metrics['samples']} rows")
+        for label, scores in metrics['classes'].items():
+            print(f"    {label:<24} precision {pct(scores['precision']):>7} "
+                  f"recall {pct(scores['recall']):>7} support {scores['support']:>5}")
+    if results.get('saved'):
+        print("Saved results to the model's artifact metadata.")
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m ml_utils", description="Transaction classifier tools.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    bench = commands.add_parser("bench", help="Evaluate the model on a time-based held-out split.")
+    bench.add_argument("--backend", choices=sorted(ML_BACKENDS), default=None,
+                       help="Defaults to MONEY_TRACKER_ML_BACKEND.")
+    bench.add_argument("--test-fraction", type=float, default=DEFAULT_BENCH_TEST_FRACTION,
+                       help="Newest share of reviewed transactions held out for testing.")
+    bench.add_argument("--single-samples", type=int, default=DEFAULT_BENCH_SINGLE_SAMPLES)
+    bench.add_argument("--batch-size", type=int, default=DEFAULT_BENCH_BATCH_SIZE)
+    bench.add_argument("--batch-runs", type=int, default=DEFAULT_BENCH_BATCH_RUNS)
+    bench.add_argument("--no-save", action="store_true", help="Do not store results in the artifact metadata.")
+    bench.add_argument("--output", help="Write JSON results to this file.")
+    args = parser.parse_args(argv)
+
+    results = run_bench(
+        backend=args.backend,
+        test_fraction=args.test_fraction,
+        save=not args.no_save,
+        single_samples=args.single_samples,
+        batch_size=args.batch_size,
+        batch_runs=args.batch_runs,
+    )
+    print_bench(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved results to {args.output}")
+    return results
+
+
+if __name__ == "__main__":
+    # Run through the importable module so pickled classes resolve to ml_utils, not __main__.
+    import ml_utils
+
+    ml_utils.main()
@@ -0,0 +1,10 @@
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sync_benchmark import main
+
+
+if __name__ == "__main__":
+    main()
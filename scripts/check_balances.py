@@ -1,8 +1,12 @@
-import requests
+import os
 import pandas as pd
 from datetime import datetime
 import sys
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import simplefin_client
+
 try:
     import app_secrets as secrets
     SIMPLEFIN_ACCESS_URL = getattr(secrets, 'SIMPLEFIN_ACCESS_URL', "")
@@ -18,11 +22,15 @@ def check_balances():
 
     print("🔎 Fetching Account Balances via SimpleFin...")
     
-    # We fetch accounts. We don't need a date range for balances, usually returns current state.
+    # Balances-only requests can be served from a recent sync response stored
+    # in the database, so this script does not spend SimpleFIN quota when a
+    # sync (or the daemon) just ran.
     try:
-        res = requests.get(SIMPLEFIN_ACCESS_URL + "/accounts")
-        res.raise_for_status()
-        data = res.json()
+        data = simplefin_client.fetch_accounts(
+            SIMPLEFIN_ACCESS_URL,
+            balances_only=True,
+            source="check_balances",
+        )
     except Exception as e:
         print(f"❌ Error fetching data: {e}")
         return
@@ -19,6 +19,7 @@ TABLES = [
     "balance_history",
     "sync_runs",
     "sync_account_results",
+    "sync_connection_results",
     "ml_artifacts",
 ]
 
@@ -0,0 +1,298 @@
+import hashlib
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+
+import pandas as pd
+import requests
+
+import db
+
+
+DEFAULT_DAILY_QUOTA = 24
+DEFAULT_BURST = 3
+DEFAULT_REFILL_SECONDS = 5.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_MAX_RETRY_WAIT_SECONDS = 120
+DEFAULT_CACHE_SECONDS = 300
+DEFAULT_CACHE_MAX_TRANSACTIONS = 2000
+RETRYABLE_STATUSES = {429, 503}
+
+
+class SimpleFINRateLimited(Exception):
+    """Raised when SimpleFIN throttling or the daily budget blocks a request."""
+
+
+def _env_number(name, default, cast=float):
+    value = os.getenv(name, "").strip()
+    if not value:
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        return default
+
+
+def access_url_key(access_url):
+    # Access URLs embed credentials, so budgets are keyed by a hash instead.
+    return hashlib.sha256((access_url or "").encode()).hexdigest()[:16]
+
+
+def to_epoch(value):
+    if value is None or value == "":
+        return None
+    return int(pd.to_datetime(value).timestamp())
+
+
+def parse_retry_after(value, now=None):
+    """Returns the Retry-After delay in seconds, accepting seconds or an HTTP date."""
+    if value in (None, ""):
+        return None
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = now or datetime.now(retry_at.tzinfo)
+    return max((retry_at - now).total_seconds(), 0.0)
+
+
+class TokenBucket:
+    """Paces requests: `capacity` back-to-back calls, then one per `refill_seconds`."""
+
+    def __init__(self, capacity, refill_seconds, clock=time.monotonic):
+        self.capacity = max(int(capacity), 1)
+        self.refill_seconds = max(float(refill_seconds), 0.0)
+        self.clock = clock
+        self.tokens = float(self.capacity)
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Takes a token and returns how long the caller must wait before using it."""
+        with self._lock:
+            now = self.clock()
+            if self.refill_seconds:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.refill_seconds)
+            else:
+                self.tokens = float(self.capacity)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens * self.refill_seconds
+
+
+def filter_payload(payload, start_ts=None, end_ts=None, balances_only=False):
+    accounts = []
+    for account in payload.get("accounts", []):
+        result = {key: value for key, value in account.items() if key != "transactions"}
+        if balances_only:
+            result["transactions"] = []
+        else:
+            result["transactions"] = [
+                tx for tx in account.get("transactions", [])
+                if (start_ts is None or (tx.get("posted") or 0) >= start_ts)
+                and (end_ts is None or (tx.get("posted") or 0) < end_ts)
+            ]
+        accounts.append(result)
+    return {**payload, "accounts": accounts}
+
+
+class RequestScheduler:
+    """
+    Single entry point for SimpleFIN /accounts requests.
+
+    - Tracks a per-access-URL daily request budget in `simplefin_request_budget`.
+    - Paces bursts with a token bucket per access URL.
+    - Honors Retry-After on 429/503 and backs off before giving up.
+    - Coalesces overlapping windows: a recent response that covers the
+      requested window is filtered and reused instead of spending quota, and
+      a new fetch widens its window to cover a still-fresh overlapping one.
+      Recent responses live in `simplefin_response_cache`, so the sync
+      script, the daemon, and check_balances reuse each other's fetches.
+      Responses with more than `cache_max_transactions` transactions are
+      persisted as balances only; the full payload stays in this process.
+    """
+
+    def __init__(self, http_get=None, sleep=time.sleep, clock=time.time):
+        self.http_get = http_get or requests.get
+        self.sleep = sleep
+        self.clock = clock
+        self.daily_quota = int(_env_number("MONEY_TRACKER_SIMPLEFIN_DAILY_QUOTA", DEFAULT_DAILY_QUOTA, int))
+        self.max_retries = int(_env_number("MONEY_TRACKER_SIMPLEFIN_MAX_RETRIES", DEFAULT_MAX_RETRIES, int))
+        self.max_retry_wait = _env_number("MONEY_TRACKER_SIMPLEFIN_MAX_RETRY_WAIT_SECONDS", DEFAULT_MAX_RETRY_WAIT_SECONDS)
+        self.cache_seconds = _env_number("MONEY_TRACKER_SIMPLEFIN_CACHE_SECONDS", DEFAULT_CACHE_SECONDS)
+        self.cache_max_transactions = int(_env_number(
+            "MONEY_TRACKER_SIMPLEFIN_CACHE_MAX_TRANSACTIONS", DEFAULT_CACHE_MAX_TRANSACTIONS, int
+        ))
+        self.burst = int(_env_number("MONEY_TRACKER_SIMPLEFIN_BURST", DEFAULT_BURST, int))
+        self.refill_seconds = _env_number("MONEY_TRACKER_SIMPLEFIN_REFILL_SECONDS", DEFAULT_REFILL_SECONDS)
+        self._buckets = {}
+        self._key_locks = {}
+        self._responses = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _bucket(self, key):
+        with self._lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self.burst, self.refill_seconds)
+            return self._buckets[key]
+
+    def _fresh_entries(self, key):
+        if self.cache_seconds <= 0:
+            return []
+        cutoff = self.clock() - self.cache_seconds
+        db.prune_simplefin_responses(cutoff)
+        with self._lock:
+            local = [entry for entry in self._responses.get(key, []) if entry["fetched_at"] >= cutoff]
+            self._responses[key] = local
+        entries = local + db.get_recent_simplefin_responses(key, cutoff)
+        return sorted(entries, key=lambda entry: entry["fetched_at"], reverse=True)
+
+    def _remember(self, key, fetched_at, start_ts, end_ts, balances_only, payload):
+        transaction_count = sum(len(account.get("transactions") or []) for account in payload.get("accounts", []))
+        if transaction_count > self.cache_max_transactions:
+            # Large windows stay in this process; other processes only get balances.
+            with self._lock:
+                self._responses.setdefault(key, []).append({
+                    "fetched_at": fetched_at,
+                    "start_ts": start_ts,
+                    "end_ts": end_ts,
+                    "balances_only": balances_only,
+                    "payload": payload,
+                })
+            start_ts, end_ts, balances_only = None, None, True
+            payload = filter_payload(payload, balances_only=True)
+        db.save_simplefin_response(key, fetched_at, start_ts, end_ts, balances_only, payload)
+
+    @staticmethod
+    def _covers(entry, start_ts, end_ts, balances_only):
+        if balances_only:
+            return True
+        if entry["balances_only"]:
+            return False
+        if entry["start_ts"] is not None and (start_ts is None or start_ts < entry["start_ts"]):
+            return False
+        if entry["end_ts"] is not None and (end_ts is None or end_ts > entry["end_ts"]):
+            return False
+        return True
+
+    def clear_cache(self):
+        with self._lock:
+            self._responses.clear()
+            db.clear_simplefin_responses()
+
+    def fetch_accounts(self, access_url, start_date=None, end_date=None, balances_only=False, source="sync"):
+        key = access_url_key(access_url)
+        start_ts = to_epoch(start_date)
+        end_ts = to_epoch(end_date)
+
+        # One in-flight request per access URL in this process; concurrent
+        # callers wait and are then served from the response the first caller
+        # cached. Separate processes share the cache but not the lock.
+        with self._key_lock(key):
+            fresh = self._fresh_entries(key)
+            for entry in fresh:
+                if self._covers(entry, start_ts, end_ts, balances_only):
+                    print(f"♻️  Reusing SimpleFIN response from {int(self.clock() - entry['fetched_at'])}s ago ({source}).")
+                    return filter_payload(entry["payload"], start_ts, end_ts, balances_only)
+
+            fetch_start, fetch_end = start_ts, end_ts
+            if not balances_only:
+                for entry in fresh:
+                    if entry["balances_only"] or entry["start_ts"] is None or entry["end_ts"] is None:
+                        continue
+                    if fetch_start is None or fetch_end is None:
+                        continue
+                    if entry["start_ts"] <= fetch_end and fetch_start <= entry["end_ts"]:
+                        fetch_start = min(fetch_start, entry["start_ts"])
+                        fetch_end = max(fetch_end, entry["end_ts"])
+
+            payload = self._request(access_url, key, fetch_start, fetch_end, balances_only, source)
+            if self.cache_seconds > 0:
+                self._remember(key, self.clock(), fetch_start, fetch_end, balances_only, payload)
+            return filter_payload(payload, start_ts, end_ts, balances_only)
+
+    def _request(self, access_url, key, start_ts, end_ts, balances_only, source):
+        params = {}
+        if start_ts is not None:
+            params['start-date'] = start_ts
+        if end_ts is not None:
+            params['end-date'] = end_ts
+        if balances_only:
+            params['balances-only'] = 1
+
+        for attempt in range(self.max_retries + 1):
+            budget_date = datetime.fromtimestamp(self.clock()).strftime('%Y-%m-%d')
+            budget = db.get_simplefin_request_budget(key, budget_date)
+            if attempt == 0:
+                self._wait_for_retry_after(budget.get("retry_after_until"))
+            if int(budget.get("request_count") or 0) >= self.daily_quota:
+                raise SimpleFINRateLimited(
+                    f"Daily SimpleFIN request budget used ({budget['request_count']}/{self.daily_quota}). "
+                    "Try again tomorrow or raise MONEY_TRACKER_SIMPLEFIN_DAILY_QUOTA."
+                )
+
+            wait = self._bucket(key).reserve()
+            if wait:
+                self.sleep(wait)
+
+            res = self.http_get(access_url + "/accounts", params=params)
+            if res.status_code not in RETRYABLE_STATUSES:
+                db.record_simplefin_request(key, budget_date, res.status_code, source)
+                res.raise_for_status()
+                return res.json()
+
+            delay = parse_retry_after(res.headers.get("Retry-After"))
+            if delay is None:
+                delay = min(2 ** attempt * self.refill_seconds, self.max_retry_wait)
+            retry_after_until = (
+                datetime.fromtimestamp(self.clock()) + timedelta(seconds=delay)
+            ).isoformat(timespec="seconds")
+            db.record_simplefin_request(key, budget_date, res.status_code, source, retry_after_until)
+            if delay > self.max_retry_wait or attempt == self.max_retries:
+                raise SimpleFINRateLimited(
+                    f"SimpleFIN throttled the request (HTTP {res.status_code}); retry after {retry_after_until}."
+                )
+            print(f"⏳ SimpleFIN throttled the request; retrying in {delay:.0f}s.")
+            self.sleep(delay)
+
+        raise SimpleFINRateLimited("SimpleFIN request retries exhausted.")
+
+    def _wait_for_retry_after(self, retry_after_until):
+        if not retry_after_until:
+            return
+        try:
+            remaining = (datetime.fromisoformat(str(retry_after_until)) - datetime.fromtimestamp(self.clock())).total_seconds()
+        except ValueError:
+            return
+        if remaining <= 0:
+            return
+        if remaining > self.max_retry_wait:
+            raise SimpleFINRateLimited(f"SimpleFIN asked us to wait until {retry_after_until}.")
+        self.sleep(remaining)
+
+
+# Singleton shared by sync, backfills, and scripts in the same process; the
+# response cache behind it is shared through the database.
+scheduler = RequestScheduler()
+
+
+def fetch_accounts(access_url, start_date=None, end_date=None, balances_only=False, source="sync"):
+    return scheduler.fetch_accounts(
+        access_url,
+        start_date=start_date,
+        end_date=end_date,
+        balances_only=balances_only,
+        source=source,
+    )
@@ -0,0 +1,318 @@
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+DEFAULT_USERNAME = "stub"
+DEFAULT_PASSWORD = "stub-secret"
+
+ERROR_MODES = {"auth", "server", "rate_limit", "bridge_error"}
+
+# (bank, account name, currency, opening balance)
+ACCOUNT_TEMPLATES = [
+    ("Capital One", "360 Checking", "USD", 4200.00),
+    ("Chase", "Sapphire Preferred Card", "USD", -850.00),
+    ("American Express", "Blue Cash Everyday", "USD", -310.00),
+    ("Ally Bank", "Online Savings", "USD", 15000.00),
+    ("Discover", "Discover It Card", "USD", -120.00),
+    ("Bank of America", "Adv Plus Banking", "USD", 2300.00),
+    ("Fidelity Investments", "Individual Brokerage", "USD", 38000.00),
+    ("Robinhood", "Robinhood Roth IRA", "USD", 9100.00),
+]
+
+# (description template, min amount, max amount, sign)
+MERCHANTS = [
+    ("STARBUCKS STORE #{store}", 3.5, 12.0, -1),
+    ("BLUE BOTTLE COFFEE {store}", 4.0, 9.5, -1),
+    ("WHOLE FOODS MKT #{store}", 18.0, 160.0, -1),
+    ("TRADER JOE'S #{store}", 12.0, 95.0, -1),
+    ("SAFEWAY {store}", 9.0, 120.0, -1),
+    ("CHIPOTLE {store}", 9.0, 28.0, -1),
+    ("MCDONALD'S F{store}", 5.0, 16.0, -1),
+    ("DOORDASH*{merchant}", 18.0, 65.0, -1),
+    ("UBER *TRIP", 8.0, 55.0, -1),
+    ("LYFT *RIDE", 7.0, 48.0, -1),
+    ("SHELL OIL {store}", 25.0, 75.0, -1),
+    ("AMAZON MKTPL*{code}", 6.0, 210.0, -1),
+    ("TARGET T-{store}", 10.0, 140.0, -1),
+    ("CVS/PHARMACY #{store}", 4.0, 60.0, -1),
+    ("NETFLIX.COM", 15.49, 15.49, -1),
+    ("SPOTIFY USA", 11.99, 11.99, -1),
+    ("VERIZON WIRELESS", 65.0, 95.0, -1),
+    ("PG&E WEB ONLINE", 60.0, 180.0, -1),
+    ("CLIPPER SERVICE {code}", 20.0, 50.0, -1),
+    ("DELTA AIR LINES {code}", 180.0, 640.0, -1),
+    ("AIRBNB * {code}", 120.0, 900.0, -1),
+    ("VENMO PAYMENT {code}", 10.0, 120.0, -1),
+    ("ZELLE PAYMENT FROM {person}", 15.0, 300.0, 1),
+    ("ACME CORP PAYROLL PPD ID: {code}", 2800.0, 4200.0, 1),
+    ("INTEREST PAYMENT", 0.5, 18.0, 1),
+    ("AMAZON REFUND {code}", 6.0, 80.0, 1),
+    ("CAPITAL ONE MOBILE PYMT", 200.0, 1800.0, -1),
+]
+
+DELIVERY_MERCHANTS = ["THAI BASIL", "SUPERDUPER", "SWEETGREEN", "PIZZERIA DELFINA", "HOMEROOM"]
+PEOPLE = ["ALEX KIM", "JORDAN LEE", "SAM PATEL", "RILEY CHEN", "TAYLOR NGUYEN"]
+
+
+def _render_description(template, rng):
+    return template.format(
+        store=rng.randint(100, 9999),
+        code=f"{rng.randint(0, 16 ** 6 - 1):06X}",
+        merchant=rng.choice(DELIVERY_MERCHANTS),
+        person=rng.choice(PEOPLE),
+    )
+
+
+def generate_accounts(account_count=3, transactions_per_account=100, days=30, end_date=None,
+                      pending_ratio=0.0, seed=0):
+    """
+    Builds SimpleFIN-shaped account payloads with realistic merchant activity.
+    Output is deterministic for a given seed so benchmark runs are comparable.
+    """
+    rng = random.Random(seed)
+    end = _coerce_datetime(end_date) if end_date else datetime.now()
+    start_ts = int((end - timedelta(days=days)).timestamp())
+    end_ts = int(end.timestamp()) - 1
+
+    accounts = []
+    for account_index in range(account_count):
+        bank, name, currency, balance = ACCOUNT_TEMPLATES[account_index % len(ACCOUNT_TEMPLATES)]
+        suffix = f"{1000 + account_index:04d}"
+        org_id = bank.lower().replace(" ", "-")
+        transactions = []
+        for tx_index in range(transactions_per_account):
+            template, low, high, sign = rng.choice(MERCHANTS)
+            posted = rng.randint(start_ts, end_ts)
+            amount = sign * round(rng.uniform(low, high), 2)
+            transactions.append({
+                "id": f"TRN-stub-{account_index}-{tx_index}",
+                "posted": posted,
+                "amount": f"{amount:.2f}",
+                "description": _render_description(template, rng),
+                "payee": "",
+                "memo": "",
+                "transacted_at": posted,
+                "pending": rng.random() < pending_ratio,
+            })
+        transactions.sort(key=lambda tx: tx["posted"], reverse=True)
+        accounts.append({
+            "org": {
+                "domain": f"{org_id}.example",
+                "sfin-url": "https://sfin.example/simplefin",
+                "name": bank,
+                "id": org_id,
+            },
+            "id": f"ACT-stub-{account_index}",
+            "name": f"{name} ({suffix})",
+            "currency": currency,
+            "balance": f"{balance + account_index * 17.25:.2f}",
+            "available-balance": f"{balance + account_index * 17.25:.2f}",
+            "balance-date": end_ts,
+            "transactions": transactions,
+            "holdings": [],
+        })
+    return accounts
+
+
+def _coerce_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d")
+
+
+def filter_accounts(accounts, start_ts=None, end_ts=None, include_pending=False,
+                    account_ids=None, balances_only=False):
+    """
+    Applies the SimpleFIN /accounts query contract: start-date is inclusive,
+    end-date is exclusive, pending transactions require pending=1.
+    """
+    filtered = []
+    for account in accounts:
+        if account_ids and account["id"] not in account_ids:
+            continue
+        result = {key: value for key, value in account.items() if key != "transactions"}
+        if balances_only:
+            result["transactions"] = []
+        else:
+            result["transactions"] = [
+                tx for tx in account.get("transactions", [])
+                if (start_ts is None or tx["posted"] >= start_ts)
+                and (end_ts is None or tx["posted"] < end_ts)
+                and (include_pending or not tx.get("pending"))
+            ]
+        filtered.append(result)
+    return filtered
+
+
+class StubSimpleFINServer:
+    """
+    Local stand-in for a SimpleFIN Bridge access URL.
+    Use `access_url` anywhere the app expects SIMPLEFIN_ACCESS_URL.
+    """
+
+    def __init__(self, accounts=None, host="127.0.0.1", port=0, latency_seconds=0.0,
+                 error_mode=None, username=DEFAULT_USERNAME, password=DEFAULT_PASSWORD,
+                 retry_after_seconds=60):
+        if error_mode is not None and error_mode not in ERROR_MODES:
+            raise ValueError(f"Unknown error mode: {error_mode}")
+        self.accounts = accounts if accounts is not None else generate_accounts()
+        self.latency_seconds = latency_seconds
+        self.error_mode = error_mode
+        self.username = username
+        self.password = password
+        self.retry_after_seconds = retry_after_seconds
+        self.request_count = 0
+        self.requests = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self):
+        return self._httpd.server_address[0]
+
+    @property
+    def port(self):
+        return self._httpd.server_address[1]
+
+    @property
+    def access_url(self):
+        return f"http://{self.username}:{self.password}@{self.host}:{self.port}/simplefin"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        try:
+            self._httpd.serve_forever()
+        finally:
+            self._httpd.server_close()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *_exc):
+        self.stop()
+
+    def _record_request(self, path, params):
+        # Monotonic start/finish times let tests check requests overlapped.
+        request = {"path": path, "params": params, "started_at": time.monotonic(), "finished_at": None}
+        with self._lock:
+            self.request_count += 1
+            self.requests.append(request)
+        return request
+
+    def _is_authorized(self, header):
+        expected = base64.b64encode(f"{self.username}:{self.password}".encode()).decode()
+        return header == f"Basic {expected}"
+
+    def build_response(self, path, params, auth_header):
+        """Returns (status, headers, body dict) for a request."""
+        if not path.rstrip("/").endswith("/accounts"):
+            return 404, {}, {"errors": ["Not found"]}
+        if self.error_mode == "auth" or not self._is_authorized(auth_header):
+            return 403, {}, {"errors": ["Access denied"]}
+        if self.error_mode == "server":
+            return 500, {}, {"errors": ["Internal server error"]}
+        if self.error_mode == "rate_limit":
+            return 429, {"Retry-After": str(self.retry_after_seconds)}, {"errors": ["Too many requests"]}
+
+        def first_int(name):
+            values = params.get(name)
+            return int(values[0]) if values else None
+
+        accounts = filter_accounts(
+            self.accounts,
+            start_ts=first_int("start-date"),
+            end_ts=first_int("end-date"),
+            include_pending=params.get("pending", ["0"])[0] == "1",
+            account_ids=set(params.get("account", [])),
+            balances_only=params.get("balances-only", ["0"])[0] == "1",
+        )
+        errors = []
+        if self.error_mode == "bridge_error":
+            errors.append("Connection to an institution may need attention.")
+        return 200, {}, {"errors": errors, "accounts": accounts}
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                params = parse_qs(parsed.query)
+                request = server._record_request(parsed.path, params)
+                if server.latency_seconds:
+                    time.sleep(server.latency_seconds)
+                request["finished_at"] = time.monotonic()
+                status, headers, body = server.build_response(
+                    parsed.path, params, self.headers.get("Authorization", "")
+                )
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *_args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic SimpleFIN /accounts data locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--accounts", type=int, default=3, help="Number of accounts to generate.")
+    parser.add_argument("--transactions", type=int, default=100, help="Transactions per account.")
+    parser.add_argument("--days", type=int, default=30, help="Spread transactions over this many days.")
+    parser.add_argument("--pending-ratio", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to sleep before each response.")
+    parser.add_argument("--error-mode", choices=sorted(ERROR_MODES), default=None)
+    args = parser.parse_args()
+
+    accounts = generate_accounts(
+        account_count=args.accounts,
+        transactions_per_account=args.transactions,
+        days=args.days,
+        pending_ratio=args.pending_ratio,
+        seed=args.seed,
+    )
+    server = StubSimpleFINServer(
+        accounts=accounts,
+        host=args.host,
+        port=args.port,
+        latency_seconds=args.latency,
+        error_mode=args.error_mode,
+    )
+    print(f"Serving {args.accounts * args.transactions} transactions across {args.accounts} accounts.")
+    print(f"SIMPLEFIN_ACCESS_URL = '{server.access_url}'")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+import multiprocessing
+
+
+SCENARIOS = ["empty", "duplicate_resync", "legacy_hash"]
+DEFAULT_SIZES = [10000]
+BENCHMARK_TABLES = [
+    "transactions",
+    "sync_account_results",
+    "sync_connection_results",
+    "sync_runs",
+    "balance_history",
+    "balance_snapshot_runs",
+]
+
+
+def get_git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+        ).decode().strip()
+    except Exception:
+        return ""
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    if sys.platform == "darwin":
+        return round(peak / (1024 * 1024), 1)
+    return round(peak / 1024, 1)
+
+
+@contextmanager
+def count_round_trips(db):
+    """
+    Counts connections and statements sent to the database while active.
+    SQLite uses the statement trace hook; Postgres swaps in a counting cursor.
+    """
+    counts = {"connections": 0, "statements": 0}
+    original_get_connection = db.get_connection
+
+    def counting_get_connection():
+        conn = original_get_connection()
+        counts["connections"] += 1
+        if db.is_postgres():
+            conn.cursor_factory = _counting_cursor_factory(counts)
+        else:
+            conn.set_trace_callback(lambda _statement: counts.__setitem__("statements", counts["statements"] + 1))
+        return conn
+
+    db.get_connection = counting_get_connection
+    try:
+        yield counts
+    finally:
+        db.get_connection = original_get_connection
+
+
+def _counting_cursor_factory(counts):
+    import psycopg2.extensions
+
+    class CountingCursor(psycopg2.extensions.cursor):
+        def execute(self, query, vars=None):
+            counts["statements"] += 1
+            return super().execute(query, vars)
+
+        def executemany(self, query, vars_list):
+            vars_list = list(vars_list)
+            counts["statements"] += len(vars_list)
+            return super().executemany(query, vars_list)
+
+    return CountingCursor
+
+
+def use_database(db, db_file=None, postgres_dsn=None):
+    if postgres_dsn:
+        db.DB_URL = postgres_dsn
+    else:
+        db.DB_URL = None
+        db.DB_FILE = db_file
+    db.init_db()
+
+
+def reset_database(db):
+    conn = db.get_connection()
+    c = conn.cursor()
+    for table in BENCHMARK_TABLES:
+        c.execute(f"DELETE FROM {table}")
+    conn.commit()
+    conn.close()
+
+
+def seed_legacy_rows(db, accounts, every=2):
+    """
+    Inserts reviewed rows keyed by the old date+amount+description hash for
+    every `every`-th transaction, so the sync has to run the legacy guard.
+    """
+    import sync_simplefin
+
+    ph = '%s' if db.is_postgres() else '?'
+    rows = {}
+    for account in accounts:
+        bank_name = account.get('org', {}).get('name', 'Unknown Bank')
+        account_name = account.get('name', 'Unknown Acct')
+        for index, tx in enumerate(account.get('transactions', [])):
+            if index % every:
+                continue
+            date_str = sync_simplefin.transaction_date_from_timestamp(tx.get('posted'))
+            amount = abs(float(tx.get('amount', 0)))
+            description = tx.get('description') or 'No Desc'
+            legacy_id = db.generate_legacy_id({"date": date_str, "amount": amount, "description": description})
+            # Identical charges on the same day collapse to one legacy row,
+            # exactly as they did under the old primary key.
+            rows[legacy_id] = (
+                legacy_id, date_str, amount, description, "Uncategorized", "Expense",
+                f"{bank_name} - {account_name}", "REVIEWED",
+            )
+    conn = db.get_connection()
+    c = conn.cursor()
+    c.executemany(f'''
+        INSERT INTO transactions (id, date, amount, description, category, type, method, status)
+        VALUES ({ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph}, {ph})
+    ''', list(rows.values()))
+    conn.commit()
+    conn.close()
+    return len(rows)
+
+
+def measure_sync(access_url, db_file=None, postgres_dsn=None, with_model=False):
+    """
+    Runs one timed sync. Called in a fresh process so peak RSS belongs to this
+    sync alone rather than to earlier scenarios or the stub server.
+    """
+    os.environ["MONEY_TRACKER_ENV"] = "test"
+    if db_file:
+        os.environ["MONEY_TRACKER_DB_FILE"] = db_file
+    import db
+    import ml_utils
+    import sync_simplefin
+
+    use_database(db, db_file=db_file, postgres_dsn=postgres_dsn)
+    if not with_model:
+        ml_utils.classifier.cat_model = None
+        ml_utils.classifier.type_model = None
+    sync_simplefin.SIMPLEFIN_ACCESS_URL = access_url
+
+    with count_round_trips(db) as counts:
+        started = time.perf_counter()
+        report = sync_simplefin.sync()
+        wall_seconds = time.perf_counter() - started
+
+    return {
+        "status": report.get("status"),
+        "error": report.get("error", ""),
+        "transactions_seen": report.get("transactions_seen", 0),
+        "transactions_inserted": report.get("transactions_inserted", 0),
+        "duplicates": report.get("duplicates", 0),
+        "wall_seconds": round(wall_seconds, 4),
+        "transactions_per_second": round(report.get("transactions_seen", 0) / wall_seconds, 1) if wall_seconds else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+        "db_round_trips": counts["statements"],
+        "db_connections": counts["connections"],
+    }
+
+
+def _run_isolated(func, *args, **kwargs):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(func, *args, **kwargs).result()
+
+
+def run_benchmark(sizes=None, scenarios=None, account_count=4, postgres_dsn=None,
+                  with_model=False, workdir=None, seed=0):
+    import simplefin_stub
+
+    sizes = sizes or DEFAULT_SIZES
+    scenarios = scenarios or SCENARIOS
+    workdir = workdir or tempfile.mkdtemp(prefix="money_tracker_bench_")
+    os.environ["MONEY_TRACKER_ENV"] = "test"
+    os.environ["MONEY_TRACKER_DB_FILE"] = os.path.join(workdir, "bench_setup.db")
+    import db
+
+    # Keep generated activity inside the default 30-day sync window, which
+    # ends at today's midnight.
+    end_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    results = []
+    for size in sizes:
+        per_account = max(size // account_count, 1)
+        accounts = simplefin_stub.generate_accounts(
+            account_count=account_count,
+            transactions_per_account=per_account,
+            days=25,
+            end_date=end_date,
+            seed=seed,
+        )
+        with simplefin_stub.StubSimpleFINServer(accounts=accounts) as server:
+            for scenario in scenarios:
+                db_file = None if postgres_dsn else os.path.join(workdir, f"bench_{size}_{scenario}.db")
+                if db_file and os.path.exists(db_file):
+                    os.remove(db_file)
+                use_database(db, db_file=db_file, postgres_dsn=postgres_dsn)
+                if postgres_dsn:
+                    reset_database(db)
+
+                seeded_rows = 0
+                if scenario == "duplicate_resync":
+                    warmup = _run_isolated(measure_sync, server.access_url, db_file, postgres_dsn, with_model)
+                    seeded_rows = warmup["transactions_inserted"]
+                elif scenario == "legacy_hash":
+                    seeded_rows = seed_legacy_rows(db, accounts)
+
+                print(f"⏱️  {scenario} @ {size} transactions...")
+                measured = _run_isolated(measure_sync, server.access_url, db_file, postgres_dsn, with_model)
+                results.append({
+                    "size": size,
+                    "scenario": scenario,
+                    "seeded_rows": seeded_rows,
+                    **measured,
+                })
+
+    return {
+        "commit": get_git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": "postgres" if postgres_dsn else "sqlite",
+        "with_model": with_model,
+        "account_count": account_count,
+        "results": results,
+    }
+
+
+def compare_results(baseline, current, threshold=0.10):
+    """
+    Matches results by (database, size, scenario) and flags wall-time
+    regressions larger than `threshold`.
+    """
+    def keyed(payload):
+        return {
+            (payload.get("database"), item["size"], item["scenario"]): item
+            for item in payload.get("results", [])
+        }
+
+    baseline_results = keyed(baseline)
+    rows = []
+    for key, item in keyed(current).items():
+        previous = baseline_results.get(key)
+        if not previous or not previous.get("wall_seconds"):
+            continue
+        ratio = item["wall_seconds"] / previous["wall_seconds"]
+        rows.append({
+            "database": key[0],
+            "size": key[1],
+            "scenario": key[2],
+            "baseline_seconds": previous["wall_seconds"],
+            "current_seconds": item["wall_seconds"],
+            "ratio": round(ratio, 3),
+            "baseline_round_trips": previous.get("db_round_trips"),
+            "current_round_trips": item.get("db_round_trips"),
+            "regression": ratio > 1 + threshold,
+        })
+    return rows
+
+
+def print_results(payload):
+    print(f"Commit: {payload['commit'] or 'unknown'} | Database: {payload['database']}")
+    for item in payload["results"]:
+        print(
+            f"  {item['scenario']:<17} {item['size']:>8} tx | "
+            f"{item['wall_seconds']:>8.2f}s | {item['transactions_per_second']:>9.1f} tx/s | "
+            f"{item['peak_rss_mb']:>7.1f} MB | {item['db_round_trips']:>8} round trips | "
+            f"{item['transactions_inserted']} inserted"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sync_simplefin.sync() against the local SimpleFIN stub.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES),
+                        help="Comma-separated transaction counts, e.g. 10000,100000,1000000.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios from: {', '.join(SCENARIOS)}.")
+    parser.add_argument("--accounts", type=int, default=4, help="Number of synthetic accounts.")
+    parser.add_argument("--postgres-dsn", default=os.getenv("MONEY_TRACKER_BENCH_POSTGRES_DSN"),
+                        help="Disposable local Postgres database. Benchmark tables are emptied before each scenario.")
+    parser.add_argument("--with-model", action="store_true",
+                        help="Predict with the trained model instead of the untrained fallback.")
+    parser.add_argument("--output", help="Write JSON results to this file.")
+    parser.add_argument("--compare", help="Baseline JSON results to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed wall-time regression ratio.")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios.split(",")) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    payload = run_benchmark(
+        sizes=[int(size) for size in args.sizes.split(",") if size],
+        scenarios=args.scenarios.split(","),
+        account_count=args.accounts,
+        postgres_dsn=args.postgres_dsn,
+        with_model=args.with_model,
+    )
+    print_results(payload)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(payload, f, indent=2)
+        print(f"Saved results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        comparison = compare_results(baseline, payload, threshold=args.threshold)
+        regressions = [row for row in comparison if row["regression"]]
+        for row in comparison:
+            marker = "❌" if row["regression"] else "✅"
+            print(
+                f"{marker} {row['scenario']} @ {row['size']}: "
+                f"{row['baseline_seconds']:.2f}s -> {row['current_seconds']:.2f}s ({row['ratio']:.2f}x)"
+            )
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,30 @@
+import argparse
 import base64
+import random
+import re
 import requests
 import pandas as pd
 import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import account_classifier
 import config
 import db
 import ml_utils
+import simplefin_client
 
 # ---------------------------------------------------------
 # Secrets Management
 # ---------------------------------------------------------
 SIMPLEFIN_SETUP_TOKEN = ""
 SIMPLEFIN_ACCESS_URL = ""
+# Additional connections: a list of access URLs, a {label: access_url}
+# mapping, or a comma/newline separated string.
+SIMPLEFIN_ACCESS_URLS = []
 
 # 1. Try Streamlit Secrets (Cloud)
 try:
@@ -20,6 +32,7 @@ try:
     if hasattr(st, 'secrets'):
         SIMPLEFIN_SETUP_TOKEN = st.secrets.get("SIMPLEFIN_SETUP_TOKEN", "")
         SIMPLEFIN_ACCESS_URL = st.secrets.get("SIMPLEFIN_ACCESS_URL", "")
+        SIMPLEFIN_ACCESS_URLS = st.secrets.get("SIMPLEFIN_ACCESS_URLS", [])
 except Exception:
     pass
 
@@ -30,8 +43,10 @@ try:
         SIMPLEFIN_SETUP_TOKEN = secrets.SIMPLEFIN_SETUP_TOKEN
     if getattr(secrets, 'SIMPLEFIN_ACCESS_URL', None):
         SIMPLEFIN_ACCESS_URL = secrets.SIMPLEFIN_ACCESS_URL
+    if getattr(secrets, 'SIMPLEFIN_ACCESS_URLS', None):
+        SIMPLEFIN_ACCESS_URLS = secrets.SIMPLEFIN_ACCESS_URLS
 except ImportError:
-    if not SIMPLEFIN_ACCESS_URL:
+    if not SIMPLEFIN_ACCESS_URL and not SIMPLEFIN_ACCESS_URLS:
         print("⚠️  'app_secrets.py' not found and no Cloud secrets detected.")
 
 def claim_access_url(setup_token):
@@ -46,20 +61,117 @@ def claim_access_url(setup_token):
         print(f"Error claiming token: {e}")
         return None
 
-def fetch_data(access_url, start_date=None, end_date=None):
+def fetch_data(access_url, start_date=None, end_date=None, source="sync"):
     print(f"Fetching account data (Date Range: {start_date} to {end_date})...")
-    params = {}
-    if start_date:
-        dt = pd.to_datetime(start_date)
-        params['start-date'] = int(dt.timestamp())
-        
-    if end_date:
-        dt = pd.to_datetime(end_date)
-        params['end-date'] = int(dt.timestamp())
-        
-    res = requests.get(access_url + "/accounts", params=params)
-    res.raise_for_status()
-    return res.json()
+    return simplefin_client.fetch_accounts(
+        access_url,
+        start_date=start_date,
+        end_date=end_date,
+        source=source,
+    )
+
+
+def parse_access_urls(value):
+    """Returns [(label or None, access_url)] from a list, mapping, or delimited string."""
+    if not value:
+        return []
+    if hasattr(value, "items"):
+        entries = [(str(label), str(url)) for label, url in value.items()]
+    elif isinstance(value, str):
+        entries = [(None, url) for url in re.split(r"[,\n]", value)]
+    else:
+        entries = [(None, str(url)) for url in value]
+    return [(label, url.strip()) for label, url in entries if url and url.strip()]
+
+
+def get_access_connections():
+    """
+    Returns [(label, access_url)] for every configured SimpleFIN connection.
+    SIMPLEFIN_ACCESS_URL stays the primary connection; SIMPLEFIN_ACCESS_URLS
+    adds more. Repeated URLs are fetched once.
+    """
+    entries = parse_access_urls(SIMPLEFIN_ACCESS_URLS)
+    if SIMPLEFIN_ACCESS_URL:
+        entries.insert(0, ("primary", SIMPLEFIN_ACCESS_URL))
+    connections = []
+    seen_urls = set()
+    for index, (label, url) in enumerate(entries, start=1):
+        if url in seen_urls:
+            continue
+        seen_urls.add(url)
+        connections.append((label or f"connection_{index}", url))
+    return connections
+
+
+def fetch_connections(connections, start_date=None, end_date=None, source="sync"):
+    """
+    Fetches every connection concurrently, so the slowest connection bounds
+    the wait. A failed connection is reported instead of raised.
+    """
+    def fetch_one(connection):
+        label, access_url = connection
+        started = time.perf_counter()
+        result = {
+            "connection": label,
+            "access_key": simplefin_client.access_url_key(access_url),
+            "accounts": [],
+            "error": "",
+        }
+        try:
+            result["accounts"] = fetch_data(
+                access_url, start_date=start_date, end_date=end_date, source=source
+            ).get('accounts', [])
+        except Exception as e:
+            result["error"] = str(e)
+        result["fetch_seconds"] = round(time.perf_counter() - started, 3)
+        return result
+
+    if len(connections) <= 1:
+        return [fetch_one(connection) for connection in connections]
+    with ThreadPoolExecutor(max_workers=len(connections)) as executor:
+        return list(executor.map(fetch_one, connections))
+
+
+def _same_account_keys(account):
+    bank_name = account.get('org', {}).get('name', 'Unknown Bank')
+    account_name = account.get('name', 'Unknown Acct')
+    keys = [("name", account_classifier.normalize_bank_name(bank_name), " ".join(account_name.split()).lower())]
+    if account.get('id'):
+        keys.append(("id", account['id']))
+    return keys
+
+
+def merge_connection_accounts(connection_results):
+    """
+    Merges accounts from every connection into one set tagged with
+    `connection`. An account reached through more than one connection (same
+    SimpleFIN account id, or same bank and account name) is kept once, from
+    the connection with the newest balance-date; the others are returned as
+    duplicates.
+    """
+    kept = []
+    kept_by_key = {}
+    duplicates = []
+    for result in connection_results:
+        for account in result["accounts"]:
+            account = {**account, "connection": result["connection"]}
+            keys = _same_account_keys(account)
+            existing_index = next((kept_by_key[key] for key in keys if key in kept_by_key), None)
+            if existing_index is None:
+                for key in keys:
+                    kept_by_key[key] = len(kept)
+                kept.append(account)
+                continue
+
+            existing = kept[existing_index]
+            if (account.get('balance-date') or 0) > (existing.get('balance-date') or 0):
+                kept[existing_index] = account
+                for key in keys:
+                    kept_by_key[key] = existing_index
+                duplicates.append(existing)
+            else:
+                duplicates.append(account)
+    return kept, duplicates
 
 
 def find_duplicate_connection_reasons(accounts):
@@ -169,23 +281,26 @@ def sync():
         "transactions_inserted": 0,
         "duplicates": 0,
         "balance_accounts_seen": 0,
+        "auto_approved": 0,
         "error": "",
     }
 
     # 1. Auth Logic
-    access_url = SIMPLEFIN_ACCESS_URL
-    if not access_url and SIMPLEFIN_SETUP_TOKEN:
+    connections = get_access_connections()
+    if not connections and SIMPLEFIN_SETUP_TOKEN:
         print("Obtaining new Access URL...")
         access_url = claim_access_url(SIMPLEFIN_SETUP_TOKEN)
         print(f"IMPORTANT: Please update app_secrets.py with:\nSIMPLEFIN_ACCESS_URL = '{access_url}'")
-    
-    if not access_url:
+        if access_url:
+            connections = [("primary", access_url)]
+
+    if not connections:
         msg = "Authorization failed. Check tokens."
         print(f"❌ {msg}")
         report["status"] = "failed"
         report["error"] = msg
         report["finished_at"] = datetime.now().isoformat(timespec="seconds")
-        db.save_sync_report(report)
+        report["sync_run_id"] = db.save_sync_report(report)
         return report
 
     # 2. Fetch data. Production keeps the broad backfill window; local uses a
@@ -194,23 +309,61 @@ def sync():
     report["sync_start_date"] = start_date
     report["sync_end_date"] = end_date
     
-    try:
-        json_data = fetch_data(access_url, start_date=start_date, end_date=end_date)
-    except Exception as e:
-        msg = f"Error fetching from SimpleFin: {e}"
+    source = "backfill" if os.getenv("MONEY_TRACKER_SIMPLEFIN_START_DATE", "").strip() else "sync"
+    connection_results = fetch_connections(connections, start_date=start_date, end_date=end_date, source=source)
+    report["connections"] = [
+        {
+            "connection": result["connection"],
+            "access_key": result["access_key"],
+            "status": "failed" if result["error"] else "success",
+            "accounts_seen": len(result["accounts"]),
+            "transactions_seen": sum(len(account.get('transactions', [])) for account in result["accounts"]),
+            "fetch_seconds": result["fetch_seconds"],
+            "error": result["error"],
+        }
+        for result in connection_results
+    ]
+    failed_connections = [result for result in connection_results if result["error"]]
+    if len(connections) == 1:
+        fetch_errors = [result["error"] for result in failed_connections]
+    else:
+        fetch_errors = [f"{result['connection']}: {result['error']}" for result in failed_connections]
+    if len(failed_connections) == len(connection_results):
+        msg = f"Error fetching from SimpleFin: {'; '.join(fetch_errors)}"
         print(msg)
         report["status"] = "failed"
         report["error"] = msg
         report["finished_at"] = datetime.now().isoformat(timespec="seconds")
-        db.save_sync_report(report)
+        report["sync_run_id"] = db.save_sync_report(report)
         return report
+    for message in fetch_errors:
+        print(f"⚠️  Error fetching from SimpleFin connection {message}")
 
     # 3. Process & Normalize
-    accounts = json_data.get('accounts', [])
+    accounts, cross_connection_duplicates = merge_connection_accounts(connection_results)
     rules_map = account_classifier.rules_to_map(db.get_account_rules())
+    auto_approve_thresholds = ml_utils.get_auto_approve_thresholds()
     duplicate_reasons = find_duplicate_connection_reasons(accounts)
     balance_snapshot_rows = build_balance_snapshot_rows(accounts, duplicate_reasons, rules_map)
     report["balance_accounts_seen"] = len(balance_snapshot_rows)
+    for account in cross_connection_duplicates:
+        txs = account.get('transactions', [])
+        balance = coerce_balance(account.get('balance'))
+        report["accounts"].append({
+            "connection": account["connection"],
+            "bank": account.get('org', {}).get('name', 'Unknown Bank'),
+            "account": account.get('name', 'Unknown Acct'),
+            "included": False,
+            "skip_reason": "duplicate_connection_same_account",
+            "transaction_count": len(txs),
+            "inserted_count": 0,
+            "duplicate_count": 0,
+            "latest_transaction_date": get_latest_transaction_date(txs),
+            "balance": balance,
+            "currency": account.get('currency', ''),
+            "health_status": "Duplicate",
+            "error": "",
+        })
     for account in accounts:
         bank_name = account.get('org', {}).get('name', 'Unknown Bank')
         account_name = account.get('name', 'Unknown Acct')
@@ -224,6 +377,7 @@ def sync():
         latest_transaction_date = get_latest_transaction_date(txs)
         balance = coerce_balance(account.get('balance'))
         account_report = {
+            "connection": account.get("connection", ""),
             "bank": bank_name,
             "account": account_name,
             "included": include_account,
@@ -248,7 +402,7 @@ def sync():
             report["accounts"].append(account_report)
             continue
 
-        account_txs = []
+        candidates = []
         for tx in txs:
 
             # E*Trade Specific Filtering
@@ -259,16 +413,34 @@ def sync():
                     # print(f"   Skipping E*Trade Dividend/Reinvestment: {desc_upper}")
                     continue
 
+            date_str = transaction_date_from_timestamp(tx.get('posted'))
+            if not date_str:
+                account_report["error"] = "transaction_missing_posted_date"
+                continue
+
             # Raw amount handling
             raw_amt = float(tx.get('amount', 0))
-            
-            # --- ML PREDICTION ---
             description = tx.get('description') or tx.get('memo') or 'No Desc'
-            
-            # Predict Category and Type
-            # We pass raw_amt (signed) because Type depends on sign.
-            pred = ml_utils.classifier.predict(description, raw_amt)
-            
+            candidates.append((tx, date_str, raw_amt, description))
+
+        # --- ML PREDICTION ---
+        # Predict Category and Type for the whole account in one batch.
+        # We pass raw_amt (signed) because Type depends on sign.
+        predictions = ml_utils.classifier.predict_batch(
+            [description for _tx, _date, _amt, description in candidates],
+            [raw_amt for _tx, _date, raw_amt, _desc in candidates],
+        ) if candidates else []
+        # Auto-approval gates on the models' own confidence, never on a
+        # merchant cache answer.
+        model_predictions = ml_utils.classifier.model_predictions(
+            [description for _tx, _date, _amt, description in candidates],
+            [raw_amt for _tx, _date, raw_amt, _desc in candidates],
+            predictions,
+        ) if auto_approve_thresholds and candidates else predictions
+
+        account_txs = []
+        auto_approved_txs = []
+        for (tx, date_str, raw_amt, description), pred, model_pred in zip(candidates, predictions, model_predictions):
             # Use Prediction
             category = pred.get('category', 'Uncategorized')
             tx_type = pred.get('type', 'Expense') # Default handled by predictor usually
@@ -277,20 +449,10 @@ def sync():
             # Force absolute amount for storage
             amount = abs(raw_amt)
             
-            # Add "🤖" to notes if confidence is low? 
-            # Or just log it. Let's add it to user_notes if uncertain.
-            user_notes = ""
-            if not pred.get('model_available'):
-                user_notes = "ML model not trained"
-            elif confidence < 0.6:
-                user_notes = f"🤖 Low Confidence ({int(confidence*100)}%)"
-
-            date_str = transaction_date_from_timestamp(tx.get('posted'))
-            if not date_str:
-                account_report["error"] = "transaction_missing_posted_date"
-                continue
+            # Add "🤖" to notes if confidence is low.
+            user_notes = ml_utils.prediction_note(pred)
             
-            account_txs.append({
+            row = {
                 'id': tx.get('id'),
                 'date': date_str,
                 'description': description,
@@ -307,14 +469,31 @@ def sync():
                 'ml_confidence': float(confidence),
                 'ml_category_confidence': float(pred.get('cat_confidence', 0.0)),
                 'ml_type_confidence': float(pred.get('type_confidence', 0.0)),
-            })
-
-        if account_txs:
-            df = pd.DataFrame(account_txs)
-            added_count = db.upsert_transactions(df)
+            }
+
+            # Confident predictions that match reviewed history skip the Inbox.
+            if auto_approve_thresholds and ml_utils.classifier.should_auto_approve(
+                description, raw_amt, model_pred, auto_approve_thresholds
+            ):
+                row.update({
+                    'status': 'REVIEWED',
+                    'reviewed_at': datetime.now().isoformat(timespec="seconds"),
+                    'reviewed_by': 'system',
+                    'review_source': db.AUTO_APPROVE_SOURCE,
+                })
+                auto_approved_txs.append(row)
+            else:
+                account_txs.append(row)
+
+        if account_txs or auto_approved_txs:
+            # Auto-approved rows go in their own batch so the count is exact.
+            auto_added = db.upsert_transactions(pd.DataFrame(auto_approved_txs)) if auto_approved_txs else 0
+            added_count = auto_added + (db.upsert_transactions(pd.DataFrame(account_txs)) if account_txs else 0)
+            seen_count = len(account_txs) + len(auto_approved_txs)
+            report["auto_approved"] += auto_added
             account_report["inserted_count"] = added_count
-            account_report["duplicate_count"] = max(len(account_txs) - added_count, 0)
-            report["transactions_seen"] += len(account_txs)
+            account_report["duplicate_count"] = max(seen_count - added_count, 0)
+            report["transactions_seen"] += seen_count
             report["transactions_inserted"] += added_count
             report["duplicates"] += account_report["duplicate_count"]
         report["accounts"].append(account_report)
@@ -322,18 +501,152 @@ def sync():
     # 4. Save report
     if report["transactions_seen"]:
         print(f"✅ Sync Complete. Processed {report['transactions_seen']} transactions.")
-        print(f"📥 Added {report['transactions_inserted']} NEW transactions to the Inbox.")
+        print(f"📥 Added {report['transactions_inserted'] - report['auto_approved']} NEW transactions to the Inbox.")
+        if report["auto_approved"]:
+            print(f"🤖 Auto-approved {report['auto_approved']} high-confidence transactions.")
     else:
         print("No transactions found.")
-    report["status"] = "success"
+    if failed_connections:
+        # Accounts behind the failed connection are missing from this fetch,
+        # so keep their balances rather than replacing today's snapshot.
+        report["status"] = "partial"
+        report["error"] = f"Error fetching from SimpleFin: {'; '.join(fetch_errors)}"
+    else:
+        report["status"] = "success"
     report["finished_at"] = datetime.now().isoformat(timespec="seconds")
     sync_run_id = db.save_sync_report(report)
+    report["sync_run_id"] = sync_run_id
     db.save_balance_snapshot(
         pd.DataFrame(balance_snapshot_rows),
-        replace_for_today=True,
+        replace_for_today=not failed_connections,
         sync_run_id=sync_run_id,
     )
     return report
 
+DAEMON_HEARTBEAT_NAME = "sync_daemon"
+DEFAULT_DAEMON_INTERVAL_MINUTES = 240
+DEFAULT_DAEMON_JITTER_SECONDS = 300
+DAEMON_HEARTBEAT_SECONDS = 60
+
+
+def get_daemon_settings():
+    interval_minutes = float(os.getenv("MONEY_TRACKER_SYNC_INTERVAL_MINUTES", DEFAULT_DAEMON_INTERVAL_MINUTES))
+    jitter_seconds = float(os.getenv("MONEY_TRACKER_SYNC_JITTER_SECONDS", DEFAULT_DAEMON_JITTER_SECONDS))
+    return interval_minutes * 60, jitter_seconds
+
+
+def next_daemon_run(previous_slot, interval_seconds, now):
+    """
+    Returns the next schedule slot after `previous_slot`. If the process was
+    suspended or a sync overran, every missed slot collapses into one run now
+    instead of a burst of back-to-back syncs.
+    """
+    slot = previous_slot + interval_seconds
+    if slot <= now:
+        return now
+    return slot
+
+
+def _timestamp_to_iso(value):
+    return datetime.fromtimestamp(value).isoformat(timespec="seconds")
+
+
+def run_daemon(interval_seconds=None, jitter_seconds=None, stop_event=None, max_runs=None,
+               sync_func=None, clock=time.time, rng=None):
+    """
+    Runs sync() on a fixed interval with jitter until SIGINT/SIGTERM or
+    `stop_event` is set, keeping a heartbeat row in `sync_heartbeats`.
+    """
+    default_interval, default_jitter = get_daemon_settings()
+    interval_seconds = default_interval if interval_seconds is None else interval_seconds
+    jitter_seconds = default_jitter if jitter_seconds is None else jitter_seconds
+    stop_event = stop_event or threading.Event()
+    sync_func = sync_func or sync
+    rng = rng or random.Random()
+
+    previous_handlers = {}
+    if threading.current_thread() is threading.main_thread():
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous_handlers[signum] = signal.signal(signum, lambda *_args: stop_event.set())
+
+    started_at = datetime.now().isoformat(timespec="seconds")
+    heartbeat = {
+        "pid": os.getpid(),
+        "host": socket.gethostname(),
+        "started_at": started_at,
+        "interval_seconds": int(interval_seconds),
+    }
+
+    def beat(status, **fields):
+        heartbeat.update(fields)
+        db.record_sync_heartbeat(DAEMON_HEARTBEAT_NAME, status=status, **heartbeat)
+
+    print(f"🕒 Sync daemon started (every {interval_seconds / 60:.0f} min, up to {jitter_seconds:.0f}s jitter).")
+    slot = clock()
+    run_at = slot
+    runs = 0
+    try:
+        beat("idle", next_run_at=_timestamp_to_iso(run_at))
+        while not stop_event.is_set():
+            now = clock()
+            if now < run_at:
+                stop_event.wait(min(run_at - now, DAEMON_HEARTBEAT_SECONDS))
+                if not stop_event.is_set():
+                    beat("idle")
+                continue
+
+            beat("syncing", last_sync_started_at=datetime.now().isoformat(timespec="seconds"))
+            try:
+                # Training, reviews, and merchant-cache rebuilds happen in other
+                # processes; pick them up before classifying new rows.
+                ml_utils.classifier.reload_if_stale()
+                report = sync_func() or {}
+                last_status = report.get("status", "unknown")
+                last_error = report.get("error", "")
+            except Exception as e:
+                report = {}
+                last_status = "failed"
+                last_error = str(e)
+                print(f"❌ Scheduled sync failed: {e}")
+            runs += 1
+
+            slot = next_daemon_run(slot, interval_seconds, clock())
+            run_at = slot + (rng.uniform(0, jitter_seconds) if jitter_seconds else 0)
+            beat(
+                "idle",
+                last_sync_finished_at=datetime.now().isoformat(timespec="seconds"),
+                last_sync_status=last_status,
+                last_sync_run_id=report.get("sync_run_id"),
+                last_error=last_error,
+                next_run_at=_timestamp_to_iso(run_at),
+            )
+            if max_runs is not None and runs >= max_runs:
+                break
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+    beat("stopped", next_run_at=None)
+    print("🛑 Sync daemon stopped.")
+    return runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync SimpleFIN accounts into the Money Tracker database.")
+    parser.add_argument("--daemon", action="store_true", help="Keep running and sync on a schedule.")
+    parser.add_argument("--interval-minutes", type=float, default=None,
+                        help="Minutes between scheduled syncs (MONEY_TRACKER_SYNC_INTERVAL_MINUTES).")
+    parser.add_argument("--jitter-seconds", type=float, default=None,
+                        help="Random delay added to each run (MONEY_TRACKER_SYNC_JITTER_SECONDS).")
+    args = parser.parse_args()
+
+    if args.daemon:
+        run_daemon(
+            interval_seconds=args.interval_minutes * 60 if args.interval_minutes is not None else None,
+            jitter_seconds=args.jitter_seconds,
+        )
+    else:
+        sync()
+
+
 if __name__ == "__main__":
-    sync()
+    main()
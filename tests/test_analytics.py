@@ -0,0 +1,64 @@
+import pandas as pd
+
+
+def sample_transactions():
+    return pd.DataFrame([
+        {"date": "2026-03-30", "type": "Income", "category": "Salary", "amount": 5000.0},
+        {"date": "2026-03-31", "type": "Expense", "category": "Groceries", "amount": 80.0},
+        {"date": "2026-04-01", "type": "Expense", "category": "Groceries", "amount": 40.0},
+        {"date": "2026-04-01", "type": "Expense", "category": "Groceries", "amount": 60.0},
+        {"date": "2026-04-02 18:30:00", "type": "Expense", "category": "Restaurants", "amount": 90.0},
+        {"date": "2026-04-03", "type": "Reimbursement", "category": "Restaurants", "amount": 30.0},
+        {"date": "2026-04-03", "type": "Expense", "category": "Brokerage", "amount": 1000.0},
+        {"date": "2026-04-04", "type": "Income", "category": "Transfer", "amount": 700.0},
+        {"date": "2026-04-05", "type": "Investment", "category": "Roth IRA", "amount": 500.0},
+    ])
+
+
+def test_cube_groups_by_day_type_and_category():
+    import analytics
+
+    cube = analytics.build_cube(sample_transactions())
+
+    groceries = cube[(cube["day"] == "2026-04-01") & (cube["category"] == "Groceries")].iloc[0]
+    assert groceries["amount"] == 100.0
+    assert groceries["count"] == 2
+    # Timestamps fall into their calendar day.
+    assert (cube["day"] == pd.Timestamp("2026-04-02")).sum() == 1
+    assert cube["count"].sum() == 9
+    assert list(analytics.build_cube(sample_transactions().iloc[0:0]).columns) == analytics.CUBE_COLUMNS
+
+
+def test_views_are_slices_of_one_cube():
+    import analytics
+
+    cube = analytics.build_cube(sample_transactions())
+
+    all_time = analytics.summarize(cube)
+    assert all_time["income"] == 5000.0
+    assert all_time["gross_expense"] == 270.0
+    assert all_time["reimbursements"] == 30.0
+    assert all_time["expense"] == 240.0
+    assert all_time["savings"] == 4760.0
+
+    april = analytics.slice_cube(cube, "2026-04-01", "2026-04-30")
+    assert analytics.summarize(april)["expense"] == 160.0
+    breakdown = analytics.category_breakdown(april)
+    assert breakdown.to_dict() == {"Groceries": 100.0, "Restaurants": 60.0}
+
+    private = analytics.slice_cube(cube, show_sensitive=False)
+    assert not private["type"].isin(["Income", "Investment"]).any()
+    assert analytics.summarize(private)["income"] == 0.0
+
+
+def test_monthly_flow_nets_reimbursements_per_month():
+    import analytics
+
+    flow = analytics.monthly_flow(analytics.build_cube(sample_transactions()))
+    amounts = {(row.Label, row.Type): row.Amount for row in flow.itertuples()}
+
+    assert amounts[("Mar 2026", "Income")] == 5000.0
+    assert amounts[("Mar 2026", "Expense")] == 80.0
+    assert amounts[("Apr 2026", "Income")] == 0.0
+    assert amounts[("Apr 2026", "Expense")] == 160.0
+    assert analytics.monthly_flow(analytics.build_cube(sample_transactions().iloc[0:0])).empty
@@ -305,6 +305,33 @@ def test_review_transaction_sets_audit_fields(monkeypatch, tmp_path):
     assert row["review_source"] == "manual"
 
 
+def test_pending_pages_are_sorted_in_sql_with_display_columns_only(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    db.upsert_transactions(pd.DataFrame([{
+        "id": f"pend-{idx}",
+        "date": f"2026-04-{idx + 1:02d}",
+        "amount": [12.0, 250.0, 3.5, 80.0, 40.0][idx],
+        "description": f"MERCHANT {idx}",
+        "method": "SimpleFIN",
+        "account": ["Checking", "Card", "Checking", None, "Card"][idx],
+        "ml_confidence": [0.9, None, 0.2, 0.6, 0.4][idx],
+        "status": "REVIEWED" if idx == 4 else "PENDING",
+    } for idx in range(5)]))
+
+    assert db.count_pending_transactions() == 4
+
+    newest = db.get_pending_page(page_size=3)
+    assert list(newest.columns) == db.INBOX_COLUMNS
+    assert list(newest["id"]) == ["pend-3", "pend-2", "pend-1"]
+    assert list(db.get_pending_page(page=2, page_size=3)["id"]) == ["pend-0"]
+
+    assert list(db.get_pending_page("amount", page_size=10)["id"]) == ["pend-1", "pend-3", "pend-0", "pend-2"]
+    # Rows without a confidence or account sort last in both directions.
+    assert list(db.get_pending_page("confidence", descending=False)["id"]) == ["pend-2", "pend-3", "pend-0", "pend-1"]
+    assert list(db.get_pending_page("confidence")["id"])[-1] == "pend-1"
+    assert list(db.get_pending_page("account", descending=False)["id"]) == ["pend-1", "pend-0", "pend-2", "pend-3"]
+
+
 def test_reviewed_insert_gets_default_audit_fields(monkeypatch, tmp_path):
     db = reload_db(monkeypatch, tmp_path)
     db.upsert_transactions(pd.DataFrame([{
@@ -479,3 +506,68 @@ def test_account_rules_roundtrip(monkeypatch, tmp_path):
     assert row["classification"] == "Retirement / Restricted"
     assert bool(row["include_in_inbox"]) is False
     assert bool(row["include_in_net_worth"]) is True
+
+
+def test_expected_income_gaps_come_from_one_grouped_query(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    db.init_db()
+    # The default E*Trade rule is seeded once.
+    db.init_db()
+    rules = db.get_expected_income_rules()
+    assert list(rules["name"]) == ["E*Trade salary"]
+
+    db.upsert_transactions(pd.DataFrame([
+        {"id": "et-1", "date": "2026-09-15", "amount": 900.0, "description": "E*Trade Income",
+         "type": "Income", "method": "E*Trade - Manual", "account": "E*Trade", "status": "REVIEWED"},
+        {"id": "et-2", "date": "2026-07-01", "amount": 900.0, "description": "Stock plan",
+         "type": "Income", "method": "SimpleFIN", "account": "e*trade brokerage", "status": "REVIEWED"},
+        # Expenses and the current month never count.
+        {"id": "et-3", "date": "2026-08-03", "amount": 5.0, "description": "E*Trade fee",
+         "type": "Expense", "method": "E*Trade - Manual", "status": "REVIEWED"},
+        {"id": "et-4", "date": "2026-10-02", "amount": 900.0, "description": "E*Trade Income",
+         "type": "Income", "method": "E*Trade - Manual", "status": "REVIEWED"},
+        {"id": "rent-1", "date": "2026-09-01", "amount": 1200.0, "description": "TENANT RENT",
+         "type": "Income", "method": "SimpleFIN", "account": "Rental Checking", "status": "REVIEWED"},
+    ]))
+
+    gaps = db.find_expected_income_gaps(today="2026-10-19")
+    assert gaps == [{
+        "name": "E*Trade salary",
+        "match_pattern": "E*Trade",
+        "missing": ["2026-08", "2026-06", "2026-05", "2026-04"],
+    }]
+    assert db.find_expected_income_gaps(today="2026-10-19", months=1) == []
+
+    saved = db.replace_expected_income_rules([
+        {"name": "E*Trade salary", "match_pattern": "E*Trade", "lookback_months": 3, "enabled": False},
+        {"name": "Rent", "match_pattern": "rental", "tx_type": "Income", "lookback_months": 2},
+        {"name": "", "match_pattern": "ignored"},
+    ])
+    assert saved == 2
+    assert db.find_expected_income_gaps(today="2026-10-19") == [
+        {"name": "Rent", "match_pattern": "rental", "missing": ["2026-08"]},
+    ]
+    # Rules the user saved are not replaced by the default seed.
+    db.init_db()
+    assert set(db.get_expected_income_rules()["name"]) == {"E*Trade salary", "Rent"}
+
+
+def test_expected_income_patterns_match_literally(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    db.init_db()
+    db.replace_expected_income_rules([
+        {"name": "Payroll", "match_pattern": "ACME_PAYROLL", "tx_type": "Income", "lookback_months": 2},
+        {"name": "Bonus", "match_pattern": "100%", "tx_type": "Income", "lookback_months": 1},
+    ])
+    db.upsert_transactions(pd.DataFrame([
+        # `_` and `%` would be LIKE wildcards; these accounts must not match.
+        {"id": "p-1", "date": "2026-09-15", "amount": 900.0, "description": "Deposit",
+         "type": "Income", "method": "SimpleFIN", "account": "ACMEXPAYROLL", "status": "REVIEWED"},
+        {"id": "b-1", "date": "2026-09-15", "amount": 50.0, "description": "Deposit",
+         "type": "Income", "method": "SimpleFIN", "account": "1000 Savings", "status": "REVIEWED"},
+        {"id": "p-2", "date": "2026-08-15", "amount": 900.0, "description": "Deposit",
+         "type": "Income", "method": "SimpleFIN", "account": "acme_payroll checking", "status": "REVIEWED"},
+    ]))
+
+    gaps = {gap["name"]: gap["missing"] for gap in db.find_expected_income_gaps(today="2026-10-19")}
+    assert gaps == {"Payroll": ["2026-09"], "Bonus": ["2026-09"]}
@@ -0,0 +1,144 @@
+import importlib
+
+import pandas as pd
+
+from conftest import reload_db
+
+
+MERCHANTS = [
+    ("STARBUCKS STORE", "Coffee", "Expense", -1),
+    ("BLUE BOTTLE COFFEE", "Coffee", "Expense", -1),
+    ("WHOLE FOODS MKT", "Groceries", "Expense", -1),
+    ("TRADER JOES", "Groceries", "Expense", -1),
+    ("ACME CORP PAYROLL", "Salary", "Income", 1),
+    ("EMPLOYER DIRECT DEP", "Salary", "Income", 1),
+]
+
+
+def seed_merchants(db, per_merchant=15):
+    rows = []
+    for merchant_index, (name, category, tx_type, _sign) in enumerate(MERCHANTS):
+        for idx in range(per_merchant):
+            rows.append({
+                "id": f"bench-{merchant_index}-{idx}",
+                "date": f"2026-04-{idx + 1:02d}",
+                "amount": 3000 + idx if tx_type == "Income" else 5 + idx,
+                "description": f"{name} #{1000 + idx}",
+                "category": category,
+                "type": tx_type,
+                "method": "SimpleFIN",
+                "status": "REVIEWED",
+                "reviewed_by": "admin",
+                "review_source": "manual",
+            })
+    db.upsert_transactions(pd.DataFrame(rows))
+
+
+def test_benchmark_compares_every_backend(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    monkeypatch.chdir(tmp_path)
+    seed_merchants(db)
+    import ml_utils
+    import ml_benchmark
+
+    importlib.reload(ml_utils)
+    ml_benchmark = importlib.reload(ml_benchmark)
+    payload = ml_benchmark.run_benchmark(single_samples=5)
+
+    results = {item["backend"]: item for item in payload["results"]}
+    assert set(results) == {"forest", "linear", "online"}
+    assert payload["reviewed_samples"] == 90
+    for item in results.values():
+        assert item["test_samples"] == 18
+        assert item["category_model"] == "trained"
+        assert item["type_model"] == "trained"
+        assert item["artifact_bytes"] > 0
+        assert item["cold_load_seconds"] > 0
+        assert item["single_predict_ms"]["p50"] > 0
+        assert item["category"]["accuracy"] >= 0.8
+        assert item["type"]["accuracy"] >= 0.8
+    # Benchmarking never saves over the real artifacts.
+    assert db.get_ml_artifact_info("model.pkl") is None
+
+
+def test_bench_command_scores_newest_rows_and_saves_into_metadata(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    monkeypatch.chdir(tmp_path)
+    seed_merchants(db)
+    import ml_utils
+
+    ml_utils = importlib.reload(ml_utils)
+    ml_utils.classifier.train()
+    results = ml_utils.main(["bench", "--backend", "forest", "--single-samples", "5",
+                             "--batch-size", "50", "--batch-runs", "3"])
+
+    # The newest 20% of reviewed rows by date are held out.
+    assert results["test_samples"] == 18
+    assert results["train_until"] < results["test_from"]
+    assert set(results["category"]["classes"]) == {"Coffee", "Groceries", "Salary"}
+    assert results["category"]["classes"]["Salary"]["support"] == 6
+    assert 0 <= results["type"]["classes"]["Income"]["recall"] <= 1
+    assert results["batch_rows"] == 50
+    assert results["batch_predict_ms"]["p99"] >= results["batch_predict_ms"]["p50"] > 0
+    assert results["saved"] is True
+    assert ml_utils.classifier.get_evaluation()["test_samples"] == 18
+
+    # Retraining replaces the metadata, dropping results for the old model.
+    ml_utils.classifier.train()
+    assert ml_utils.classifier.get_evaluation() is None
+
+
+def test_linear_backend_trains_saves_and_predicts(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("MONEY_TRACKER_ML_BACKEND", "linear")
+    seed_merchants(db, per_merchant=4)
+    import ml_utils
+
+    ml_utils = importlib.reload(ml_utils)
+    report = ml_utils.classifier.train()
+
+    assert report["status"] == "success"
+    assert report["backend"] == "linear"
+    assert db.get_ml_artifact_info("linear_model.pkl") is not None
+
+    loaded = ml_utils.TransactionClassifier()
+    loaded._merchant_cache = {}
+    prediction = loaded.predict("WHOLE FOODS MKT #2001", -42.0)
+    assert loaded.status["load_source"] == "memory"
+    assert prediction["category"] == "Groceries"
+    assert prediction["type"] == "Expense"
+    assert prediction["prediction_source"] == "model"
+
+
+def test_untrainable_split_never_measures_the_saved_model(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    monkeypatch.chdir(tmp_path)
+    seed_merchants(db)
+    import ml_utils
+
+    ml_utils = importlib.reload(ml_utils)
+    ml_utils.classifier.train()
+    saved_at = db.get_ml_artifact_info("model.pkl")["trained_at"]
+    df = db.get_training_transactions()
+
+    # Three rows train neither model; the production artifact must not stand in.
+    results = ml_utils.evaluate_backend("forest", df.head(3), df.tail(10), single_samples=2)
+    assert results["category_model"] == "skipped"
+    assert results["type_model"] == "skipped"
+    assert results["category"] is None and results["type"] is None
+    assert results["train_seconds"] is None and results["single_predict_ms"] is None
+
+    # A single label cannot train the linear backend either.
+    one_label = df[df["category"] == "Coffee"]
+    assert ml_utils.evaluate_backend("linear", one_label, df.tail(10), single_samples=2)["category"] is None
+
+    # Training with too little history keeps the saved artifact as it was.
+    conn = db.get_connection()
+    conn.execute("DELETE FROM transactions WHERE id NOT IN ('bench-0-0', 'bench-0-1')")
+    conn.commit()
+    conn.close()
+    report = ml_utils.classifier.train()
+    assert report["status"] == "skipped"
+    assert db.get_ml_artifact_info("model.pkl")["trained_at"] == saved_at
+    assert ml_utils.classifier.cat_model is not None
@@ -67,3 +67,446 @@ def test_untrained_prediction_reports_fallback_source(monkeypatch, tmp_path):
     assert pred["prediction_source"] == "fallback_untrained"
     assert pred["confidence"] == 0.0
     assert pred["type"] == "Expense"
+
+
+def seed_reviewed(db, count=12):
+    db.upsert_transactions(pd.DataFrame([{
+        "id": f"reviewed-{idx}",
+        "date": "2026-04-28",
+        "amount": 10 + idx,
+        "description": f"REVIEWED RESTAURANT {idx}",
+        "category": "Restaurants",
+        "type": "Expense",
+        "method": "SimpleFIN",
+        "status": "REVIEWED",
+        "reviewed_by": "admin",
+        "review_source": "manual",
+    } for idx in range(count)]))
+
+
+def test_import_defers_sklearn_and_model_load(monkeypatch, tmp_path):
+    import subprocess
+    import sys
+
+    from conftest import ROOT
+
+    monkeypatch.setenv("MONEY_TRACKER_ENV", "test")
+    monkeypatch.setenv("MONEY_TRACKER_DB_FILE", str(tmp_path / "tracker_test.db"))
+    result = subprocess.run(
+        [sys.executable, "-c", (
+            "import sys, ml_utils; "
+            "assert 'sklearn' not in sys.modules; "
+            "assert ml_utils.classifier._loaded is False"
+        )],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+
+
+def test_loaded_model_is_cached_per_trained_at(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    seed_reviewed(db)
+    ml_utils = reload_ml(monkeypatch, tmp_path)
+    report = ml_utils.classifier.train()
+
+    def fail_blob_fetch(_name):
+        raise AssertionError("blob should come from the process cache")
+
+    monkeypatch.setattr(ml_utils.db, "load_ml_artifact", fail_blob_fetch)
+    fresh = ml_utils.TransactionClassifier()
+    status = fresh.get_status()
+
+    assert status["load_source"] == "memory"
+    assert status["last_trained_at"] == report["trained_at"]
+    assert fresh.predict("REVIEWED RESTAURANT 3", -13)["model_available"] is True
+
+
+def test_long_running_classifier_picks_up_retrained_model(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    seed_reviewed(db)
+    ml_utils = reload_ml(monkeypatch, tmp_path)
+    daemon = ml_utils.TransactionClassifier()
+    first = daemon.get_status()["last_trained_at"]
+    assert daemon.reload_if_stale() is False
+
+    # Another process retrains and rebuilds the merchant cache.
+    trainer = ml_utils.TransactionClassifier()
+    class Later(db.datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2099, 1, 1)
+
+    monkeypatch.setattr(db, "datetime", Later)
+    report = trainer.train()
+    assert report["trained_at"] != first
+
+    assert daemon._merchant_cache is None
+    assert daemon.reload_if_stale() is True
+    assert daemon.get_status()["last_trained_at"] == report["trained_at"]
+    assert daemon.merchant_cache == trainer.merchant_cache
+
+
+def test_disk_cache_skips_blob_download_until_stale(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    seed_reviewed(db)
+    ml_utils = reload_ml(monkeypatch, tmp_path)
+    report = ml_utils.classifier.train()
+    assert report["artifact_bytes"] == (tmp_path / "model.pkl").stat().st_size
+    assert report["artifact_sha256"] == ml_utils.artifact_sha256((tmp_path / "model.pkl").read_bytes())
+
+    original_load = ml_utils.db.load_ml_artifact
+    downloads = []
+
+    def counting_load(name):
+        downloads.append(name)
+        return original_load(name)
+
+    monkeypatch.setattr(ml_utils.db, "load_ml_artifact", counting_load)
+    ml_utils._MODEL_CACHE.clear()
+    assert ml_utils.TransactionClassifier().get_status()["load_source"] == "file_cache"
+    assert downloads == []
+
+    (tmp_path / "model.pkl").write_bytes(b"stale")
+    ml_utils._MODEL_CACHE.clear()
+    assert ml_utils.TransactionClassifier().get_status()["load_source"] == "database"
+    assert downloads == ["model.pkl"]
+    assert ml_utils.artifact_sha256((tmp_path / "model.pkl").read_bytes()) == report["artifact_sha256"]
+
+
+def review_rows(db, rows, reviewed_at):
+    db.upsert_transactions(pd.DataFrame([{
+        "date": "2026-04-28",
+        "method": "SimpleFIN",
+        "status": "REVIEWED",
+        "reviewed_at": reviewed_at,
+        "reviewed_by": "admin",
+        "review_source": "manual",
+        **row,
+    } for row in rows]))
+
+
+def test_online_backend_learns_only_from_new_reviews(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    monkeypatch.setenv("MONEY_TRACKER_ML_BACKEND", "online")
+    review_rows(db, [
+        {"id": f"coffee-{idx}", "amount": 5, "description": f"BLUE BOTTLE COFFEE {idx}",
+         "category": "Restaurants", "type": "Expense"}
+        for idx in range(6)
+    ] + [
+        {"id": f"pay-{idx}", "amount": 3000, "description": f"ACME PAYROLL {idx}",
+         "category": "Salary", "type": "Income"}
+        for idx in range(6)
+    ], "2026-04-28T10:00:00")
+    ml_utils = reload_ml(monkeypatch, tmp_path)
+    assert ml_utils.classifier.backend == "online"
+
+    report = ml_utils.classifier.train()
+    assert report["update"] == "rebuild"
+    assert report["category_model"] == "trained"
+    assert (tmp_path / "online_model.pkl").exists()
+    assert ml_utils.classifier.update()["new_samples"] == 0
+
+    review_rows(db, [
+        {"id": "coffee-new", "amount": 6, "description": "BLUE BOTTLE COFFEE 99",
+         "category": "Restaurants", "type": "Expense"},
+    ], "2026-04-29T09:00:00")
+    update = ml_utils.classifier.update()
+    assert update["update"] == "incremental"
+    assert update["new_samples"] == 1
+    assert update["category_model"] == "updated"
+    assert ml_utils.classifier.cat_model.samples_seen == 13
+
+    # A restart resumes from the saved watermark.
+    ml_utils._MODEL_CACHE.clear()
+    restarted = ml_utils.TransactionClassifier()
+    assert restarted.update()["new_samples"] == 0
+    assert restarted.predict("ACME PAYROLL 7", 3100)["type"] == "Income"
+
+
+def test_online_backend_rebuilds_for_unseen_labels(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    monkeypatch.setenv("MONEY_TRACKER_ML_BACKEND", "online")
+    review_rows(db, [
+        {"id": f"row-{idx}", "amount": 10, "description": f"MERCHANT {idx}",
+         "category": "Groceries" if idx % 2 else "Gas", "type": "Expense" if idx % 3 else "Income"}
+        for idx in range(8)
+    ], "2026-04-28T10:00:00")
+    ml_utils = reload_ml(monkeypatch, tmp_path)
+    ml_utils.classifier.train()
+
+    review_rows(db, [
+        {"id": "travel-1", "amount": 400, "description": "DELTA AIR LINES",
+         "category": "Travel", "type": "Expense"},
+    ], "2026-04-29T09:00:00")
+    report = ml_utils.classifier.update()
+
+    assert report["update"] == "rebuild"
+    assert "Travel" in set(ml_utils.classifier.cat_model.classes_)
+
+
+def test_merchant_key_strips_store_numbers_and_codes():
+    import ml_utils
+
+    assert ml_utils.merchant_key("STARBUCKS STORE #1234") == "starbucks store"
+    assert ml_utils.merchant_key("AMAZON MKTPL*1A2B3C") == "amazon mktpl"
+    assert ml_utils.merchant_key("ACME CORP PAYROLL PPD ID: 0042") == "acme corp payroll ppd id"
+    assert ml_utils.merchant_key("12345") == ""
+
+
+def test_merchant_cache_answers_unanimous_history_and_refreshes_on_review(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    review_rows(db, [
+        {"id": f"sbux-{idx}", "amount": 5, "description": f"STARBUCKS STORE #{1000 + idx}",
+         "category": "Restaurants", "type": "Expense"}
+        for idx in range(3)
+    ] + [
+        {"id": "amzn-1", "amount": 20, "description": "AMAZON MKTPL*A1", "category": "Shopping", "type": "Expense"},
+        {"id": "amzn-2", "amount": 30, "description": "AMAZON MKTPL*B2", "category": "Groceries", "type": "Expense"},
+    ], "2026-04-28T10:00:00")
+    ml_utils = reload_ml(monkeypatch, tmp_path)
+    ml_utils.classifier.cat_model = None
+    ml_utils.classifier.type_model = None
+    ml_utils.classifier.refresh_merchant_cache()
+
+    hit = ml_utils.classifier.predict("STARBUCKS STORE #9999", -6.25)
+    assert hit["prediction_source"] == "merchant_cache"
+    assert hit["category"] == "Restaurants"
+    assert hit["merchant_votes"] == 3
+    # History answered, but no model is trained.
+    assert hit["model_available"] is False
+    assert ml_utils.prediction_note(hit) == ml_utils.UNTRAINED_NOTE
+    assert ml_utils.classifier.predict("AMAZON MKTPL*Z9", -12)["prediction_source"] == "fallback_untrained"
+    assert ml_utils.classifier.predict("STARBUCKS STORE #9999", 6.25)["prediction_source"] == "fallback_untrained"
+
+    # The cache is persisted, and a conflicting review makes it fall through.
+    assert ml_utils.TransactionClassifier().lookup_merchant("STARBUCKS STORE #1", -5)["category"] == "Restaurants"
+    db.review_transaction("sbux-0", "Groceries", "", "", "Expense")
+    ml_utils.classifier.after_review()
+    assert ml_utils.classifier.lookup_merchant("STARBUCKS STORE #1", -5) is None
+
+
+def test_merchant_cache_keys_use_the_bank_sign_from_raw_data(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    # Card payments leave the bank account but are reviewed as transfers.
+    review_rows(db, [
+        {"id": f"card-{idx}", "amount": 250, "description": "CHASE CARD AUTOPAY",
+         "category": "Transfer", "type": "Transfer",
+         "raw_data": str({"id": f"card-{idx}", "amount": "-250.00", "description": "CHASE CARD AUTOPAY"})}
+        for idx in range(3)
+    ] + [
+        {"id": f"gym-{idx}", "amount": 40, "description": "CITY GYM", "category": "Fitness", "type": "Expense"}
+        for idx in range(3)
+    ], "2026-04-28T10:00:00")
+    ml_utils = reload_ml(monkeypatch, tmp_path)
+    ml_utils.classifier.refresh_merchant_cache()
+
+    assert ml_utils.classifier.lookup_merchant("CHASE CARD AUTOPAY", -250)["type"] == "Transfer"
+    assert ml_utils.classifier.lookup_merchant("CHASE CARD AUTOPAY", 250) is None
+    # Without a payload amount the type still decides the sign.
+    assert ml_utils.classifier.lookup_merchant("CITY GYM", -40)["category"] == "Fitness"
+
+
+def test_training_loader_reads_reviewed_rows_in_chunks(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    seed_reviewed(db, count=7)
+    db.upsert_transactions(pd.DataFrame([{
+        "id": "pending-1", "date": "2026-04-28", "amount": 9, "description": "PENDING",
+        "category": "Restaurants", "type": "Expense", "method": "SimpleFIN", "status": "PENDING",
+        "raw_data": "x" * 1000,
+    }]))
+    import ml_utils
+
+    chunks = list(db.iter_training_transactions(chunksize=3))
+    df = db.get_training_transactions()
+
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert list(df.columns) == db.TRAINING_COLUMNS
+    assert len(df) == 7
+    assert db.count_transactions() == 8
+    assert list(ml_utils.signed_amounts(pd.DataFrame({
+        "amount": [5.0, 7.0], "type": ["Expense", "Income"],
+    }))) == [-5.0, 7.0]
+
+
+def test_training_fits_models_in_parallel_and_reports_timings(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    seed_reviewed(db)
+    monkeypatch.setenv("MONEY_TRACKER_ML_N_JOBS", "2")
+    monkeypatch.setenv("MONEY_TRACKER_ML_PARALLEL_MIN_SAMPLES", "0")
+    monkeypatch.setattr("os.cpu_count", lambda: 4)
+    ml_utils = reload_ml(monkeypatch, tmp_path)
+
+    report = ml_utils.classifier.train()
+
+    assert report["parallel_fit"] is True
+    assert report["n_jobs"] == 2
+    assert report["category_fit_seconds"] >= 0
+    assert report["type_fit_seconds"] >= 0
+    assert ml_utils.classifier.cat_model.clf.n_jobs is None
+    assert ml_utils.classifier.predict("REVIEWED RESTAURANT 1", -11)["category"] == "Restaurants"
+
+
+def test_training_fits_sequentially_for_small_histories(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    seed_reviewed(db)
+    monkeypatch.delenv("MONEY_TRACKER_ML_PARALLEL_MIN_SAMPLES", raising=False)
+    ml_utils = reload_ml(monkeypatch, tmp_path)
+
+    report = ml_utils.classifier.train()
+
+    assert report["parallel_fit"] is False
+    assert "training_seconds" in report
+
+
+def seed_two_merchants(db, count=12):
+    db.upsert_transactions(pd.DataFrame([{
+        "id": f"{prefix}-{idx}",
+        "date": "2026-04-28",
+        "amount": amount + idx,
+        "description": f"{description} {idx}",
+        "category": category,
+        "type": tx_type,
+        "method": "SimpleFIN",
+        "status": "REVIEWED",
+        "reviewed_by": "admin",
+        "review_source": "manual",
+    } for prefix, description, category, tx_type, amount in [
+        ("food", "REVIEWED RESTAURANT", "Restaurants", "Expense", 10),
+        ("pay", "ACME PAYROLL", "Salary", "Income", 3000),
+    ] for idx in range(count)]))
+
+
+def test_category_and_type_models_share_one_vectorizer(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    seed_two_merchants(db)
+    ml_utils = reload_ml(monkeypatch, tmp_path)
+    ml_utils.classifier.train()
+
+    loaded = ml_utils.TransactionClassifier()
+    loaded._merchant_cache = {}
+    assert loaded.cat_model.vectorizer is loaded.type_model.vectorizer
+
+    calls = []
+    transform = loaded.vectorizer.transform
+    monkeypatch.setattr(loaded.vectorizer, "transform", lambda texts: calls.append(len(texts)) or transform(texts))
+    predictions = loaded.predict_batch(["REVIEWED RESTAURANT 3", "ACME PAYROLL 4", "UNKNOWN"], [-13, 3004, -1])
+
+    assert calls == [3]
+    assert [p["category"] for p in predictions[:2]] == ["Restaurants", "Salary"]
+    assert [p["type"] for p in predictions[:2]] == ["Expense", "Income"]
+    assert predictions[0] == loaded.predict("REVIEWED RESTAURANT 3", -13)
+
+
+def test_legacy_pipeline_payload_still_predicts(monkeypatch, tmp_path):
+    import pickle
+
+    from sklearn.compose import ColumnTransformer
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer
+
+    reload_db(monkeypatch, tmp_path)
+    ml_utils = reload_ml(monkeypatch, tmp_path)
+    texts = [f"REVIEWED RESTAURANT {idx}" for idx in range(6)] + [f"ACME PAYROLL {idx}" for idx in range(6)]
+    amounts = [-10.0] * 6 + [3000.0] * 6
+    cat_model = Pipeline([
+        ("tfidf", TfidfVectorizer(stop_words="english")),
+        ("clf", RandomForestClassifier(n_estimators=10, random_state=42)),
+    ]).fit(texts, ["Restaurants"] * 6 + ["Salary"] * 6)
+    type_model = Pipeline([
+        ("preprocessor", ColumnTransformer([
+            ("text", TfidfVectorizer(stop_words="english"), "description"),
+            ("amt", FunctionTransformer(ml_utils.reshape_amount, validate=False), "signed_amount"),
+        ])),
+        ("clf", RandomForestClassifier(n_estimators=10, random_state=42)),
+    ]).fit(pd.DataFrame({"description": texts, "signed_amount": amounts}), ["Expense"] * 6 + ["Income"] * 6)
+    with open(tmp_path / "model.pkl", "wb") as f:
+        pickle.dump({"cat_model": cat_model, "type_model": type_model}, f)
+
+    legacy = ml_utils.TransactionClassifier()
+    legacy._merchant_cache = {}
+    predictions = legacy.predict_batch(["ACME PAYROLL 9", "REVIEWED RESTAURANT 9"], [3100, -12])
+
+    assert legacy.status["load_source"] == "file"
+    assert [p["category"] for p in predictions] == ["Salary", "Restaurants"]
+    assert [p["type"] for p in predictions] == ["Income", "Expense"]
+
+
+def test_training_rescores_pending_rows_but_not_edited_ones(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    seed_two_merchants(db)
+    db.upsert_transactions(pd.DataFrame([{
+        "id": tx_id,
+        "date": "2026-04-29",
+        "amount": amount,
+        "description": description,
+        "category": "Uncategorized",
+        "type": "Expense",
+        "method": "SimpleFIN",
+        "status": "PENDING",
+        "user_notes": "ML model not trained",
+        "raw_data": str({"id": tx_id, "amount": f"{signed:.2f}"}),
+    } for tx_id, description, amount, signed in [
+        ("pending-food", "REVIEWED RESTAURANT 5", 15.0, -15.0),
+        ("pending-pay", "ACME PAYROLL 5", 3005.0, 3005.0),
+        ("pending-edited", "ACME PAYROLL 6", 3006.0, 3006.0),
+    ]]))
+    db.update_transaction_details([{
+        "id": "pending-edited", "category": "Gift Income", "user_notes": "birthday", "tags": "",
+        "type": "Income", "date": "2026-04-29", "amount": 3006.0,
+    }])
+    ml_utils = reload_ml(monkeypatch, tmp_path)
+
+    report = ml_utils.classifier.train()
+
+    assert report["rescore"] == {"pending": 3, "skipped_edited": 1, "rescored": 2}
+    rows = db.get_pending_transactions().set_index("id")
+    assert rows.loc["pending-food", "category"] == "Restaurants"
+    # The payroll type comes from the signed amount in the SimpleFIN payload.
+    assert rows.loc["pending-pay", ["category", "type"]].tolist() == ["Salary", "Income"]
+    assert rows.loc["pending-pay", "ml_confidence"] > 0
+    assert rows.loc["pending-pay", "user_notes"] != "ML model not trained"
+    assert rows.loc["pending-edited", ["category", "user_notes"]].tolist() == ["Gift Income", "birthday"]
+    assert rows.loc["pending-edited", "edited_at"]
+
+    # A second pass with the same model has nothing left to change.
+    assert ml_utils.classifier.rescore_pending()["rescored"] == 0
+
+    # Rows approved between the candidate read and the write are not counted.
+    suggestion = {"category": "Dining", "type": "Expense", "user_notes": "", "ml_confidence": 0.5,
+                  "ml_category_confidence": 0.5, "ml_type_confidence": 0.5}
+    db.review_transaction("pending-food", "Restaurants", "", "", "Expense")
+    assert db.update_ml_suggestions([
+        {**suggestion, "id": "pending-food"},
+        {**suggestion, "id": "pending-pay"},
+    ]) == 1
+
+
+def test_similar_transactions_index_is_saved_and_updated_on_review(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    seed_two_merchants(db)
+    db.upsert_transactions(pd.DataFrame([{
+        "id": "pending-bakery", "date": "2026-04-29", "amount": 8.0, "description": "TARTINE BAKERY #12",
+        "category": "Uncategorized", "type": "Expense", "method": "SimpleFIN", "status": "PENDING",
+    }]))
+    ml_utils = reload_ml(monkeypatch, tmp_path)
+
+    report = ml_utils.classifier.train()
+    assert report["similarity_index_rows"] == 24
+
+    fresh = ml_utils.TransactionClassifier()
+    neighbors = fresh.similar_transactions("ACME CORP PAYROLL 99", k=3)
+    assert len(neighbors) == 3
+    assert set(neighbors["category"]) == {"Salary"}
+    assert neighbors["similarity"].is_monotonic_decreasing
+    assert fresh.similar_transactions("TARTINE BAKERY #12").empty
+
+    db.review_transaction("pending-bakery", "Restaurants", "", "", "Expense")
+    fresh.after_review()
+    neighbors = ml_utils.TransactionClassifier().similar_transactions("TARTINE BAKERY #40", k=2)
+    assert neighbors.iloc[0]["id"] == "pending-bakery"
+    assert neighbors.iloc[0]["category"] == "Restaurants"
+    assert fresh.similar_transactions("TARTINE BAKERY", exclude_id="pending-bakery").empty
@@ -0,0 +1,148 @@
+import sqlite3
+
+import pandas as pd
+
+from conftest import reload_db
+
+
+def seed_ledger(db):
+    db.upsert_transactions(pd.DataFrame([
+        {"id": "s1", "date": "2026-04-01", "amount": 6.5, "description": "STARBUCKS STORE #1234",
+         "category": "Restaurants", "type": "Expense", "method": "SimpleFIN", "user_notes": ""},
+        {"id": "s2", "date": "2026-04-03", "amount": 90.0, "description": "WHOLE FOODS MKT",
+         "category": "Groceries", "type": "Expense", "method": "SimpleFIN", "user_notes": "starbucks gift card"},
+        {"id": "s3", "date": "2026-04-05", "amount": 3000.0, "description": "ACME CORP PAYROLL",
+         "category": "Salary", "type": "Income", "method": "SimpleFIN", "tags": "bonus"},
+        {"id": "s4", "date": "2026-04-07 09:15:00", "amount": 7.25, "description": "STARBUCKS STORE #99",
+         "category": "Restaurants", "type": "Expense", "method": "SimpleFIN", "user_notes": ""},
+    ]))
+
+
+def test_search_matches_prefixes_across_columns_and_ranks(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    db.init_db()
+    seed_ledger(db)
+
+    results = db.search_transactions("starb")
+    assert set(results["id"]) == {"s1", "s2", "s4"}
+    # Description matches outrank the notes-only match.
+    assert results["id"].iloc[-1] == "s2"
+
+    assert list(db.search_transactions("bonus")["id"]) == ["s3"]
+    assert list(db.search_transactions("starbucks store")["id"]) == ["s4", "s1"]
+    # Punctuation in the search box is not query syntax.
+    assert set(db.search_transactions('starbucks "#1234')["id"]) == {"s1"}
+
+
+def test_search_filters_are_bound_parameters(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    db.init_db()
+    seed_ledger(db)
+
+    assert list(db.search_transactions(categories=["Restaurants"])["id"]) == ["s4", "s1"]
+    assert list(db.search_transactions(exclude_types=["Income", "Investment"], types=["Expense"])["id"]) == ["s4", "s2", "s1"]
+    # The end date includes timestamped rows on that day.
+    dated = db.search_transactions(start_date="2026-04-03", end_date="2026-04-07")
+    assert list(dated["id"]) == ["s4", "s3", "s2"]
+    assert db.search_transactions("x' OR 1=1 --").empty
+
+    # Excluding types keeps rows that have no type at all.
+    conn = db.get_connection()
+    conn.execute("UPDATE transactions SET type = NULL WHERE id = 's2'")
+    conn.commit()
+    conn.close()
+    assert list(db.search_transactions(exclude_types=["Income"])["id"]) == ["s4", "s2", "s1"]
+    assert db.search_totals(exclude_types=["Income"])["count"] == 3
+
+    options = db.get_transaction_filter_options()
+    assert options["categories"] == ["Groceries", "Restaurants", "Salary"]
+    assert options["min_date"] == "2026-04-01"
+
+
+def test_search_index_follows_writes(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    db.init_db()
+    seed_ledger(db)
+
+    db.update_transaction_details([{
+        "id": "s3", "category": "Salary", "user_notes": "quarterly reimbursement", "tags": "",
+        "type": "Income", "date": "2026-04-05", "amount": 3000.0,
+    }])
+    db.review_transaction("s2", "Groceries", "weekly shop", "", "Expense")
+
+    assert list(db.search_transactions("quarterly")["id"]) == ["s3"]
+    assert db.search_transactions("bonus").empty
+    assert db.search_transactions("gift").empty
+
+    conn = db.get_connection()
+    conn.execute("DELETE FROM transactions WHERE id = 's1'")
+    conn.commit()
+    conn.close()
+    assert list(db.search_transactions("starbucks")["id"]) == ["s4"]
+
+
+def test_existing_rows_are_indexed_when_the_index_is_created(monkeypatch, tmp_path):
+    db_file = tmp_path / "tracker_test.db"
+    conn = sqlite3.connect(db_file)
+    conn.execute("""
+        CREATE TABLE transactions (
+            id TEXT PRIMARY KEY, date TEXT, amount REAL, description TEXT, category TEXT, type TEXT,
+            method TEXT, status TEXT DEFAULT 'PENDING', user_notes TEXT, tags TEXT, raw_data TEXT
+        )
+    """)
+    conn.execute("INSERT INTO transactions (id, date, amount, description) VALUES ('old-1', '2025-01-02', 4.0, 'BLUE BOTTLE COFFEE')")
+    conn.commit()
+    conn.close()
+
+    db = reload_db(monkeypatch, tmp_path)
+    db.init_db()
+
+    assert list(db.search_transactions("bottle")["id"]) == ["old-1"]
+
+
+def test_search_falls_back_to_like_without_fts(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    db.init_db()
+    seed_ledger(db)
+    monkeypatch.setattr(db, "_sqlite_has_search_index", lambda _cursor: False)
+
+    # LIKE matches substrings, not only word prefixes.
+    assert set(db.search_transactions("bucks")["id"]) == {"s1", "s2", "s4"}
+
+
+def test_keyset_pages_walk_every_row_once_with_totals_over_the_full_filter(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    db.init_db()
+    rows = [{
+        "id": f"p{idx:03d}",
+        # Several rows share a date, so the id breaks ties.
+        "date": f"2026-03-{idx // 4 + 1:02d}",
+        "amount": 10.0,
+        "description": f"MERCHANT {idx}",
+        "category": "Groceries" if idx % 5 else "Transfer",
+        "type": "Reimbursement" if idx == 7 else "Expense",
+        "method": "SimpleFIN",
+    } for idx in range(23)]
+    db.upsert_transactions(pd.DataFrame(rows))
+
+    seen = []
+    after = None
+    while True:
+        page, after = db.search_transactions_page(page_size=5, after=after)
+        assert len(page) <= 5
+        seen.extend(page["id"])
+        if after is None:
+            break
+    assert seen == sorted((row["id"] for row in rows), key=lambda tx_id: (
+        next(row["date"] for row in rows if row["id"] == tx_id), tx_id), reverse=True)
+
+    page, after = db.search_transactions_page("merchant", page_size=50)
+    assert len(page) == 23 and after is None
+
+    totals = db.search_totals()
+    assert totals["count"] == 23
+    # 17 grocery expenses minus one grocery reimbursement; transfers are excluded.
+    assert totals["gross_expense"] == 170.0
+    assert totals["reimbursements"] == 10.0
+    assert totals["net_expense"] == 160.0
+    assert db.search_totals(categories=["Transfer"])["net_expense"] == 0.0
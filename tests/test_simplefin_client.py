@@ -0,0 +1,178 @@
+import pytest
+
+from conftest import reload_db
+
+
+def make_scheduler(monkeypatch, tmp_path, **env):
+    db = reload_db(monkeypatch, tmp_path)
+    for name, value in env.items():
+        monkeypatch.setenv(name, str(value))
+    import simplefin_client
+
+    monkeypatch.setattr(simplefin_client, "db", db)
+    sleeps = []
+    scheduler = simplefin_client.RequestScheduler(sleep=sleeps.append)
+    return db, simplefin_client, scheduler, sleeps
+
+
+def test_overlapping_window_is_served_from_recent_response(monkeypatch, tmp_path):
+    db, simplefin_client, scheduler, _sleeps = make_scheduler(monkeypatch, tmp_path)
+    import simplefin_stub
+
+    accounts = simplefin_stub.generate_accounts(account_count=1, transactions_per_account=30,
+                                                days=20, end_date="2026-04-29")
+    with simplefin_stub.StubSimpleFINServer(accounts=accounts) as server:
+        wide = scheduler.fetch_accounts(server.access_url, "2026-04-09", "2026-04-29")
+        narrow = scheduler.fetch_accounts(server.access_url, "2026-04-20", "2026-04-29", source="backfill")
+        balances = scheduler.fetch_accounts(server.access_url, balances_only=True, source="check_balances")
+        request_count = server.request_count
+
+    assert request_count == 1
+    start_ts = simplefin_client.to_epoch("2026-04-20")
+    assert all(tx["posted"] >= start_ts for tx in narrow["accounts"][0]["transactions"])
+    assert len(narrow["accounts"][0]["transactions"]) < len(wide["accounts"][0]["transactions"])
+    assert balances["accounts"][0]["transactions"] == []
+    assert balances["accounts"][0]["balance"] == accounts[0]["balance"]
+
+    budget = db.get_simplefin_request_budget(
+        simplefin_client.access_url_key(server.access_url),
+        simplefin_client.datetime.now().strftime("%Y-%m-%d"),
+    )
+    assert budget["request_count"] == 1
+    assert budget["last_source"] == "sync"
+
+
+def test_throttled_request_backs_off_and_retries(monkeypatch, tmp_path):
+    db, simplefin_client, scheduler, sleeps = make_scheduler(monkeypatch, tmp_path)
+    import simplefin_stub
+
+    with simplefin_stub.StubSimpleFINServer(accounts=[], error_mode="rate_limit", retry_after_seconds=7) as server:
+        def sleep_then_recover(seconds):
+            sleeps.append(seconds)
+            server.error_mode = None
+
+        scheduler.sleep = sleep_then_recover
+        payload = scheduler.fetch_accounts(server.access_url, "2026-04-01", "2026-04-29")
+        request_count = server.request_count
+
+    assert payload["accounts"] == []
+    assert request_count == 2
+    assert 7.0 in sleeps
+    budget = db.get_simplefin_request_budget(
+        simplefin_client.access_url_key(server.access_url),
+        simplefin_client.datetime.now().strftime("%Y-%m-%d"),
+    )
+    assert budget["request_count"] == 2
+    assert budget["throttled_count"] == 1
+    assert budget["last_status"] == 200
+
+
+def test_long_retry_after_raises_rate_limited(monkeypatch, tmp_path):
+    _db, simplefin_client, scheduler, sleeps = make_scheduler(
+        monkeypatch, tmp_path, MONEY_TRACKER_SIMPLEFIN_MAX_RETRY_WAIT_SECONDS=30
+    )
+    import simplefin_stub
+
+    with simplefin_stub.StubSimpleFINServer(accounts=[], error_mode="rate_limit", retry_after_seconds=3600) as server:
+        with pytest.raises(simplefin_client.SimpleFINRateLimited):
+            scheduler.fetch_accounts(server.access_url, "2026-04-01", "2026-04-29")
+        # The stored Retry-After blocks the next caller without another request.
+        with pytest.raises(simplefin_client.SimpleFINRateLimited):
+            scheduler.fetch_accounts(server.access_url, "2026-03-01", "2026-03-29")
+        request_count = server.request_count
+
+    assert request_count == 1
+    assert 3600 not in sleeps
+
+
+def test_daily_budget_blocks_requests(monkeypatch, tmp_path):
+    _db, simplefin_client, scheduler, _sleeps = make_scheduler(
+        monkeypatch, tmp_path, MONEY_TRACKER_SIMPLEFIN_DAILY_QUOTA=1, MONEY_TRACKER_SIMPLEFIN_CACHE_SECONDS=0
+    )
+    import simplefin_stub
+
+    with simplefin_stub.StubSimpleFINServer(accounts=[]) as server:
+        scheduler.fetch_accounts(server.access_url, "2026-04-01", "2026-04-29")
+        scheduler.clear_cache()
+        with pytest.raises(simplefin_client.SimpleFINRateLimited):
+            scheduler.fetch_accounts(server.access_url, "2026-04-01", "2026-04-29")
+        request_count = server.request_count
+
+    assert request_count == 1
+
+
+def test_token_bucket_paces_after_burst():
+    import simplefin_client
+
+    now = [0.0]
+    bucket = simplefin_client.TokenBucket(capacity=2, refill_seconds=10, clock=lambda: now[0])
+
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(10.0)
+    now[0] = 30.0
+    assert bucket.reserve() == 0.0
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates():
+    import simplefin_client
+    from datetime import datetime, timezone
+
+    assert simplefin_client.parse_retry_after("12") == 12.0
+    assert simplefin_client.parse_retry_after(None) is None
+    now = datetime(2026, 4, 29, 12, 0, 0, tzinfo=timezone.utc)
+    assert simplefin_client.parse_retry_after("Wed, 29 Apr 2026 12:01:00 GMT", now=now) == 60.0
+
+
+def test_recent_response_is_shared_across_schedulers(monkeypatch, tmp_path):
+    _db, simplefin_client, sync_scheduler, _sleeps = make_scheduler(monkeypatch, tmp_path)
+    import simplefin_stub
+
+    accounts = simplefin_stub.generate_accounts(account_count=1, transactions_per_account=5,
+                                                days=10, end_date="2026-04-29")
+    with simplefin_stub.StubSimpleFINServer(accounts=accounts) as server:
+        sync_scheduler.fetch_accounts(server.access_url, "2026-04-19", "2026-04-29")
+        # A separate process (e.g. check_balances) has its own scheduler.
+        balance_scheduler = simplefin_client.RequestScheduler(sleep=lambda _seconds: None)
+        balances = balance_scheduler.fetch_accounts(server.access_url, balances_only=True, source="check_balances")
+        request_count = server.request_count
+
+    assert request_count == 1
+    assert balances["accounts"][0]["balance"] == accounts[0]["balance"]
+
+
+def test_large_response_is_persisted_as_balances_only(monkeypatch, tmp_path):
+    db, simplefin_client, scheduler, _sleeps = make_scheduler(
+        monkeypatch, tmp_path, MONEY_TRACKER_SIMPLEFIN_CACHE_MAX_TRANSACTIONS=10
+    )
+    import simplefin_stub
+
+    accounts = simplefin_stub.generate_accounts(account_count=1, transactions_per_account=30,
+                                                days=20, end_date="2026-04-29")
+    with simplefin_stub.StubSimpleFINServer(accounts=accounts) as server:
+        wide = scheduler.fetch_accounts(server.access_url, "2026-04-09", "2026-04-29")
+        # The fetching process still reuses the full payload.
+        narrow = scheduler.fetch_accounts(server.access_url, "2026-04-20", "2026-04-29")
+        other = simplefin_client.RequestScheduler(sleep=lambda _seconds: None)
+        balances = other.fetch_accounts(server.access_url, balances_only=True, source="check_balances")
+        request_count = server.request_count
+
+    assert request_count == 1
+    assert 0 < len(narrow["accounts"][0]["transactions"]) < len(wide["accounts"][0]["transactions"])
+    assert balances["accounts"][0]["balance"] == accounts[0]["balance"]
+
+    stored = db.get_recent_simplefin_responses(simplefin_client.access_url_key(server.access_url), 0)
+    assert len(stored) == 1
+    assert stored[0]["balances_only"] is True
+    assert stored[0]["payload"]["accounts"][0]["transactions"] == []
+
+
+def test_expired_responses_are_pruned_on_read(monkeypatch, tmp_path):
+    db, simplefin_client, scheduler, _sleeps = make_scheduler(monkeypatch, tmp_path)
+
+    db.save_simplefin_response("stale-key", 1000.0, None, None, True, {"accounts": []})
+    db.save_simplefin_response("access-key", scheduler.clock(), None, None, True, {"accounts": []})
+    assert scheduler._fresh_entries("access-key")[0]["balances_only"] is True
+
+    assert db.get_recent_simplefin_responses("stale-key", 0) == []
+    assert len(db.get_recent_simplefin_responses("access-key", 0)) == 1
@@ -0,0 +1,191 @@
+from datetime import datetime
+
+import pytest
+import requests
+
+from conftest import reload_db
+from test_sync_simplefin import FakeClassifier
+
+
+def test_generated_accounts_are_deterministic_and_sized():
+    import simplefin_stub
+
+    first = simplefin_stub.generate_accounts(account_count=4, transactions_per_account=25, seed=7)
+    second = simplefin_stub.generate_accounts(account_count=4, transactions_per_account=25, seed=7)
+
+    assert len(first) == 4
+    assert all(len(account["transactions"]) == 25 for account in first)
+    assert [tx["description"] for tx in first[0]["transactions"]] == [
+        tx["description"] for tx in second[0]["transactions"]
+    ]
+    assert len({tx["id"] for account in first for tx in account["transactions"]}) == 100
+
+
+def test_filter_applies_date_window_and_pending_flag():
+    import simplefin_stub
+
+    accounts = [{
+        "id": "ACT-1",
+        "name": "Checking",
+        "transactions": [
+            {"id": "a", "posted": 100, "pending": False},
+            {"id": "b", "posted": 200, "pending": True},
+            {"id": "c", "posted": 300, "pending": False},
+        ],
+    }]
+
+    window = simplefin_stub.filter_accounts(accounts, start_ts=100, end_ts=300)
+    assert [tx["id"] for tx in window[0]["transactions"]] == ["a"]
+
+    with_pending = simplefin_stub.filter_accounts(accounts, start_ts=100, end_ts=300, include_pending=True)
+    assert [tx["id"] for tx in with_pending[0]["transactions"]] == ["a", "b"]
+
+    balances = simplefin_stub.filter_accounts(accounts, balances_only=True)
+    assert balances[0]["transactions"] == []
+
+
+def test_server_requires_access_url_credentials():
+    import simplefin_stub
+
+    with simplefin_stub.StubSimpleFINServer(accounts=[]) as server:
+        ok = requests.get(server.access_url + "/accounts")
+        denied = requests.get(f"http://{server.host}:{server.port}/simplefin/accounts")
+
+    assert ok.status_code == 200
+    assert ok.json() == {"errors": [], "accounts": []}
+    assert denied.status_code == 403
+
+
+def test_server_rate_limit_mode_sends_retry_after():
+    import simplefin_stub
+
+    with simplefin_stub.StubSimpleFINServer(error_mode="rate_limit", retry_after_seconds=12) as server:
+        res = requests.get(server.access_url + "/accounts")
+
+    assert res.status_code == 429
+    assert res.headers["Retry-After"] == "12"
+
+
+def test_unknown_error_mode_is_rejected():
+    import simplefin_stub
+
+    with pytest.raises(ValueError):
+        simplefin_stub.StubSimpleFINServer(error_mode="flaky")
+
+
+def test_sync_end_to_end_against_stub_server(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    import simplefin_stub
+    import sync_simplefin
+
+    accounts = simplefin_stub.generate_accounts(
+        account_count=2,
+        transactions_per_account=40,
+        days=10,
+        end_date=datetime.now(),
+        seed=3,
+    )
+    monkeypatch.setattr(sync_simplefin, "db", db)
+    monkeypatch.setattr(sync_simplefin.ml_utils, "classifier", FakeClassifier())
+    monkeypatch.delenv("MONEY_TRACKER_SIMPLEFIN_START_DATE", raising=False)
+    monkeypatch.setenv("MONEY_TRACKER_SYNC_DAYS", "30")
+
+    with simplefin_stub.StubSimpleFINServer(accounts=accounts) as server:
+        monkeypatch.setattr(sync_simplefin, "SIMPLEFIN_ACCESS_URL", server.access_url)
+        report = sync_simplefin.sync()
+
+    assert report["status"] == "success"
+    assert report["balance_accounts_seen"] == 2
+    # The sync end date is today's midnight, so today's activity is excluded.
+    assert 0 < report["transactions_inserted"] <= 80
+    assert report["transactions_inserted"] == len(db.get_all_transactions())
+
+
+def test_sync_records_failure_from_stub_error(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    import simplefin_stub
+    import sync_simplefin
+
+    monkeypatch.setattr(sync_simplefin, "db", db)
+    with simplefin_stub.StubSimpleFINServer(error_mode="server") as server:
+        monkeypatch.setattr(sync_simplefin, "SIMPLEFIN_ACCESS_URL", server.access_url)
+        report = sync_simplefin.sync()
+
+    assert report["status"] == "failed"
+    assert "500" in report["error"]
+
+
+def test_sync_fetches_connections_in_parallel_and_skips_shared_accounts(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    import simplefin_stub
+    import sync_simplefin
+
+    end_date = datetime.now()
+    first_accounts = simplefin_stub.generate_accounts(account_count=2, transactions_per_account=10,
+                                                      days=10, end_date=end_date, seed=1)
+    # The second connection also links the first connection's checking account.
+    second_accounts = [dict(first_accounts[0])] + simplefin_stub.generate_accounts(
+        account_count=4, transactions_per_account=10, days=10, end_date=end_date, seed=2
+    )[2:]
+    monkeypatch.setattr(sync_simplefin, "db", db)
+    monkeypatch.setattr(sync_simplefin.ml_utils, "classifier", FakeClassifier())
+    monkeypatch.setenv("MONEY_TRACKER_SYNC_DAYS", "30")
+    monkeypatch.setenv("MONEY_TRACKER_SIMPLEFIN_CACHE_SECONDS", "0")
+
+    with simplefin_stub.StubSimpleFINServer(accounts=first_accounts, latency_seconds=0.75) as first, \
+            simplefin_stub.StubSimpleFINServer(accounts=second_accounts, latency_seconds=0.75) as second:
+        monkeypatch.setattr(sync_simplefin, "SIMPLEFIN_ACCESS_URL", "")
+        monkeypatch.setattr(sync_simplefin, "SIMPLEFIN_ACCESS_URLS", {
+            "personal": first.access_url,
+            "household": second.access_url,
+        })
+        report = sync_simplefin.sync()
+        first_request, second_request = first.requests[0], second.requests[0]
+
+    assert report["status"] == "success"
+    assert [item["connection"] for item in report["connections"]] == ["personal", "household"]
+    # Both fetches overlap, so the sync waits for the slowest one, not the sum.
+    assert first_request["started_at"] < second_request["finished_at"]
+    assert second_request["started_at"] < first_request["finished_at"]
+    duplicates = [item for item in report["accounts"] if item["skip_reason"] == "duplicate_connection_same_account"]
+    assert len(duplicates) == 1
+    assert report["balance_accounts_seen"] == 4
+    assert len(db.get_latest_balance_snapshot()) == 4
+    connection_results = db.get_sync_connection_results(report["sync_run_id"])
+    assert list(connection_results["connection"]) == ["personal", "household"]
+    _latest, account_results = db.get_latest_sync_account_results()
+    assert set(account_results["connection"]) == {"personal", "household"}
+
+
+def test_sync_keeps_going_when_one_connection_fails(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    import simplefin_stub
+    import sync_simplefin
+
+    accounts = simplefin_stub.generate_accounts(account_count=1, transactions_per_account=5,
+                                                days=10, end_date=datetime.now(), seed=4)
+    monkeypatch.setattr(sync_simplefin, "db", db)
+    monkeypatch.setattr(sync_simplefin.ml_utils, "classifier", FakeClassifier())
+    monkeypatch.setenv("MONEY_TRACKER_SYNC_DAYS", "30")
+
+    with simplefin_stub.StubSimpleFINServer(accounts=accounts) as healthy, \
+            simplefin_stub.StubSimpleFINServer(error_mode="server") as broken:
+        monkeypatch.setattr(sync_simplefin, "SIMPLEFIN_ACCESS_URL", healthy.access_url)
+        monkeypatch.setattr(sync_simplefin, "SIMPLEFIN_ACCESS_URLS", [broken.access_url])
+        report = sync_simplefin.sync()
+
+    assert report["status"] == "partial"
+    assert "connection_2" in report["error"]
+    assert report["transactions_inserted"] > 0
+    statuses = {item["connection"]: item["status"] for item in report["connections"]}
+    assert statuses == {"primary": "success", "connection_2": "failed"}
+
+
+def test_access_urls_accept_lists_mappings_and_strings():
+    import sync_simplefin
+
+    assert sync_simplefin.parse_access_urls("https://a, https://b\nhttps://c") == [
+        (None, "https://a"), (None, "https://b"), (None, "https://c"),
+    ]
+    assert sync_simplefin.parse_access_urls({"home": "https://a"}) == [("home", "https://a")]
+    assert sync_simplefin.parse_access_urls(["https://a", ""]) == [(None, "https://a")]
@@ -0,0 +1,43 @@
+def test_benchmark_covers_each_scenario(monkeypatch, tmp_path):
+    monkeypatch.setenv("MONEY_TRACKER_ENV", "test")
+    monkeypatch.setenv("MONEY_TRACKER_DB_FILE", str(tmp_path / "setup.db"))
+    monkeypatch.delenv("MONEY_TRACKER_SIMPLEFIN_START_DATE", raising=False)
+    monkeypatch.delenv("MONEY_TRACKER_SYNC_DAYS", raising=False)
+    import sync_benchmark
+
+    payload = sync_benchmark.run_benchmark(sizes=[40], account_count=2, workdir=str(tmp_path))
+
+    results = {item["scenario"]: item for item in payload["results"]}
+    assert set(results) == set(sync_benchmark.SCENARIOS)
+    assert payload["database"] == "sqlite"
+    for item in results.values():
+        assert item["status"] == "success"
+        assert item["transactions_seen"] == 40
+        assert item["db_round_trips"] > 0
+        assert item["peak_rss_mb"] > 0
+    assert results["empty"]["transactions_inserted"] == 40
+    assert results["duplicate_resync"]["transactions_inserted"] == 0
+    assert results["duplicate_resync"]["duplicates"] == 40
+    assert results["legacy_hash"]["seeded_rows"] == 20
+    assert results["legacy_hash"]["transactions_inserted"] == 20
+
+
+def test_compare_results_flags_wall_time_regressions():
+    import sync_benchmark
+
+    baseline = {"database": "sqlite", "results": [
+        {"size": 100, "scenario": "empty", "wall_seconds": 1.0, "db_round_trips": 10},
+        {"size": 100, "scenario": "duplicate_resync", "wall_seconds": 1.0, "db_round_trips": 10},
+    ]}
+    current = {"database": "sqlite", "results": [
+        {"size": 100, "scenario": "empty", "wall_seconds": 1.05, "db_round_trips": 10},
+        {"size": 100, "scenario": "duplicate_resync", "wall_seconds": 1.5, "db_round_trips": 30},
+        {"size": 1000, "scenario": "empty", "wall_seconds": 9.0, "db_round_trips": 90},
+    ]}
+
+    rows = {row["scenario"]: row for row in sync_benchmark.compare_results(baseline, current)}
+
+    assert set(rows) == {"empty", "duplicate_resync"}
+    assert rows["empty"]["regression"] is False
+    assert rows["duplicate_resync"]["regression"] is True
+    assert rows["duplicate_resync"]["ratio"] == 1.5
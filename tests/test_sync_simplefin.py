@@ -1,9 +1,13 @@
 from conftest import reload_db
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 
 class FakeClassifier:
+    def predict_batch(self, descriptions, signed_amounts):
+        return [self.predict(description, amount) for description, amount in zip(descriptions, signed_amounts)]
+
     def predict(self, description, signed_amount):
         return {
             "category": "Uncategorized",
@@ -16,7 +20,7 @@ class FakeClassifier:
         }
 
 
-class UntrainedClassifier:
+class UntrainedClassifier(FakeClassifier):
     def predict(self, description, signed_amount):
         return {
             "category": "Uncategorized",
@@ -29,6 +33,17 @@ class UntrainedClassifier:
         }
 
 
+class ConfidentModel:
+    """Stand-in trained model that always picks `label` with `confidence`."""
+
+    def __init__(self, label, confidence):
+        self.classes_ = np.array([label, "Other"])
+        self.confidence = confidence
+
+    def predict_proba(self, X):
+        return np.tile([self.confidence, 1 - self.confidence], (len(X), 1))
+
+
 def test_sync_report_includes_and_skips_accounts(monkeypatch, tmp_path):
     db = reload_db(monkeypatch, tmp_path)
     import sync_simplefin
@@ -116,6 +131,140 @@ def test_sync_notes_untrained_model_without_low_confidence_percent(monkeypatch,
     assert saved["ml_confidence"] == 0.0
 
 
+def auto_approve_sync(monkeypatch, tmp_path, cat_confidence=None, type_confidence=None):
+    db = reload_db(monkeypatch, tmp_path)
+    import ml_utils
+    import sync_simplefin
+
+    classifier = ml_utils.TransactionClassifier()
+    classifier.cat_model = ConfidentModel("Restaurants", cat_confidence) if cat_confidence else None
+    classifier.type_model = ConfidentModel("Expense", type_confidence) if type_confidence else None
+    classifier._merchant_cache = {
+        "-blue bottle coffee": {"category": {"Restaurants": 4}, "type": {"Expense": 4}},
+        "-corner deli": {"category": {"Restaurants": 3, "Groceries": 2}, "type": {"Expense": 5}},
+    }
+    monkeypatch.setattr(sync_simplefin, "db", db)
+    monkeypatch.setattr(sync_simplefin, "SIMPLEFIN_ACCESS_URL", "https://example.test")
+    monkeypatch.setattr(sync_simplefin.ml_utils, "classifier", classifier)
+    monkeypatch.setenv("MONEY_TRACKER_AUTO_APPROVE_THRESHOLDS", '{"Restaurants": 0.95, "*": 0.99}')
+    monkeypatch.setattr(sync_simplefin, "fetch_data", lambda *_args, **_kwargs: {
+        "accounts": [{
+            "org": {"name": "Capital One"},
+            "name": "360 Checking (3285)",
+            "balance": "1000.25",
+            "currency": "USD",
+            "transactions": [
+                {"id": "sf-auto", "posted": 1777377600, "amount": "-6.50",
+                 "description": "BLUE BOTTLE COFFEE #12", "memo": ""},
+                {"id": "sf-mixed", "posted": 1777377600, "amount": "-9.00",
+                 "description": "CORNER DELI", "memo": ""},
+            ],
+        }]
+    })
+
+    return db, sync_simplefin.sync()
+
+
+def test_sync_auto_approves_confident_predictions_that_match_history(monkeypatch, tmp_path):
+    db, report = auto_approve_sync(monkeypatch, tmp_path, cat_confidence=0.97, type_confidence=0.98)
+
+    assert report["transactions_inserted"] == 2
+    assert report["auto_approved"] == 1
+    saved = db.get_all_transactions().set_index("id")
+    assert saved.loc["sf-auto", "status"] == "REVIEWED"
+    assert saved.loc["sf-auto", "review_source"] == db.AUTO_APPROVE_SOURCE
+    assert saved.loc["sf-auto", "reviewed_by"] == "system"
+    assert saved.loc["sf-auto", "category"] == "Restaurants"
+    # Split history never skips the Inbox.
+    assert saved.loc["sf-mixed", "status"] == "PENDING"
+    latest_run, _accounts = db.get_latest_sync_account_results()
+    assert latest_run["auto_approved"].iloc[0] == 1
+
+    assert db.count_auto_approvals() == 1
+    assert db.revert_auto_approvals() == 1
+    reverted = db.get_all_transactions().set_index("id").loc["sf-auto"]
+    assert reverted["status"] == "PENDING"
+    assert pd.isna(reverted["reviewed_at"]) and pd.isna(reverted["review_source"])
+    assert db.count_auto_approvals() == 0
+
+
+def test_merchant_history_alone_never_auto_approves(monkeypatch, tmp_path):
+    # No trained model: the unanimous cache entry answers with confidence 1.0,
+    # but that is not the model's confidence.
+    db, report = auto_approve_sync(monkeypatch, tmp_path)
+    assert report["auto_approved"] == 0
+    assert set(db.get_all_transactions()["status"]) == {"PENDING"}
+
+
+def test_auto_approved_rows_never_count_as_reviewed_history(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    import ml_utils
+
+    db.upsert_transactions(pd.DataFrame([{
+        "id": f"auto-{idx}",
+        "date": "2026-04-28",
+        "amount": 6.5,
+        "description": f"BLUE BOTTLE COFFEE #{idx}",
+        "category": "Restaurants",
+        "type": "Expense",
+        "method": "SimpleFIN",
+        "status": "REVIEWED",
+        "reviewed_at": "2026-04-28T10:00:00",
+        "reviewed_by": "system",
+        "review_source": db.AUTO_APPROVE_SOURCE,
+        "raw_data": str({"id": f"auto-{idx}", "amount": "-6.50"}),
+    } for idx in range(5)]))
+    classifier = ml_utils.TransactionClassifier()
+    classifier.refresh_merchant_cache()
+    prediction = {"category": "Restaurants", "type": "Expense", "prediction_source": "model",
+                  "cat_confidence": 0.99, "type_confidence": 0.99}
+
+    assert classifier.lookup_merchant("BLUE BOTTLE COFFEE", -6.5) is None
+    assert not classifier.should_auto_approve("BLUE BOTTLE COFFEE", -6.5, prediction, {"*": 0.9})
+    assert db.get_training_transactions().empty
+    assert db.get_reviewed_transactions_since().empty
+
+    # Once a person confirms them they are history like any other review.
+    for idx in range(2):
+        db.review_transaction(f"auto-{idx}", "Restaurants", "", "", "Expense")
+    db.update_transaction_details([{"id": "auto-2", "category": "Restaurants", "user_notes": "", "tags": "",
+                                    "type": "Expense", "date": "2026-04-28", "amount": 6.5}])
+    classifier.refresh_merchant_cache()
+    assert classifier.should_auto_approve("BLUE BOTTLE COFFEE", -6.5, prediction, {"*": 0.9})
+    assert sorted(db.get_training_transactions()["id"]) == ["auto-0", "auto-1", "auto-2"]
+
+
+def test_low_confidence_model_never_auto_approves(monkeypatch, tmp_path):
+    db, report = auto_approve_sync(monkeypatch, tmp_path, cat_confidence=0.9, type_confidence=0.99)
+    assert report["auto_approved"] == 0
+    saved = db.get_all_transactions().set_index("id")
+    assert saved.loc["sf-auto", "status"] == "PENDING"
+    # The Inbox suggestion still comes from history.
+    assert saved.loc["sf-auto", "category"] == "Restaurants"
+
+
+def test_auto_approve_is_off_without_thresholds(monkeypatch):
+    import ml_utils
+
+    monkeypatch.delenv("MONEY_TRACKER_AUTO_APPROVE_THRESHOLDS", raising=False)
+    assert ml_utils.get_auto_approve_thresholds() == {}
+    monkeypatch.setenv("MONEY_TRACKER_AUTO_APPROVE_THRESHOLDS", "0.97")
+    assert ml_utils.get_auto_approve_thresholds() == {"*": 0.97}
+
+    classifier = ml_utils.TransactionClassifier()
+    classifier._merchant_cache = {"-blue bottle coffee": {"category": {"Restaurants": 2}, "type": {"Expense": 2}}}
+    prediction = {"category": "Restaurants", "type": "Expense", "cat_confidence": 0.95, "type_confidence": 0.97,
+                  "model_available": True, "prediction_source": "model"}
+    # Two agreeing reviews are below the default minimum history of three.
+    assert not classifier.should_auto_approve("BLUE BOTTLE COFFEE", -5.0, prediction, {"*": 0.9})
+    monkeypatch.setenv("MONEY_TRACKER_AUTO_APPROVE_MIN_HISTORY", "2")
+    assert classifier.should_auto_approve("BLUE BOTTLE COFFEE", -5.0, prediction, {"*": 0.9})
+    assert not classifier.should_auto_approve("BLUE BOTTLE COFFEE", -5.0, {**prediction, "type_confidence": 0.8}, {"*": 0.9})
+    assert not classifier.should_auto_approve(
+        "BLUE BOTTLE COFFEE", -5.0, {**prediction, "prediction_source": "merchant_cache"}, {"*": 0.9}
+    )
+
+
 def test_account_rules_control_sync_and_balance_snapshot(monkeypatch, tmp_path):
     db = reload_db(monkeypatch, tmp_path)
     import sync_simplefin
@@ -328,3 +477,73 @@ def test_sync_window_can_be_explicitly_backfilled(monkeypatch):
     start_date, end_date = sync_simplefin.get_sync_date_range(datetime(2026, 4, 29))
     assert start_date == "2025-12-01"
     assert end_date == "2026-04-29"
+
+
+def test_daemon_collapses_missed_ticks_into_one_run():
+    import sync_simplefin
+
+    assert sync_simplefin.next_daemon_run(1000, 60, 1010) == 1060
+    # Suspended for five intervals: run once now, not five times.
+    assert sync_simplefin.next_daemon_run(1000, 60, 1300) == 1300
+
+
+def test_daemon_runs_syncs_and_records_heartbeat(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    import sync_simplefin
+
+    monkeypatch.setattr(sync_simplefin, "db", db)
+    calls = []
+
+    class ReloadingClassifier:
+        def reload_if_stale(self):
+            calls.append("reload")
+
+    monkeypatch.setattr(sync_simplefin.ml_utils, "classifier", ReloadingClassifier())
+
+    def fake_sync():
+        calls.append("sync")
+        return {"status": "success", "sync_run_id": calls.count("sync"), "error": ""}
+
+    runs = sync_simplefin.run_daemon(
+        interval_seconds=0,
+        jitter_seconds=0,
+        max_runs=2,
+        sync_func=fake_sync,
+    )
+
+    assert runs == 2
+    # The classifier is refreshed before every sync.
+    assert calls == ["reload", "sync", "reload", "sync"]
+    heartbeat = db.get_sync_heartbeat()
+    assert heartbeat["status"] == "stopped"
+    assert heartbeat["last_sync_status"] == "success"
+    assert heartbeat["last_sync_run_id"] == 2
+    assert heartbeat["pid"] > 0
+    assert heartbeat["last_beat_at"]
+
+
+def test_daemon_survives_failed_sync_and_stops_on_event(monkeypatch, tmp_path):
+    import threading
+
+    db = reload_db(monkeypatch, tmp_path)
+    import sync_simplefin
+
+    monkeypatch.setattr(sync_simplefin, "db", db)
+    stop_event = threading.Event()
+
+    def failing_sync():
+        stop_event.set()
+        raise RuntimeError("bank timeout")
+
+    runs = sync_simplefin.run_daemon(
+        interval_seconds=3600,
+        jitter_seconds=0,
+        stop_event=stop_event,
+        sync_func=failing_sync,
+    )
+
+    assert runs == 1
+    heartbeat = db.get_sync_heartbeat()
+    assert heartbeat["status"] == "stopped"
+    assert heartbeat["last_sync_status"] == "failed"
+    assert heartbeat["last_error"] == "bank timeout"
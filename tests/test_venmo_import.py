@@ -0,0 +1,106 @@
+import hashlib
+import io
+
+import pandas as pd
+
+from conftest import reload_db
+
+
+STATEMENT = """Account Statement - (@Shabarish-Nair) ,,,,,,,,,,,,,,,,,,,,,
+Account Activity,,,,,,,,,,,,,,,,,,,,,
+,ID,Datetime,Type,Status,Note,From,To,Amount (total),Amount (tip),Amount (tax),Amount (fee),Tax Rate,Tax Exempt,Funding Source,Destination,Beginning Balance,Ending Balance,Statement Period Venmo Fees,Terminal Location,Year to Date Venmo Fees,Disclaimer
+,,,,,,,,,,,,,,,,$12.00,,,,,
+,4601,2026-01-03T18:23:11,Payment,Complete,Sushi,Shabarish Nair,Alex Kim,"- $1,042.38",,0,,0,,Visa,,,,,Venmo,,
+,4602,2026-01-04T09:00:00,Payment,Complete,Dinner split,Alex Kim,Shabarish Nair,+ $6.00,,0,,0,,,Venmo balance,,,,Venmo,,
+,4603,2026-01-05T12:00:00,Standard Transfer,Issued,,Shabarish Nair,,- $20.00,,,,,,,Bank,,,,Venmo,,
+,4604,2026-01-06T12:00:00,Payment,Complete,Coffee,Shabarish Nair,Starbucks,- $3.30,,0,,0,,Venmo balance,,,,,Venmo,,
+,4605,not a date,Payment,Complete,Broken,Shabarish Nair,Alex Kim,- $1.00,,0,,0,,Venmo balance,,,,,Venmo,,
+,4606,2026-01-07T12:00:00,Payment,Cancelled,Tickets,Shabarish Nair,Alex Kim,- $45.00,,0,,0,,Visa,,,,,Venmo,,
+,4607,2026-01-07T13:00:00,Payment,Declined,Rent,Jamie Lee,Shabarish Nair,+ $800.00,,0,,0,,,Venmo balance,,,,Venmo,,
+,4608,2026-01-07T14:00:00,Standard Transfer,Failed,,Shabarish Nair,,- $50.00,,,,,,,Bank,,,,Venmo,,
+,,,,,,,,,,,,,,,,,$-1039.68,,,,
+"""
+
+
+class FakeClassifier:
+    def __init__(self):
+        self.calls = []
+
+    def predict_batch(self, descriptions, signed_amounts):
+        self.calls.append(list(zip(descriptions, signed_amounts)))
+        return [{
+            "category": "Restaurants" if "Sushi" in description else "Uncategorized",
+            "type": "Expense",
+            "confidence": 0.9 if "Sushi" in description else 0.4,
+            "cat_confidence": 0.9,
+            "type_confidence": 0.8,
+            "model_available": True,
+            "prediction_source": "model",
+        } for description in descriptions]
+
+
+def test_statement_rows_are_parsed_classified_and_bulk_inserted(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    db.init_db()
+    import venmo_import
+
+    classifier = FakeClassifier()
+    result = venmo_import.import_statement(io.StringIO(STATEMENT), classifier=classifier)
+
+    assert result == {"rows": 4, "inserted": 4, "duplicates": 0}
+    # One batch for the whole chunk, with signed amounts.
+    assert len(classifier.calls) == 1
+    assert classifier.calls[0][0] == ("Venmo - Shabarish Nair / Alex Kim Sushi", -1042.38)
+    assert classifier.calls[0][1][1] == 6.0
+
+    saved = db.get_all_transactions().set_index("details")
+    sushi = saved.loc["Venmo ID: 4601; Statement Period: nan"]
+    assert sushi["amount"] == 1042.38
+    assert sushi["date"] == "2026-01-03"
+    assert sushi["type"] == "Expense"
+    assert sushi["category"] == "Restaurants"
+    assert sushi["user_notes"] == "Sushi"
+    assert sushi["id"] == hashlib.md5("2026-01-031042.38Venmo - Shabarish Nair / Alex Kim".encode()).hexdigest()
+
+    refund = saved.loc["Venmo ID: 4602; Statement Period: nan"]
+    assert refund["type"] == "Reimbursement"
+    assert refund["user_notes"] == "Dinner split | 🤖 Low Confidence (40%)"
+
+    transfer = saved.loc["Venmo ID: 4603; Statement Period: nan"]
+    assert (transfer["type"], transfer["category"]) == ("Transfer", "Transfer")
+    assert transfer["description"] == "Venmo - Shabarish Nair / nan"
+    # Cancelled, declined, and failed payments never moved money.
+    assert not saved.index.str.contains("4606|4607|4608").any()
+    assert set(saved["status"]) == {"PENDING"}
+    assert set(saved["tags"]) == {"venmo_import"}
+
+
+def test_reimport_skips_rows_already_in_the_ledger_across_chunks(monkeypatch, tmp_path):
+    db = reload_db(monkeypatch, tmp_path)
+    db.init_db()
+    import venmo_import
+
+    # An earlier upload of the coffee payment, stored under a different id.
+    db.upsert_transactions(pd.DataFrame([{
+        "id": "venmo-old-export-id",
+        "date": "2026-01-06",
+        "amount": 3.30,
+        "description": "Venmo - Shabarish Nair / Starbucks",
+        "category": "Restaurants",
+        "type": "Expense",
+        "method": "Venmo",
+        "account": "Venmo",
+        "status": "REVIEWED",
+        "tags": "venmo_import",
+    }]))
+
+    classifier = FakeClassifier()
+    first = venmo_import.import_statement(io.StringIO(STATEMENT), chunksize=2, classifier=classifier)
+    assert first == {"rows": 4, "inserted": 3, "duplicates": 1}
+    assert all(description != "Venmo - Shabarish Nair / Starbucks Coffee" for call in classifier.calls for description, _ in call)
+
+    second = venmo_import.import_statement(io.StringIO(STATEMENT), chunksize=3, classifier=classifier)
+    assert second == {"rows": 4, "inserted": 0, "duplicates": 4}
+    saved = db.get_all_transactions()
+    assert len(saved) == 4
+    assert saved.set_index("id").loc["venmo-old-export-id", "status"] == "REVIEWED"
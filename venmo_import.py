@@ -0,0 +1,152 @@
+import hashlib
+
+import pandas as pd
+
+import db
+import ml_utils
+
+
+# Venmo statements open with two title lines; the column header is the third.
+HEADER_ROW = 2
+DEFAULT_CHUNK_SIZE = 20000
+AMOUNT_COLUMN = 'Amount (total)'
+PERIOD_COLUMN = 'Statement Period Venmo Fees'
+REQUIRED_COLUMNS = ['ID', 'Datetime', 'Type', 'Status', 'Note', 'From', 'To', AMOUNT_COLUMN]
+# Payments that never moved money. Issued transfers are still on their way.
+SKIPPED_STATUSES = ['Cancelled', 'Declined', 'Failed']
+
+
+def read_statement(source, chunksize=DEFAULT_CHUNK_SIZE):
+    """Yields a Venmo statement CSV (path or file object) in chunks of raw string columns."""
+    for chunk in pd.read_csv(source, header=HEADER_ROW, dtype=str, chunksize=chunksize):
+        chunk.columns = chunk.columns.str.strip()
+        missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+        if missing:
+            raise ValueError(
+                f"Venmo statement is missing columns {missing}; found {chunk.columns.tolist()}"
+            )
+        yield chunk
+
+
+def raw_records(chunk):
+    """str(dict) of each statement row for raw_data, built from columns rather than DataFrame.to_dict."""
+    columns = chunk.columns.tolist()
+    return [str(dict(zip(columns, values))) for values in zip(*(chunk[column].tolist() for column in columns))]
+
+
+def parse_statement(chunk):
+    """
+    Turns raw statement rows into ledger fields with column-wide operations:
+    footer and balance rows (no ID), cancelled, declined, or failed payments,
+    and rows whose date or amount do not parse are dropped. Amounts look like "- $1,042.38" or "+ $6.00"; a bare number
+    counts as positive when it is above zero.
+    """
+    chunk = chunk[chunk['ID'].notna() & ~chunk['Status'].str.strip().isin(SKIPPED_STATUSES)]
+    raw_amount = chunk[AMOUNT_COLUMN].fillna('').str.replace(r'[$,\s]', '', regex=True)
+    magnitude = pd.to_numeric(raw_amount.str.replace(r'[+-]', '', regex=True), errors='coerce')
+    is_positive = raw_amount.str.contains('+', regex=False) | (
+        ~raw_amount.str.contains('-', regex=False) & (magnitude > 0)
+    )
+    dates = pd.to_datetime(chunk['Datetime'], errors='coerce', format='mixed')
+    valid = magnitude.notna() & dates.notna()
+    chunk = chunk[valid]
+    magnitude = magnitude[valid].abs()
+    is_positive = is_positive[valid]
+
+    # Missing names render as "nan", matching descriptions already in the ledger.
+    description = 'Venmo - ' + chunk['From'].astype(str) + ' / ' + chunk['To'].astype(str)
+    period = chunk[PERIOD_COLUMN].astype(str) if PERIOD_COLUMN in chunk.columns else ''
+    parsed = pd.DataFrame({
+        'venmo_id': chunk['ID'].astype(str),
+        'date': dates[valid].dt.strftime('%Y-%m-%d'),
+        'amount': magnitude.astype(float),
+        'signed_amount': magnitude.where(is_positive, -magnitude).astype(float),
+        'description': description,
+        'note': chunk['Note'].fillna(''),
+        'is_credit': is_positive,
+        'is_transfer': chunk['Type'] == 'Standard Transfer',
+        'raw_data': raw_records(chunk),
+    }, index=chunk.index)
+    parsed['details'] = 'Venmo ID: ' + parsed['venmo_id'] + '; Statement Period: ' + period
+    return parsed
+
+
+def drop_known_rows(parsed, seen_keys):
+    """
+    Removes rows that match a Venmo row already in the ledger or earlier in
+    this import on date, description, and amount to the cent. `seen_keys`
+    carries those keys from one chunk to the next.
+    """
+    if parsed.empty:
+        return parsed
+    keys = list(zip(parsed['date'], parsed['description'], parsed['amount'].mul(100).round().astype(int)))
+    seen_keys.update(db.get_venmo_import_keys(parsed['date'].min(), parsed['date'].max()))
+    keep = []
+    for key in keys:
+        keep.append(key not in seen_keys)
+        seen_keys.add(key)
+    return parsed[keep]
+
+
+def build_transactions(parsed, classifier=None):
+    """Classifies parsed rows in one batch and returns Inbox-ready transaction rows."""
+    classifier = classifier or ml_utils.classifier
+    texts = (parsed['description'] + ' ' + parsed['note']).str.strip()
+    predictions = classifier.predict_batch(texts.tolist(), parsed['signed_amount'].tolist())
+    predicted = pd.DataFrame(predictions, index=parsed.index)
+
+    category = predicted['category'].fillna('Uncategorized')
+    tx_type = pd.Series('Expense', index=parsed.index)
+    tx_type[parsed['is_credit']] = 'Reimbursement'
+    tx_type[parsed['is_transfer']] = 'Transfer'
+    category[parsed['is_transfer']] = 'Transfer'
+
+    ml_notes = pd.Series([ml_utils.prediction_note(pred) for pred in predictions], index=parsed.index)
+    notes = (
+        (parsed['note'] + ' | ' + ml_notes)
+        .where(parsed['note'] != '', ml_notes)
+        .where(ml_notes != '', parsed['note'])
+    )
+
+    # Ids stay date + amount + description hashes, as earlier uploads stored them.
+    ids = [
+        hashlib.md5(f"{date}{amount}{description}".encode()).hexdigest()
+        for date, amount, description in zip(parsed['date'], parsed['amount'], parsed['description'])
+    ]
+    return pd.DataFrame({
+        'id': ids,
+        'date': parsed['date'],
+        'amount': parsed['amount'],
+        'description': parsed['description'],
+        'category': category,
+        'type': tx_type,
+        'method': 'Venmo',
+        'tags': 'venmo_import',
+        'user_notes': notes,
+        'status': 'PENDING',
+        'raw_data': parsed['raw_data'],
+        'account': 'Venmo',
+        'posted_date': parsed['date'],
+        'details': parsed['details'],
+        'ml_confidence': predicted['confidence'].astype(float),
+        'ml_category_confidence': predicted['cat_confidence'].astype(float),
+        'ml_type_confidence': predicted['type_confidence'].astype(float),
+    }, index=parsed.index)
+
+
+def import_statement(source, chunksize=DEFAULT_CHUNK_SIZE, classifier=None):
+    """
+    Imports a Venmo statement CSV into the Inbox: reads it in chunks, drops
+    rows already imported, classifies the rest in one batch per chunk, and
+    bulk-inserts them. Returns {'rows', 'inserted', 'duplicates'}.
+    """
+    report = {'rows': 0, 'inserted': 0, 'duplicates': 0}
+    seen_keys = set()
+    for chunk in read_statement(source, chunksize=chunksize):
+        parsed = parse_statement(chunk)
+        fresh = drop_known_rows(parsed, seen_keys)
+        report['rows'] += len(parsed)
+        report['duplicates'] += len(parsed) - len(fresh)
+        if not fresh.empty:
+            report['inserted'] += db.insert_new_transactions(build_transactions(fresh, classifier))
+    return report